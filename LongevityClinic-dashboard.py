@@ -19,6 +19,13 @@ from fpdf import FPDF
 import plotly.io as pio
 from PIL import Image
 
+import dashboard_utils
+import dataflow
+import development_model
+import montecarlo
+import sensitivity
+import spend_profiles
+
 # Set page configuration
 st.set_page_config(
     page_title="Property Development Financial Dashboard",
@@ -72,6 +79,7 @@ with st.sidebar.expander("Finance & Legal", expanded=True):
     arrangement_fee_percent = st.number_input("Loan Arrangement Fee (%)", min_value=0.0, value=1.5, step=0.1)
     legal_fees_finance = st.number_input("Legal Fees - Finance (£)", min_value=0, value=25000, step=5000)
     monitoring_surveyor_fees = st.number_input("Monitoring Surveyor Fees (£)", min_value=0, value=30000, step=5000)
+    discount_rate = st.number_input("Discount Rate (%)", min_value=0.0, value=10.0, step=0.5)
 
 with st.sidebar.expander("Marketing & Disposal", expanded=True):
     marketing_budget = st.number_input("Marketing Budget (£)", min_value=0, value=100000, step=10000)
@@ -84,68 +92,87 @@ with st.sidebar.expander("Revenue Projections", expanded=True):
     occupancy_rate = st.number_input("Occupancy Rate (%)", min_value=0.0, value=95.0, step=1.0)
     exit_yield = st.number_input("Exit Yield (%)", min_value=0.1, value=4.5, step=0.1)
     sales_absorption_rate = st.number_input("Sales Absorption Rate (units/month)", min_value=0.1, value=2.0, step=0.1)
+    unit_size_sqft = st.number_input("Average Unit Size (sq ft)", min_value=100, value=1000, step=100)
+    off_plan_launch_months = st.number_input("Off-Plan Launch (months before completion)", min_value=0, value=6, step=1)
+    pre_sales_percent = st.number_input("Maximum Off-Plan Sales (%)", min_value=0.0, max_value=100.0, value=50.0, step=5.0)
+    deposit_percent = st.number_input("Off-Plan Deposit (%)", min_value=0.0, max_value=100.0, value=10.0, step=1.0)
+
+with st.sidebar.expander("Spend Profiles"):
+    # How each category's cost is spread over the months it is spent in
+    cost_profiles = {
+        category: st.selectbox(
+            category,
+            spend_profiles.PROFILES,
+            index=spend_profiles.PROFILES.index(development_model.DEFAULT_SPEND_PROFILES[category]),
+            format_func=lambda name: name.replace('_', ' ').capitalize(),
+            key=f"spend_profile_{i}"
+        )
+        for i, category in enumerate(development_model.COST_CATEGORIES) if category != 'Acquisition'
+    }
 
 # Calculations
+# The dataflow graph only recomputes figures downstream of inputs changed since the last rerun
+params = {name: globals()[name] for name in development_model.PARAM_NAMES}
+appraisal = dashboard_utils.development_dataflow(params, cost_profiles)
+
+with st.sidebar.expander("Input Influence"):
+    influence_input = st.selectbox("Input", development_model.PARAM_NAMES, format_func=lambda name: name.replace('_', ' ').capitalize(), key="influence_input")
+    influenced = dataflow.downstream(dashboard_utils.DEVELOPMENT_GRAPH, [influence_input])
+    st.markdown("Changing it recomputes: " + (", ".join(f"`{name}`" for name in influenced) or "nothing in the appraisal"))
+
 # Acquisition costs
-stamp_duty = land_cost * (stamp_duty_rate / 100)
-total_acquisition_costs = land_cost + stamp_duty + legal_fees_acquisition + survey_costs
+stamp_duty = appraisal['stamp_duty']
+total_acquisition_costs = appraisal['total_acquisition_costs']
 
 # Planning & design costs
-total_planning_design_costs = planning_application_fees + architect_fees + engineering_fees + other_consultant_fees + planning_contingency
+total_planning_design_costs = appraisal['total_planning_design_costs']
 
 # Construction costs
-base_construction_cost = construction_cost_per_sqft * project_size_sqft
-fit_out_cost = fit_out_cost_per_sqft * project_size_sqft
-construction_contingency = (base_construction_cost + fit_out_cost + external_works) * (construction_contingency_percent / 100)
-total_construction_costs = base_construction_cost + fit_out_cost + external_works + construction_contingency
+base_construction_cost = appraisal['base_construction_cost']
+fit_out_cost = appraisal['fit_out_cost']
+construction_contingency = appraisal['construction_contingency']
+total_construction_costs = appraisal['total_construction_costs']
 
 # Professional fees
-project_management_fee = total_construction_costs * (project_management_percent / 100)
-quantity_surveyor_fee = total_construction_costs * (quantity_surveyor_percent / 100)
-total_professional_fees = project_management_fee + quantity_surveyor_fee + building_control_fees + health_safety_fees
+project_management_fee = appraisal['project_management_fee']
+quantity_surveyor_fee = appraisal['quantity_surveyor_fee']
+total_professional_fees = appraisal['total_professional_fees']
 
 # Finance costs
-total_development_cost_before_finance = total_acquisition_costs + total_planning_design_costs + total_construction_costs + total_professional_fees
-loan_amount = total_development_cost_before_finance * (loan_to_cost_ratio / 100)
-equity_required = total_development_cost_before_finance - loan_amount
-arrangement_fee = loan_amount * (arrangement_fee_percent / 100)
-
-# Simple interest calculation (can be made more complex with drawdown schedule)
-average_loan_duration = project_duration_months / 2  # Assuming gradual drawdown
-interest_cost = loan_amount * (interest_rate / 100) * (average_loan_duration / 12)
-
-total_finance_costs = arrangement_fee + interest_cost + legal_fees_finance + monitoring_surveyor_fees
+total_development_cost_before_finance = appraisal['total_development_cost_before_finance']
+loan_amount = appraisal['loan_amount']
+equity_required = appraisal['equity_required']
+arrangement_fee = appraisal['arrangement_fee']
+interest_cost = appraisal['interest_cost']
+total_finance_costs = appraisal['total_finance_costs']
 
 # Marketing & disposal costs
-agent_fees = (sales_price_per_sqft * project_size_sqft) * (agent_fees_percent / 100)
-total_marketing_disposal_costs = marketing_budget + agent_fees + legal_fees_disposal
+agent_fees = appraisal['agent_fees']
+total_marketing_disposal_costs = appraisal['total_marketing_disposal_costs']
 
 # Total development costs
-total_development_costs = (
-    total_acquisition_costs + 
-    total_planning_design_costs + 
-    total_construction_costs + 
-    total_professional_fees + 
-    total_finance_costs + 
-    total_marketing_disposal_costs
-)
-
-# Revenue calculations
-gross_development_value_sales = sales_price_per_sqft * project_size_sqft
-annual_rental_income = rental_price_per_sqft * project_size_sqft * (occupancy_rate / 100)
-gross_development_value_investment = annual_rental_income / (exit_yield / 100)
+total_development_costs = appraisal['total_development_costs']
 
-# Use the higher of sales or investment value as the GDV
-gross_development_value = max(gross_development_value_sales, gross_development_value_investment)
+# Revenue calculations (GDV is the higher of sales or investment value)
+gross_development_value_sales = appraisal['gross_development_value_sales']
+annual_rental_income = appraisal['annual_rental_income']
+gross_development_value_investment = appraisal['gross_development_value_investment']
+gross_development_value = appraisal['gross_development_value']
 
 # Profit calculations
-profit = gross_development_value - total_development_costs
-profit_margin = (profit / total_development_costs) * 100
-profit_on_gdv = (profit / gross_development_value) * 100
-return_on_equity = (profit / equity_required) * 100
+profit = appraisal['profit']
+profit_margin = appraisal['profit_margin']
+profit_on_gdv = appraisal['profit_on_gdv']
+return_on_equity = appraisal['return_on_equity']
+
+# Discounted returns from the monthly project and equity cashflows
+npv = appraisal['npv']
+project_irr = appraisal['project_irr']
+equity_irr = appraisal['equity_irr']
+discounted_payback_months = appraisal['discounted_payback_months']
 
 # Cost per square foot
-cost_per_sqft = total_development_costs / project_size_sqft
+cost_per_sqft = appraisal['cost_per_sqft']
 
 # Main dashboard
 # KPI metrics in columns
@@ -162,72 +189,25 @@ with col4:
 # Project timeline and cashflow
 st.subheader("Project Timeline & Cashflow")
 
-# Create a simplified monthly cashflow projection
-months = list(range(1, project_duration_months + 1))
-
-# Simplified S-curve for construction costs
-def s_curve(x, duration):
-    return 1 / (1 + np.exp(-0.5 * (x - duration/2)))
-
-# Create spending curves for different cost categories
-acquisition_curve = np.zeros(project_duration_months)
-acquisition_curve[0] = 1  # All acquisition costs in month 1
-
-planning_curve = np.zeros(project_duration_months)
-planning_months = min(6, project_duration_months)
-planning_curve[:planning_months] = 1/planning_months  # Spread over first 6 months or project duration
-
-construction_start = min(3, project_duration_months - 1)
-construction_duration = project_duration_months - construction_start
-construction_curve = np.zeros(project_duration_months)
-for i in range(construction_start, project_duration_months):
-    month_in_construction = i - construction_start
-    construction_curve[i] = (s_curve(month_in_construction + 1, construction_duration) - 
-                            s_curve(month_in_construction, construction_duration))
-
-# Professional fees follow construction
-professional_curve = construction_curve.copy()
-
-# Finance costs spread evenly
-finance_curve = np.ones(project_duration_months) / project_duration_months
-
-# Marketing and disposal weighted toward end
-marketing_curve = np.zeros(project_duration_months)
-marketing_start = max(0, project_duration_months - 6)
-marketing_curve[marketing_start:] = 1 / (project_duration_months - marketing_start)
-
-# Calculate monthly costs
-monthly_acquisition = acquisition_curve * total_acquisition_costs
-monthly_planning = planning_curve * total_planning_design_costs
-monthly_construction = construction_curve * total_construction_costs
-monthly_professional = professional_curve * total_professional_fees
-monthly_finance = finance_curve * total_finance_costs
-monthly_marketing = marketing_curve * total_marketing_disposal_costs
-
-monthly_total_costs = (
-    monthly_acquisition + 
-    monthly_planning + 
-    monthly_construction + 
-    monthly_professional + 
-    monthly_finance + 
+# Monthly cashflow projection: costs follow each category's spend curve and
+# revenue lands at the end of the project (part of the same dataflow graph)
+cashflow = appraisal
+months = list(cashflow['months'])
+(
+    monthly_acquisition,
+    monthly_planning,
+    monthly_construction,
+    monthly_professional,
+    monthly_finance,
     monthly_marketing
-)
-
-# Revenue comes at the end for sales model
-monthly_revenue = np.zeros(project_duration_months)
-if gross_development_value == gross_development_value_sales:
-    # Sales model - revenue at the end
-    sales_start = max(0, project_duration_months - int(project_size_sqft / 1000 / sales_absorption_rate))
-    for i in range(sales_start, project_duration_months):
-        monthly_revenue[i] = gross_development_value / (project_duration_months - sales_start)
-else:
-    # Investment model - revenue at the end
-    monthly_revenue[-1] = gross_development_value
+) = cashflow['monthly_costs']
+monthly_total_costs = cashflow['monthly_total_costs']
+monthly_revenue = cashflow['monthly_revenue']
 
 # Calculate cumulative cashflow
-cumulative_costs = np.cumsum(monthly_total_costs)
-cumulative_revenue = np.cumsum(monthly_revenue)
-cumulative_cashflow = cumulative_revenue - cumulative_costs
+cumulative_costs = cashflow['cumulative_costs']
+cumulative_revenue = cashflow['cumulative_revenue']
+cumulative_cashflow = cashflow['cumulative_cashflow']
 
 # Create dataframe for plotting
 df_cashflow = pd.DataFrame({
@@ -240,63 +220,74 @@ df_cashflow = pd.DataFrame({
 })
 
 # Plot cashflow
-fig_cashflow = go.Figure()
-
-# Add revenue line
-fig_cashflow.add_trace(go.Scatter(
-    x=months,
-    y=cumulative_revenue,
-    mode='lines',
-    name='Cumulative Revenue',
-    line=dict(color='blue', width=3)
-))
-
-# Add cost line
-fig_cashflow.add_trace(go.Scatter(
-    x=months,
-    y=cumulative_costs,
-    mode='lines',
-    name='Cumulative Costs',
-    line=dict(color='green', width=3)
-))
-
-# Add cashflow line
-fig_cashflow.add_trace(go.Scatter(
-    x=months,
-    y=cumulative_cashflow,
-    mode='lines',
-    name='Net Cashflow',
-    line=dict(color='red', width=4, dash='dot')
-))
-
-# Add zero line
-fig_cashflow.add_hline(
-    y=0, 
-    line=dict(color='black', width=1, dash='dash'),
-    annotation_text="Break-even",
-    annotation_position="bottom right"
-)
+def build_cashflow_chart(months, cumulative_revenue, cumulative_costs, cumulative_cashflow):
+    fig_cashflow = go.Figure()
+
+    # Add revenue line
+    fig_cashflow.add_trace(go.Scatter(
+        x=months,
+        y=cumulative_revenue,
+        mode='lines',
+        name='Cumulative Revenue',
+        line=dict(color='blue', width=3)
+    ))
+
+    # Add cost line
+    fig_cashflow.add_trace(go.Scatter(
+        x=months,
+        y=cumulative_costs,
+        mode='lines',
+        name='Cumulative Costs',
+        line=dict(color='green', width=3)
+    ))
+
+    # Add cashflow line
+    fig_cashflow.add_trace(go.Scatter(
+        x=months,
+        y=cumulative_cashflow,
+        mode='lines',
+        name='Net Cashflow',
+        line=dict(color='red', width=4, dash='dot')
+    ))
+
+    # Add zero line
+    fig_cashflow.add_hline(
+        y=0, 
+        line=dict(color='black', width=1, dash='dash'),
+        annotation_text="Break-even",
+        annotation_position="bottom right"
+    )
 
-# Update layout
-fig_cashflow.update_layout(
-    title='Project Cashflow Projection',
-    xaxis_title='Month',
-    yaxis_title='Amount (£)',
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=1.02,
-        xanchor="right",
-        x=1
-    ),
-    plot_bgcolor='white',
-    paper_bgcolor='white',
-    font=dict(color='black'),
-    hovermode='x unified'
-)
+    # Update layout
+    fig_cashflow.update_layout(
+        title='Project Cashflow Projection',
+        xaxis_title='Month',
+        yaxis_title='Amount (£)',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='black'),
+        hovermode='x unified'
+    )
+    return fig_cashflow
+
+fig_cashflow = dashboard_utils.cached_figure(build_cashflow_chart, months, cumulative_revenue, cumulative_costs, cumulative_cashflow)
 
 st.plotly_chart(fig_cashflow, use_container_width=True)
 
+# Unit sales: off-plan exchanges pay a deposit, the balance and later sales land from completion
+if gross_development_value == gross_development_value_sales:
+    total_units = cashflow['unsold_units'][0] + cashflow['units_sold'][0]
+    off_plan_units = cashflow['units_sold'][:int(round(project_duration_months)) - 1].sum()
+    sold_out_month = int(np.argmax(cashflow['unsold_units'] <= 0)) + 1
+    st.caption(f"Unit sales: {total_units:.0f} units, {off_plan_units:.0f} exchanged off-plan, sold out in month {sold_out_month}.")
+
 # Two columns for Cost Breakdown and Financial Metrics
 col1, col2 = st.columns(2)
 
@@ -314,24 +305,28 @@ with col1:
         ]
     }
     df_costs = pd.DataFrame(cost_data)
-    fig_costs = px.pie(
-        df_costs, 
-        values='Cost', 
-        names='Category',
-        title='Development Cost Breakdown',
-        color_discrete_sequence=['blue', 'green', 'red', 'orange', 'purple', 'pink'],
-        hole=0.4
-    )
-    fig_costs.update_traces(
-        textposition='inside', 
-        textinfo='percent+label',
-        marker=dict(line=dict(color='white', width=2))
-    )
-    fig_costs.update_layout(
-        font=dict(color='black'),
-        legend=dict(orientation='h', yanchor='bottom', y=-0.2),
-        paper_bgcolor='white'
-    )
+    def build_cost_pie(df_costs):
+        fig_costs = px.pie(
+            df_costs, 
+            values='Cost', 
+            names='Category',
+            title='Development Cost Breakdown',
+            color_discrete_sequence=['blue', 'green', 'red', 'orange', 'purple', 'pink'],
+            hole=0.4
+        )
+        fig_costs.update_traces(
+            textposition='inside', 
+            textinfo='percent+label',
+            marker=dict(line=dict(color='white', width=2))
+        )
+        fig_costs.update_layout(
+            font=dict(color='black'),
+            legend=dict(orientation='h', yanchor='bottom', y=-0.2),
+            paper_bgcolor='white'
+        )
+        return fig_costs
+
+    fig_costs = dashboard_utils.cached_figure(build_cost_pie, df_costs)
     st.plotly_chart(fig_costs, use_container_width=True)
 
 # Financial metrics
@@ -436,604 +431,949 @@ df_detailed_costs['Cost per sq ft'] = df_detailed_costs['Cost per sq ft'].apply(
 
 st.table(df_detailed_costs)
 
+# Development finance: the monthly facility behind the appraisal's finance costs
+st.subheader("Development Finance")
+
+finance_col1, finance_col2, finance_col3 = st.columns(3)
+with finance_col1:
+    st.metric("Peak Debt", f"£{appraisal['peak_debt']:,.0f}")
+with finance_col2:
+    st.metric("Rolled-Up Interest", f"£{interest_cost:,.0f}")
+with finance_col3:
+    st.metric("Cash Cover", f"Month {appraisal['cash_cover_month']:.0f}" if np.isfinite(appraisal['cash_cover_month']) else "Not reached")
+
+st.table(pd.DataFrame({
+    'Item': ['Facility Limit', 'Equity Required', 'Arrangement Fee', 'Rolled-Up Interest', 'Total Finance Costs', 'Profit'],
+    'Amount': [f"£{value:,.0f}" for value in (
+        loan_amount, equity_required, arrangement_fee, interest_cost, total_finance_costs, profit
+    )]
+}))
+
+def build_facility_chart(months, debt_balance, equity_drawdown):
+    fig_facility = go.Figure()
+    fig_facility.add_trace(go.Bar(
+        x=months,
+        y=np.cumsum(equity_drawdown),
+        name='Cumulative Equity',
+        marker_color='green',
+        opacity=0.6
+    ))
+    fig_facility.add_trace(go.Scatter(
+        x=months,
+        y=debt_balance,
+        mode='lines+markers',
+        name='Loan Balance',
+        line=dict(color='red', width=3)
+    ))
+    fig_facility.update_layout(
+        title='Equity Drawn and Loan Balance (Interest Rolled Up)',
+        xaxis_title='Month',
+        yaxis_title='Amount (£)',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='black'),
+        hovermode='x unified'
+    )
+    return fig_facility
+
+fig_facility = dashboard_utils.cached_figure(build_facility_chart, months, appraisal['debt_balance'], appraisal['equity_drawdown'])
+st.plotly_chart(fig_facility, use_container_width=True)
+
 # Add after the "Detailed Cost Breakdown" section
 st.subheader("Budget vs. Actual Tracking")
 
-with st.expander("Budget vs. Actual Cost Tracking"):
-    # Create tabs for data entry and visualization
-    budget_actual_tab1, budget_actual_tab2 = st.tabs(["Data Entry", "Visualization"])
-    
-    with budget_actual_tab1:
-        st.markdown("### Enter Actual Costs")
-        st.markdown("Track your project's actual costs against the budget.")
+budget_section = dashboard_utils.lazy_expander("Budget vs. Actual Cost Tracking", "budget_section", [f"actual_cost_{i}" for i in range(6)] + [f"completion_{i}" for i in range(6)])
+with budget_section:
+    if budget_section.open:
+        # Data entry reruns only this fragment, not the whole dashboard
+        @st.fragment
+        def budget_vs_actual(total_acquisition_costs, total_planning_design_costs, total_construction_costs, total_professional_fees, total_finance_costs, total_marketing_disposal_costs):
+            # Create tabs for data entry and visualization
+            budget_actual_tab1, budget_actual_tab2 = st.tabs(["Data Entry", "Visualization"])
+    
+            with budget_actual_tab1:
+                st.markdown("### Enter Actual Costs")
+                st.markdown("Track your project's actual costs against the budget.")
         
-        # Create a dataframe with the main cost categories
-        actual_costs_data = {
-            'Cost Category': [
-                'Land/Property Acquisition',
-                'Planning & Design',
-                'Construction',
-                'Professional Fees',
-                'Finance',
-                'Marketing & Disposal'
-            ],
-            'Budgeted Cost': [
-                total_acquisition_costs,
-                total_planning_design_costs,
-                total_construction_costs,
-                total_professional_fees,
-                total_finance_costs,
-                total_marketing_disposal_costs
-            ],
-            'Actual Cost': [0, 0, 0, 0, 0, 0],
-            'Completion (%)': [0, 0, 0, 0, 0, 0]
-        }
+                # Create a dataframe with the main cost categories
+                actual_costs_data = {
+                    'Cost Category': [
+                        'Land/Property Acquisition',
+                        'Planning & Design',
+                        'Construction',
+                        'Professional Fees',
+                        'Finance',
+                        'Marketing & Disposal'
+                    ],
+                    'Budgeted Cost': [
+                        total_acquisition_costs,
+                        total_planning_design_costs,
+                        total_construction_costs,
+                        total_professional_fees,
+                        total_finance_costs,
+                        total_marketing_disposal_costs
+                    ],
+                    'Actual Cost': [0, 0, 0, 0, 0, 0],
+                    'Completion (%)': [0, 0, 0, 0, 0, 0]
+                }
         
-        df_actual_costs = pd.DataFrame(actual_costs_data)
+                df_actual_costs = pd.DataFrame(actual_costs_data)
         
-        # Create input fields for actual costs and completion percentages
-        for i, category in enumerate(df_actual_costs['Cost Category']):
-            col1, col2 = st.columns(2)
-            with col1:
-                actual_cost = st.number_input(
-                    f"Actual Cost - {category} (£)",
-                    min_value=0,
-                    value=int(df_actual_costs.loc[i, 'Actual Cost']),
-                    step=10000
-                )
-                df_actual_costs.loc[i, 'Actual Cost'] = actual_cost
+                # Create input fields for actual costs and completion percentages
+                for i, category in enumerate(df_actual_costs['Cost Category']):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        actual_cost = st.number_input(
+                            f"Actual Cost - {category} (£)",
+                            min_value=0,
+                            value=int(df_actual_costs.loc[i, 'Actual Cost']),
+                            step=10000,
+                            key=f"actual_cost_{i}"
+                        )
+                        df_actual_costs.loc[i, 'Actual Cost'] = actual_cost
             
-            with col2:
-                completion = st.slider(
-                    f"Completion % - {category}",
-                    min_value=0,
-                    max_value=100,
-                    value=int(df_actual_costs.loc[i, 'Completion (%)']),
-                    step=5
-                )
-                df_actual_costs.loc[i, 'Completion (%)'] = completion
+                    with col2:
+                        completion = st.slider(
+                            f"Completion % - {category}",
+                            min_value=0,
+                            max_value=100,
+                            value=int(df_actual_costs.loc[i, 'Completion (%)']),
+                            step=5,
+                            key=f"completion_{i}"
+                        )
+                        df_actual_costs.loc[i, 'Completion (%)'] = completion
         
-        # Calculate variance
-        df_actual_costs['Variance'] = df_actual_costs['Budgeted Cost'] - df_actual_costs['Actual Cost']
-        df_actual_costs['Variance %'] = (df_actual_costs['Variance'] / df_actual_costs['Budgeted Cost']) * 100
+                # Calculate variance
+                df_actual_costs['Variance'] = df_actual_costs['Budgeted Cost'] - df_actual_costs['Actual Cost']
+                df_actual_costs['Variance %'] = (df_actual_costs['Variance'] / df_actual_costs['Budgeted Cost']) * 100
         
-        # Format for display
-        df_actual_costs_display = df_actual_costs.copy()
-        df_actual_costs_display['Budgeted Cost'] = df_actual_costs_display['Budgeted Cost'].apply(lambda x: f"£{x:,.0f}")
-        df_actual_costs_display['Actual Cost'] = df_actual_costs_display['Actual Cost'].apply(lambda x: f"£{x:,.0f}")
-        df_actual_costs_display['Variance'] = df_actual_costs_display['Variance'].apply(lambda x: f"£{x:,.0f}")
-        df_actual_costs_display['Variance %'] = df_actual_costs_display['Variance %'].apply(lambda x: f"{x:.1f}%")
-        df_actual_costs_display['Completion (%)'] = df_actual_costs_display['Completion (%)'].apply(lambda x: f"{x}%")
+                # Format for display
+                df_actual_costs_display = df_actual_costs.copy()
+                df_actual_costs_display['Budgeted Cost'] = df_actual_costs_display['Budgeted Cost'].apply(lambda x: f"£{x:,.0f}")
+                df_actual_costs_display['Actual Cost'] = df_actual_costs_display['Actual Cost'].apply(lambda x: f"£{x:,.0f}")
+                df_actual_costs_display['Variance'] = df_actual_costs_display['Variance'].apply(lambda x: f"£{x:,.0f}")
+                df_actual_costs_display['Variance %'] = df_actual_costs_display['Variance %'].apply(lambda x: f"{x:.1f}%")
+                df_actual_costs_display['Completion (%)'] = df_actual_costs_display['Completion (%)'].apply(lambda x: f"{x}%")
         
-        st.table(df_actual_costs_display)
+                st.table(df_actual_costs_display)
     
-    with budget_actual_tab2:
-        # Create visualizations for budget vs actual
-        st.markdown("### Budget vs. Actual Visualization")
+            with budget_actual_tab2:
+                # Create visualizations for budget vs actual
+                st.markdown("### Budget vs. Actual Visualization")
         
-        # Bar chart comparing budget vs actual
-        budget_vs_actual_data = pd.DataFrame({
-            'Category': df_actual_costs['Cost Category'],
-            'Budgeted': df_actual_costs['Budgeted Cost'],
-            'Actual': df_actual_costs['Actual Cost']
-        })
+                # Bar chart comparing budget vs actual
+                budget_vs_actual_data = pd.DataFrame({
+                    'Category': df_actual_costs['Cost Category'],
+                    'Budgeted': df_actual_costs['Budgeted Cost'],
+                    'Actual': df_actual_costs['Actual Cost']
+                })
         
-        budget_vs_actual_melted = pd.melt(
-            budget_vs_actual_data, 
-            id_vars=['Category'],
-            value_vars=['Budgeted', 'Actual'],
-            var_name='Type',
-            value_name='Cost'
-        )
+                budget_vs_actual_melted = pd.melt(
+                    budget_vs_actual_data, 
+                    id_vars=['Category'],
+                    value_vars=['Budgeted', 'Actual'],
+                    var_name='Type',
+                    value_name='Cost'
+                )
         
-        fig_budget_actual = px.bar(
-            budget_vs_actual_melted,
-            x='Category',
-            y='Cost',
-            color='Type',
-            barmode='group',
-            title="Budget vs. Actual Costs by Category",
-            labels={'Cost': 'Cost (£)', 'Category': 'Cost Category'},
-            color_discrete_map={
-                'Budgeted': 'blue',
-                'Actual': 'green'
-            }
-        )
+                def build_budget_actual_chart(budget_vs_actual_melted):
+                    fig_budget_actual = px.bar(
+                        budget_vs_actual_melted,
+                        x='Category',
+                        y='Cost',
+                        color='Type',
+                        barmode='group',
+                        title="Budget vs. Actual Costs by Category",
+                        labels={'Cost': 'Cost (£)', 'Category': 'Cost Category'},
+                        color_discrete_map={
+                            'Budgeted': 'blue',
+                            'Actual': 'green'
+                        }
+                    )
         
-        fig_budget_actual.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(color='black'),
-            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
-            margin=dict(l=20, r=20, t=60, b=20)
-        )
+                    fig_budget_actual.update_layout(
+                        plot_bgcolor='white',
+                        paper_bgcolor='white',
+                        font=dict(color='black'),
+                        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                        margin=dict(l=20, r=20, t=60, b=20)
+                    )
+                    return fig_budget_actual
+
+                fig_budget_actual = dashboard_utils.cached_figure(build_budget_actual_chart, budget_vs_actual_melted)
         
-        st.plotly_chart(fig_budget_actual, use_container_width=True)
+                st.plotly_chart(fig_budget_actual, use_container_width=True)
         
-        # Calculate overall project completion and budget status
-        weighted_completion = sum(df_actual_costs['Completion (%)'] * df_actual_costs['Budgeted Cost']) / sum(df_actual_costs['Budgeted Cost'])
-        total_budget = sum(df_actual_costs['Budgeted Cost'])
-        total_actual = sum(df_actual_costs['Actual Cost'])
-        budget_variance = total_budget - total_actual
-        budget_variance_pct = (budget_variance / total_budget) * 100 if total_budget > 0 else 0
+                # Calculate overall project completion and budget status
+                weighted_completion = sum(df_actual_costs['Completion (%)'] * df_actual_costs['Budgeted Cost']) / sum(df_actual_costs['Budgeted Cost'])
+                total_budget = sum(df_actual_costs['Budgeted Cost'])
+                total_actual = sum(df_actual_costs['Actual Cost'])
+                budget_variance = total_budget - total_actual
+                budget_variance_pct = (budget_variance / total_budget) * 100 if total_budget > 0 else 0
         
-        # Create KPI metrics for project status
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Overall Project Completion", f"{weighted_completion:.1f}%")
-        with col2:
-            st.metric("Budget Variance", f"£{budget_variance:,.0f}", f"{budget_variance_pct:.1f}%")
-        with col3:
-            status = "On Budget" if abs(budget_variance_pct) < 5 else ("Over Budget" if budget_variance_pct < 0 else "Under Budget")
-            st.metric("Budget Status", status)
+                # Create KPI metrics for project status
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Overall Project Completion", f"{weighted_completion:.1f}%")
+                with col2:
+                    st.metric("Budget Variance", f"£{budget_variance:,.0f}", f"{budget_variance_pct:.1f}%")
+                with col3:
+                    status = "On Budget" if abs(budget_variance_pct) < 5 else ("Over Budget" if budget_variance_pct < 0 else "Under Budget")
+                    st.metric("Budget Status", status)
+
+        budget_vs_actual(total_acquisition_costs, total_planning_design_costs, total_construction_costs, total_professional_fees, total_finance_costs, total_marketing_disposal_costs)
 
 # Sensitivity Analysis
 st.subheader("Sensitivity Analysis")
 
-with st.expander("Profit Sensitivity Analysis"):
-    # 1. Sales price sensitivity
-    st.subheader("Sales Price Sensitivity")
-    price_variations = np.linspace(sales_price_per_sqft * 0.8, sales_price_per_sqft * 1.2, 9)
-    price_profit_results = []
-    price_margin_results = []
-    
-    for price in price_variations:
-        new_gdv = price * project_size_sqft
-        new_profit = new_gdv - total_development_costs
-        new_margin = (new_profit / total_development_costs) * 100
-        price_profit_results.append(new_profit)
-        price_margin_results.append(new_margin)
-    
-    price_sensitivity_df = pd.DataFrame({
-        'Sales Price (£/sq ft)': [f"£{price:.0f}" for price in price_variations],
-        'Profit (£)': [f"£{profit:,.0f}" for profit in price_profit_results],
-        'Profit Margin (%)': [f"{margin:.1f}%" for margin in price_margin_results]
-    })
-    
-    st.table(price_sensitivity_df)
+sensitivity_section = dashboard_utils.lazy_expander("Profit Sensitivity Analysis", "sensitivity_section", ["curve_input", "curve_percent", "curve_points", "grid_pair", "grid_points", "tornado_percent", "tornado_metric", "tornado_top"])
+with sensitivity_section:
+    if sensitivity_section.open:
+        # 1. Sales price sensitivity
+        st.subheader("Sales Price Sensitivity")
+        # Each curve is the appraisal itself, broadcast over the input's values
+        price_variations = sensitivity.spread(sales_price_per_sqft, 20, 9)
+        price_curve = dashboard_utils.development_curve(params, 'sales_price_per_sqft', price_variations, cost_profiles)
+        price_profit_results = price_curve['profit']
+        price_margin_results = price_curve['profit_margin']
+    
+        price_sensitivity_df = pd.DataFrame({
+            'Sales Price (£/sq ft)': [f"£{price:.0f}" for price in price_variations],
+            'Profit (£)': [f"£{profit:,.0f}" for profit in price_profit_results],
+            'Profit Margin (%)': [f"{margin:.1f}%" for margin in price_margin_results]
+        })
     
-    fig_price_sensitivity = px.line(
-        x=price_variations, 
-        y=price_profit_results,
-        labels={'x': 'Sales Price (£/sq ft)', 'y': 'Profit (£)'},
-        title="Profit Sensitivity to Sales Price"
-    )
-    fig_price_sensitivity.update_traces(
-        line=dict(color='blue', width=3),
-        mode='lines+markers',
-        marker=dict(size=8, color='blue')
-    )
-    fig_price_sensitivity.add_hline(
-        y=profit,
-        line=dict(color='red', width=1, dash='dash'),
-        annotation_text="Current Profit",
-        annotation_position="bottom right"
-    )
-    fig_price_sensitivity.update_layout(
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black'),
-        xaxis=dict(gridcolor='white', linecolor='white'),
-        yaxis=dict(gridcolor='white', linecolor='white'),
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-    st.plotly_chart(fig_price_sensitivity, use_container_width=True)
-
-    # 2. Construction cost sensitivity
-    st.subheader("Construction Cost Sensitivity")
-    construction_variations = np.linspace(construction_cost_per_sqft * 0.8, construction_cost_per_sqft * 1.2, 9)
-    construction_profit_results = []
-    construction_margin_results = []
-    
-    for cost in construction_variations:
-        new_construction_cost = cost * project_size_sqft
-        new_contingency = (new_construction_cost + fit_out_cost + external_works) * (construction_contingency_percent / 100)
-        new_total_construction = new_construction_cost + fit_out_cost + external_works + new_contingency
-        
-        # Recalculate professional fees
-        new_pm_fee = new_total_construction * (project_management_percent / 100)
-        new_qs_fee = new_total_construction * (quantity_surveyor_percent / 100)
-        new_prof_fees = new_pm_fee + new_qs_fee + building_control_fees + health_safety_fees
-        
-        # Calculate new total cost
-        new_total_cost = (
-            total_acquisition_costs + 
-            total_planning_design_costs + 
-            new_total_construction + 
-            new_prof_fees + 
-            total_finance_costs + 
-            total_marketing_disposal_costs
-        )
-        
-        new_profit = gross_development_value - new_total_cost
-        new_margin = (new_profit / new_total_cost) * 100
-        construction_profit_results.append(new_profit)
-        construction_margin_results.append(new_margin)
-    
-    construction_sensitivity_df = pd.DataFrame({
-        'Construction Cost (£/sq ft)': [f"£{cost:.0f}" for cost in construction_variations],
-        'Profit (£)': [f"£{profit:,.0f}" for profit in construction_profit_results],
-        'Profit Margin (%)': [f"{margin:.1f}%" for margin in construction_margin_results]
-    })
+        st.table(price_sensitivity_df)
+    
+        def build_price_sensitivity_chart(price_variations, price_profit_results, profit):
+            fig_price_sensitivity = px.line(
+                x=price_variations, 
+                y=price_profit_results,
+                labels={'x': 'Sales Price (£/sq ft)', 'y': 'Profit (£)'},
+                title="Profit Sensitivity to Sales Price"
+            )
+            fig_price_sensitivity.update_traces(
+                line=dict(color='blue', width=3),
+                mode='lines+markers',
+                marker=dict(size=8, color='blue')
+            )
+            fig_price_sensitivity.add_hline(
+                y=profit,
+                line=dict(color='red', width=1, dash='dash'),
+                annotation_text="Current Profit",
+                annotation_position="bottom right"
+            )
+            fig_price_sensitivity.update_layout(
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                xaxis=dict(gridcolor='white', linecolor='white'),
+                yaxis=dict(gridcolor='white', linecolor='white'),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            return fig_price_sensitivity
+
+        fig_price_sensitivity = dashboard_utils.cached_figure(build_price_sensitivity_chart, price_variations, price_profit_results, profit)
+        st.plotly_chart(fig_price_sensitivity, use_container_width=True)
+
+        # 2. Construction cost sensitivity
+        st.subheader("Construction Cost Sensitivity")
+        construction_variations = sensitivity.spread(construction_cost_per_sqft, 20, 9)
+        construction_curve = dashboard_utils.development_curve(params, 'construction_cost_per_sqft', construction_variations, cost_profiles)
+        construction_profit_results = construction_curve['profit']
+        construction_margin_results = construction_curve['profit_margin']
+    
+        construction_sensitivity_df = pd.DataFrame({
+            'Construction Cost (£/sq ft)': [f"£{cost:.0f}" for cost in construction_variations],
+            'Profit (£)': [f"£{profit:,.0f}" for profit in construction_profit_results],
+            'Profit Margin (%)': [f"{margin:.1f}%" for margin in construction_margin_results]
+        })
     
-    st.table(construction_sensitivity_df)
+        st.table(construction_sensitivity_df)
+    
+        def build_construction_sensitivity_chart(construction_variations, construction_profit_results, profit):
+            fig_construction_sensitivity = px.line(
+                x=construction_variations, 
+                y=construction_profit_results,
+                labels={'x': 'Construction Cost (£/sq ft)', 'y': 'Profit (£)'},
+                title="Profit Sensitivity to Construction Cost"
+            )
+            fig_construction_sensitivity.update_traces(
+                line=dict(color='blue', width=3),
+                mode='lines+markers',
+                marker=dict(size=8, color='blue')
+            )
+            fig_construction_sensitivity.add_hline(
+                y=profit,
+                line=dict(color='red', width=1, dash='dash'),
+                annotation_text="Current Profit",
+                annotation_position="bottom right"
+            )
+            fig_construction_sensitivity.update_layout(
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                xaxis=dict(gridcolor='white', linecolor='white'),
+                yaxis=dict(gridcolor='white', linecolor='white'),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            return fig_construction_sensitivity
+
+        fig_construction_sensitivity = dashboard_utils.cached_figure(build_construction_sensitivity_chart, construction_variations, construction_profit_results, profit)
+        st.plotly_chart(fig_construction_sensitivity, use_container_width=True)
+
+        # 3. Interest rate sensitivity
+        st.subheader("Interest Rate Sensitivity")
+        interest_variations = np.linspace(max(0.5, interest_rate - 2), interest_rate + 2, 9)
+        interest_curve = dashboard_utils.development_curve(params, 'interest_rate', interest_variations, cost_profiles)
+        interest_profit_results = interest_curve['profit']
+        interest_margin_results = interest_curve['profit_margin']
+    
+        interest_sensitivity_df = pd.DataFrame({
+            'Interest Rate (%)': [f"{rate:.1f}%" for rate in interest_variations],
+            'Rolled-Up Interest (£)': [f"£{interest:,.0f}" for interest in interest_curve['interest_cost']],
+            'Peak Debt (£)': [f"£{debt:,.0f}" for debt in interest_curve['peak_debt']],
+            'Profit (£)': [f"£{profit:,.0f}" for profit in interest_profit_results],
+            'Profit Margin (%)': [f"{margin:.1f}%" for margin in interest_margin_results]
+        })
     
-    fig_construction_sensitivity = px.line(
-        x=construction_variations, 
-        y=construction_profit_results,
-        labels={'x': 'Construction Cost (£/sq ft)', 'y': 'Profit (£)'},
-        title="Profit Sensitivity to Construction Cost"
-    )
-    fig_construction_sensitivity.update_traces(
-        line=dict(color='blue', width=3),
-        mode='lines+markers',
-        marker=dict(size=8, color='blue')
-    )
-    fig_construction_sensitivity.add_hline(
-        y=profit,
-        line=dict(color='red', width=1, dash='dash'),
-        annotation_text="Current Profit",
-        annotation_position="bottom right"
-    )
-    fig_construction_sensitivity.update_layout(
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black'),
-        xaxis=dict(gridcolor='white', linecolor='white'),
-        yaxis=dict(gridcolor='white', linecolor='white'),
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-    st.plotly_chart(fig_construction_sensitivity, use_container_width=True)
+        st.table(interest_sensitivity_df)
+    
+        def build_interest_sensitivity_chart(interest_variations, interest_profit_results, profit):
+            fig_interest_sensitivity = px.line(
+                x=interest_variations, 
+                y=interest_profit_results,
+                labels={'x': 'Interest Rate (%)', 'y': 'Profit (£)'},
+                title="Profit Sensitivity to Interest Rate"
+            )
+            fig_interest_sensitivity.update_traces(
+                line=dict(color='blue', width=3),
+                mode='lines+markers',
+                marker=dict(size=8, color='blue')
+            )
+            fig_interest_sensitivity.add_hline(
+                y=profit,
+                line=dict(color='red', width=1, dash='dash'),
+                annotation_text="Current Profit",
+                annotation_position="bottom right"
+            )
+            fig_interest_sensitivity.update_layout(
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                xaxis=dict(gridcolor='white', linecolor='white'),
+                yaxis=dict(gridcolor='white', linecolor='white'),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            return fig_interest_sensitivity
+
+        fig_interest_sensitivity = dashboard_utils.cached_figure(build_interest_sensitivity_chart, interest_variations, interest_profit_results, profit)
+        st.plotly_chart(fig_interest_sensitivity, use_container_width=True)
+
+        # 4. One-way sensitivity for any input, at any resolution
+        st.subheader("Input Sensitivity")
+        curve_col1, curve_col2, curve_col3 = st.columns(3)
+        with curve_col1:
+            curve_input = st.selectbox("Input", development_model.PARAM_NAMES, index=development_model.PARAM_NAMES.index('land_cost'), format_func=lambda name: name.replace('_', ' ').capitalize(), key="curve_input")
+        with curve_col2:
+            curve_percent = st.slider("Range (± %)", min_value=5, max_value=90, value=20, step=5, key="curve_percent")
+        with curve_col3:
+            curve_points = st.slider("Points", min_value=9, max_value=sensitivity.MAX_CURVE_POINTS, value=200, step=1, key="curve_points")
+
+        curve_values = sensitivity.spread(params[curve_input], curve_percent, curve_points)
+        input_curve = dashboard_utils.development_curve(params, curve_input, curve_values, cost_profiles)
+        curve_profit = np.broadcast_to(input_curve['profit'], curve_values.shape)
+        curve_margin = np.broadcast_to(input_curve['profit_margin'], curve_values.shape)
+        curve_label = curve_input.replace('_', ' ').capitalize()
+
+        def build_input_sensitivity_chart(curve_values, curve_profit, curve_margin, curve_label, current_value, profit):
+            fig_input_sensitivity = go.Figure()
+            fig_input_sensitivity.add_trace(go.Scatter(
+                x=curve_values,
+                y=curve_profit,
+                mode='lines',
+                name='Profit (£)',
+                line=dict(color='blue', width=3)
+            ))
+            fig_input_sensitivity.add_trace(go.Scatter(
+                x=curve_values,
+                y=curve_margin,
+                mode='lines',
+                name='Profit Margin (%)',
+                line=dict(color='green', width=2, dash='dot'),
+                yaxis='y2'
+            ))
+            fig_input_sensitivity.add_hline(
+                y=profit,
+                line=dict(color='red', width=1, dash='dash'),
+                annotation_text="Current Profit",
+                annotation_position="bottom right"
+            )
+            fig_input_sensitivity.add_vline(x=current_value, line=dict(color='black', width=1, dash='dash'))
+            fig_input_sensitivity.update_layout(
+                title=f"Profit Sensitivity to {curve_label}",
+                xaxis=dict(title=curve_label),
+                yaxis=dict(title='Profit (£)'),
+                yaxis2=dict(title='Profit Margin (%)', overlaying='y', side='right'),
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                margin=dict(l=20, r=20, t=60, b=20)
+            )
+            return fig_input_sensitivity
+
+        fig_input_sensitivity = dashboard_utils.cached_figure(build_input_sensitivity_chart, curve_values, curve_profit, curve_margin, curve_label, params[curve_input], profit)
+        st.plotly_chart(fig_input_sensitivity, use_container_width=True)
+        st.markdown(
+            f"Over ±{curve_percent}% of {curve_label.lower()}, profit ranges from **£{curve_profit.min():,.0f}** "
+            f"to **£{curve_profit.max():,.0f}**."
+        )
 
-    # 3. Interest rate sensitivity
-    st.subheader("Interest Rate Sensitivity")
-    interest_variations = np.linspace(max(0.5, interest_rate - 2), interest_rate + 2, 9)
-    interest_profit_results = []
-    interest_margin_results = []
-    
-    for rate in interest_variations:
-        new_interest_cost = loan_amount * (rate / 100) * (average_loan_duration / 12)
-        new_finance_costs = arrangement_fee + new_interest_cost + legal_fees_finance + monitoring_surveyor_fees
-        
-        new_total_cost = (
-            total_acquisition_costs + 
-            total_planning_design_costs + 
-            total_construction_costs + 
-            total_professional_fees + 
-            new_finance_costs + 
-            total_marketing_disposal_costs
+        # 5. Two-way sensitivity
+        st.subheader("Two-Way Profit Sensitivity")
+        grid_pairs = {
+            "Sales Price × Construction Cost": (
+                'sales_price_per_sqft', 'Sales Price (£/sq ft)', sales_price_per_sqft * 0.8, sales_price_per_sqft * 1.2,
+                'construction_cost_per_sqft', 'Construction Cost (£/sq ft)', construction_cost_per_sqft * 0.8, construction_cost_per_sqft * 1.2
+            ),
+            "Interest Rate × Project Duration": (
+                'interest_rate', 'Interest Rate (%)', max(0.5, interest_rate - 2), interest_rate + 2,
+                'project_duration_months', 'Project Duration (months)', max(1, project_duration_months - 12), project_duration_months + 24
+            )
+        }
+        grid_col1, grid_col2 = st.columns(2)
+        with grid_col1:
+            grid_pair = st.selectbox("Inputs", list(grid_pairs), key="grid_pair")
+        with grid_col2:
+            grid_points = st.slider("Grid Resolution", min_value=20, max_value=sensitivity.MAX_GRID_POINTS, value=100, step=10, key="grid_points")
+        x_name, x_label, x_low, x_high, y_name, y_label, y_low, y_high = grid_pairs[grid_pair]
+
+        grid_x = np.linspace(x_low, x_high, grid_points)
+        grid_y = np.linspace(y_low, y_high, grid_points)
+        grid_profit = dashboard_utils.development_grid(params, x_name, grid_x, y_name, grid_y, cost_profiles)['profit']
+
+        def build_grid_sensitivity_chart(grid_x, grid_y, grid_profit, x_label, y_label, current_x, current_y):
+            fig_grid_sensitivity = go.Figure()
+            fig_grid_sensitivity.add_trace(go.Heatmap(
+                x=grid_x,
+                y=grid_y,
+                z=grid_profit,
+                colorscale='RdYlGn',
+                zmid=0,
+                colorbar=dict(title='Profit (£)'),
+                hovertemplate=f'{x_label}: %{{x:,.1f}}<br>{y_label}: %{{y:,.1f}}<br>Profit: £%{{z:,.0f}}<extra></extra>'
+            ))
+            # Break-even contour
+            fig_grid_sensitivity.add_trace(go.Contour(
+                x=grid_x,
+                y=grid_y,
+                z=grid_profit,
+                contours=dict(start=0, end=0, size=1, coloring='lines', showlabels=False),
+                line=dict(color='black', width=3),
+                showscale=False,
+                hoverinfo='skip',
+                name='Break-even'
+            ))
+            fig_grid_sensitivity.add_trace(go.Scatter(
+                x=[current_x],
+                y=[current_y],
+                mode='markers',
+                marker=dict(symbol='x', size=12, color='black'),
+                name='Current'
+            ))
+            fig_grid_sensitivity.update_layout(
+                title=f"Profit by {x_label} and {y_label}",
+                xaxis=dict(title=x_label),
+                yaxis=dict(title=y_label),
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                showlegend=False,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            return fig_grid_sensitivity
+
+        fig_grid_sensitivity = dashboard_utils.cached_figure(build_grid_sensitivity_chart, grid_x, grid_y, grid_profit, x_label, y_label, params[x_name], params[y_name])
+        st.plotly_chart(fig_grid_sensitivity, use_container_width=True)
+        st.markdown(
+            f"Profit is positive in **{np.mean(grid_profit > 0)*100:.1f}%** of the {grid_points}×{grid_points} combinations shown. "
+            "The black line marks break-even."
         )
-        
-        new_profit = gross_development_value - new_total_cost
-        new_margin = (new_profit / new_total_cost) * 100
-        interest_profit_results.append(new_profit)
-        interest_margin_results.append(new_margin)
-    
-    interest_sensitivity_df = pd.DataFrame({
-        'Interest Rate (%)': [f"{rate:.1f}%" for rate in interest_variations],
-        'Profit (£)': [f"£{profit:,.0f}" for profit in interest_profit_results],
-        'Profit Margin (%)': [f"{margin:.1f}%" for margin in interest_margin_results]
-    })
-    
-    st.table(interest_sensitivity_df)
-    
-    fig_interest_sensitivity = px.line(
-        x=interest_variations, 
-        y=interest_profit_results,
-        labels={'x': 'Interest Rate (%)', 'y': 'Profit (£)'},
-        title="Profit Sensitivity to Interest Rate"
-    )
-    fig_interest_sensitivity.update_traces(
-        line=dict(color='blue', width=3),
-        mode='lines+markers',
-        marker=dict(size=8, color='blue')
-    )
-    fig_interest_sensitivity.add_hline(
-        y=profit,
-        line=dict(color='red', width=1, dash='dash'),
-        annotation_text="Current Profit",
-        annotation_position="bottom right"
-    )
-    fig_interest_sensitivity.update_layout(
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black'),
-        xaxis=dict(gridcolor='white', linecolor='white'),
-        yaxis=dict(gridcolor='white', linecolor='white'),
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-    st.plotly_chart(fig_interest_sensitivity, use_container_width=True)
+
+        # 6. Tornado across every sidebar input
+        st.subheader("Tornado Analysis")
+        tornado_col1, tornado_col2, tornado_col3 = st.columns(3)
+        with tornado_col1:
+            tornado_percent = st.slider("Perturbation (± %)", min_value=1, max_value=50, value=10, step=1, key="tornado_percent")
+        with tornado_col2:
+            tornado_metric = st.selectbox("Rank Impact On", ["Profit", "Profit on GDV"], key="tornado_metric")
+        with tornado_col3:
+            tornado_top = st.slider("Inputs Shown", min_value=5, max_value=len(development_model.PARAM_NAMES), value=15, step=1, key="tornado_top")
+
+        tornado_key, tornado_base, tornado_unit = {
+            "Profit": ('profit', profit, '£'),
+            "Profit on GDV": ('profit_on_gdv', profit_on_gdv, 'percentage points')
+        }[tornado_metric]
+        tornado_impacts = dashboard_utils.development_tornado(params, tornado_percent, profiles=cost_profiles)[tornado_key]
+        tornado_order = sensitivity.rank_by_swing(tornado_impacts)
+
+        df_tornado = pd.DataFrame({
+            'Input': [development_model.PARAM_NAMES[i] for i in tornado_order],
+            f'-{tornado_percent}%': tornado_impacts[tornado_order, 0] - tornado_base,
+            f'+{tornado_percent}%': tornado_impacts[tornado_order, 1] - tornado_base
+        })
+        df_tornado['Swing'] = (df_tornado[f'+{tornado_percent}%'] - df_tornado[f'-{tornado_percent}%']).abs()
+
+        # Largest swing at the top
+        df_tornado_top = df_tornado.head(tornado_top).iloc[::-1]
+        def build_tornado_chart(df_tornado_top, tornado_percent, tornado_metric, tornado_unit):
+            fig_tornado = go.Figure()
+            fig_tornado.add_trace(go.Bar(
+                y=df_tornado_top['Input'],
+                x=df_tornado_top[f'-{tornado_percent}%'],
+                orientation='h',
+                name=f'Input -{tornado_percent}%',
+                marker_color='red'
+            ))
+            fig_tornado.add_trace(go.Bar(
+                y=df_tornado_top['Input'],
+                x=df_tornado_top[f'+{tornado_percent}%'],
+                orientation='h',
+                name=f'Input +{tornado_percent}%',
+                marker_color='green'
+            ))
+            fig_tornado.update_layout(
+                title=f"Change in {tornado_metric} for ±{tornado_percent}% on Each Input",
+                barmode='overlay',
+                xaxis=dict(title=f"Change from Base ({tornado_unit})"),
+                height=max(400, 28 * len(df_tornado_top)),
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                margin=dict(l=20, r=20, t=60, b=20)
+            )
+            return fig_tornado
+
+        fig_tornado = dashboard_utils.cached_figure(build_tornado_chart, df_tornado_top, tornado_percent, tornado_metric, tornado_unit)
+        st.plotly_chart(fig_tornado, use_container_width=True)
+
+        st.markdown("**All Inputs Ranked by Swing**")
+        st.dataframe(df_tornado.style.format({
+            f'-{tornado_percent}%': '{:,.2f}',
+            f'+{tornado_percent}%': '{:,.2f}',
+            'Swing': '{:,.2f}'
+        }), use_container_width=True)
+
+# The PDF report includes the scenario and schedule charts, so those sections
+# are built on an export run even while collapsed
+pdf_requested = st.session_state.get("generate_pdf_report", False)
 
 # Add after the "Sensitivity Analysis" section
 st.subheader("Scenario Comparison")
 
-with st.expander("Compare Different Scenarios"):
-    st.markdown("### Create and Compare Project Scenarios")
+scenario_section = dashboard_utils.lazy_expander("Compare Different Scenarios", "scenario_section")
+with scenario_section:
+    if scenario_section.open or pdf_requested:
+        st.markdown("### Create and Compare Project Scenarios")
     
-    # Create tabs for different scenarios
-    scenario_tab1, scenario_tab2, scenario_tab3 = st.tabs(["Base Case", "Optimistic", "Pessimistic"])
-    
-    # Base case (current values)
-    with scenario_tab1:
-        st.markdown("#### Base Case Scenario")
-        st.markdown("Current project parameters")
-        
-        base_metrics = {
-            'Metric': [
-                'GDV (£)',
-                'Total Development Cost (£)',
-                'Profit (£)',
-                'Profit Margin (%)',
-                'ROE (%)',
-                'Project Duration (months)'
-            ],
-            'Value': [
-                f"{gross_development_value:,.0f}",
-                f"{total_development_costs:,.0f}",
-                f"{profit:,.0f}",
-                f"{profit_margin:.2f}",
-                f"{return_on_equity:.2f}",
-                f"{project_duration_months}"
-            ]
-        }
-        
-        st.table(pd.DataFrame(base_metrics))
-    
-    # Optimistic scenario
-    with scenario_tab2:
-        st.markdown("#### Optimistic Scenario")
-        
-        # Optimistic adjustments
+        # Optimistic and pessimistic adjustments
         opt_sales_price = sales_price_per_sqft * 1.1
         opt_construction_cost = construction_cost_per_sqft * 0.9
         opt_interest_rate = max(interest_rate - 1, 0.5)
         opt_duration = max(project_duration_months - 3, 12)
-        
-        # Recalculate with optimistic values
-        opt_gdv = opt_sales_price * project_size_sqft
-        
-        opt_construction_total = (opt_construction_cost * project_size_sqft) + fit_out_cost + external_works
-        opt_construction_contingency = opt_construction_total * (construction_contingency_percent / 100)
-        opt_construction_costs = opt_construction_total + opt_construction_contingency
-        
-        opt_prof_fees = opt_construction_costs * ((project_management_percent + quantity_surveyor_percent) / 100) + building_control_fees + health_safety_fees
-        
-        opt_dev_cost_before_finance = total_acquisition_costs + total_planning_design_costs + opt_construction_costs + opt_prof_fees
-        opt_loan_amount = opt_dev_cost_before_finance * (loan_to_cost_ratio / 100)
-        opt_interest_cost = opt_loan_amount * (opt_interest_rate / 100) * (opt_duration / 2 / 12)
-        opt_finance_costs = arrangement_fee + opt_interest_cost + legal_fees_finance + monitoring_surveyor_fees
-        
-        opt_total_costs = total_acquisition_costs + total_planning_design_costs + opt_construction_costs + opt_prof_fees + opt_finance_costs + total_marketing_disposal_costs
-        
-        opt_profit = opt_gdv - opt_total_costs
-        opt_margin = (opt_profit / opt_total_costs) * 100
-        opt_equity = opt_dev_cost_before_finance - opt_loan_amount
-        opt_roe = (opt_profit / opt_equity) * 100
-        
-        # Display optimistic metrics
-        opt_metrics = {
-            'Metric': [
-                'GDV (£)',
-                'Total Development Cost (£)',
-                'Profit (£)',
-                'Profit Margin (%)',
-                'ROE (%)',
-                'Project Duration (months)'
-            ],
-            'Value': [
-                f"{opt_gdv:,.0f}",
-                f"{opt_total_costs:,.0f}",
-                f"{opt_profit:,.0f}",
-                f"{opt_margin:.2f}",
-                f"{opt_roe:.2f}",
-                f"{opt_duration}"
-            ],
-            'Change from Base': [
-                f"{((opt_gdv/gross_development_value)-1)*100:+.1f}%",
-                f"{((opt_total_costs/total_development_costs)-1)*100:+.1f}%",
-                f"{((opt_profit/profit)-1)*100:+.1f}%",
-                f"{opt_margin-profit_margin:+.2f}%",
-                f"{opt_roe-return_on_equity:+.2f}%",
-                f"{opt_duration-project_duration_months:+d}"
-            ]
-        }
-        
-        st.table(pd.DataFrame(opt_metrics))
-        
-        # Key assumptions
-        st.markdown("**Key Assumptions:**")
-        st.markdown(f"- Sales price increased by 10% (£{sales_price_per_sqft:.0f} → £{opt_sales_price:.0f})")
-        st.markdown(f"- Construction cost reduced by 10% (£{construction_cost_per_sqft:.0f} → £{opt_construction_cost:.0f})")
-        st.markdown(f"- Interest rate reduced by 1% ({interest_rate:.1f}% → {opt_interest_rate:.1f}%)")
-        st.markdown(f"- Project duration reduced by 3 months ({project_duration_months} → {opt_duration})")
-    
-    # Pessimistic scenario
-    with scenario_tab3:
-        st.markdown("#### Pessimistic Scenario")
-        
-        # Pessimistic adjustments
         pes_sales_price = sales_price_per_sqft * 0.9
         pes_construction_cost = construction_cost_per_sqft * 1.15
         pes_interest_rate = interest_rate + 1.5
         pes_duration = project_duration_months + 6
+
+        # Both scenarios through the appraisal in one broadcast call: index 0 is optimistic, 1 pessimistic
+        scenario_appraisal = dashboard_utils.development_appraisal({
+            **params,
+            'sales_price_per_sqft': np.array([opt_sales_price, pes_sales_price]),
+            'construction_cost_per_sqft': np.array([opt_construction_cost, pes_construction_cost]),
+            'interest_rate': np.array([opt_interest_rate, pes_interest_rate]),
+            'project_duration_months': np.array([opt_duration, pes_duration])
+        }, cost_profiles)
+        opt_gdv, pes_gdv = scenario_appraisal['gross_development_value']
+        opt_total_costs, pes_total_costs = scenario_appraisal['total_development_costs']
+        opt_profit, pes_profit = scenario_appraisal['profit']
+        opt_margin, pes_margin = scenario_appraisal['profit_margin']
+        opt_roe, pes_roe = scenario_appraisal['return_on_equity']
+
+        # Create tabs for different scenarios
+        scenario_tab1, scenario_tab2, scenario_tab3 = st.tabs(["Base Case", "Optimistic", "Pessimistic"])
+    
+        # Base case (current values)
+        with scenario_tab1:
+            st.markdown("#### Base Case Scenario")
+            st.markdown("Current project parameters")
         
-        # Recalculate with pessimistic values
-        pes_gdv = pes_sales_price * project_size_sqft
-        
-        pes_construction_total = (pes_construction_cost * project_size_sqft) + fit_out_cost + external_works
-        pes_construction_contingency = pes_construction_total * (construction_contingency_percent / 100)
-        pes_construction_costs = pes_construction_total + pes_construction_contingency
+            base_metrics = {
+                'Metric': [
+                    'GDV (£)',
+                    'Total Development Cost (£)',
+                    'Profit (£)',
+                    'Profit Margin (%)',
+                    'ROE (%)',
+                    'Project Duration (months)'
+                ],
+                'Value': [
+                    f"{gross_development_value:,.0f}",
+                    f"{total_development_costs:,.0f}",
+                    f"{profit:,.0f}",
+                    f"{profit_margin:.2f}",
+                    f"{return_on_equity:.2f}",
+                    f"{project_duration_months}"
+                ]
+            }
         
-        pes_prof_fees = pes_construction_costs * ((project_management_percent + quantity_surveyor_percent) / 100) + building_control_fees + health_safety_fees
+            st.table(pd.DataFrame(base_metrics))
+    
+        # Optimistic scenario
+        with scenario_tab2:
+            st.markdown("#### Optimistic Scenario")
         
-        pes_dev_cost_before_finance = total_acquisition_costs + total_planning_design_costs + pes_construction_costs + pes_prof_fees
-        pes_loan_amount = pes_dev_cost_before_finance * (loan_to_cost_ratio / 100)
-        pes_interest_cost = pes_loan_amount * (pes_interest_rate / 100) * (pes_duration / 2 / 12)
-        pes_finance_costs = arrangement_fee + pes_interest_cost + legal_fees_finance + monitoring_surveyor_fees
+            # Display optimistic metrics
+            opt_metrics = {
+                'Metric': [
+                    'GDV (£)',
+                    'Total Development Cost (£)',
+                    'Profit (£)',
+                    'Profit Margin (%)',
+                    'ROE (%)',
+                    'Project Duration (months)'
+                ],
+                'Value': [
+                    f"{opt_gdv:,.0f}",
+                    f"{opt_total_costs:,.0f}",
+                    f"{opt_profit:,.0f}",
+                    f"{opt_margin:.2f}",
+                    f"{opt_roe:.2f}",
+                    f"{opt_duration}"
+                ],
+                'Change from Base': [
+                    f"{((opt_gdv/gross_development_value)-1)*100:+.1f}%",
+                    f"{((opt_total_costs/total_development_costs)-1)*100:+.1f}%",
+                    f"{((opt_profit/profit)-1)*100:+.1f}%",
+                    f"{opt_margin-profit_margin:+.2f}%",
+                    f"{opt_roe-return_on_equity:+.2f}%",
+                    f"{opt_duration-project_duration_months:+d}"
+                ]
+            }
         
-        pes_total_costs = total_acquisition_costs + total_planning_design_costs + pes_construction_costs + pes_prof_fees + pes_finance_costs + total_marketing_disposal_costs
+            st.table(pd.DataFrame(opt_metrics))
         
-        pes_profit = pes_gdv - pes_total_costs
-        pes_margin = (pes_profit / pes_total_costs) * 100
-        pes_equity = pes_dev_cost_before_finance - pes_loan_amount
-        pes_roe = (pes_profit / pes_equity) * 100
+            # Key assumptions
+            st.markdown("**Key Assumptions:**")
+            st.markdown(f"- Sales price increased by 10% (£{sales_price_per_sqft:.0f} → £{opt_sales_price:.0f})")
+            st.markdown(f"- Construction cost reduced by 10% (£{construction_cost_per_sqft:.0f} → £{opt_construction_cost:.0f})")
+            st.markdown(f"- Interest rate reduced by 1% ({interest_rate:.1f}% → {opt_interest_rate:.1f}%)")
+            st.markdown(f"- Project duration reduced by 3 months ({project_duration_months} → {opt_duration})")
+    
+        # Pessimistic scenario
+        with scenario_tab3:
+            st.markdown("#### Pessimistic Scenario")
         
-        # Display pessimistic metrics
-        pes_metrics = {
-            'Metric': [
-                'GDV (£)',
-                'Total Development Cost (£)',
-                'Profit (£)',
-                'Profit Margin (%)',
-                'ROE (%)',
-                'Project Duration (months)'
-            ],
-            'Value': [
-                f"{pes_gdv:,.0f}",
-                f"{pes_total_costs:,.0f}",
-                f"{pes_profit:,.0f}",
-                f"{pes_margin:.2f}",
-                f"{pes_roe:.2f}",
-                f"{pes_duration}"
-            ],
-            'Change from Base': [
-                f"{((pes_gdv/gross_development_value)-1)*100:+.1f}%",
-                f"{((pes_total_costs/total_development_costs)-1)*100:+.1f}%",
-                f"{((pes_profit/profit)-1)*100:+.1f}%",
-                f"{pes_margin-profit_margin:+.2f}%",
-                f"{pes_roe-return_on_equity:+.2f}%",
-                f"{pes_duration-project_duration_months:+d}"
-            ]
-        }
+            # Display pessimistic metrics
+            pes_metrics = {
+                'Metric': [
+                    'GDV (£)',
+                    'Total Development Cost (£)',
+                    'Profit (£)',
+                    'Profit Margin (%)',
+                    'ROE (%)',
+                    'Project Duration (months)'
+                ],
+                'Value': [
+                    f"{pes_gdv:,.0f}",
+                    f"{pes_total_costs:,.0f}",
+                    f"{pes_profit:,.0f}",
+                    f"{pes_margin:.2f}",
+                    f"{pes_roe:.2f}",
+                    f"{pes_duration}"
+                ],
+                'Change from Base': [
+                    f"{((pes_gdv/gross_development_value)-1)*100:+.1f}%",
+                    f"{((pes_total_costs/total_development_costs)-1)*100:+.1f}%",
+                    f"{((pes_profit/profit)-1)*100:+.1f}%",
+                    f"{pes_margin-profit_margin:+.2f}%",
+                    f"{pes_roe-return_on_equity:+.2f}%",
+                    f"{pes_duration-project_duration_months:+d}"
+                ]
+            }
         
-        st.table(pd.DataFrame(pes_metrics))
+            st.table(pd.DataFrame(pes_metrics))
         
-        # Key assumptions
-        st.markdown("**Key Assumptions:**")
-        st.markdown(f"- Sales price decreased by 10% (£{sales_price_per_sqft:.0f} → £{pes_sales_price:.0f})")
-        st.markdown(f"- Construction cost increased by 15% (£{construction_cost_per_sqft:.0f} → £{pes_construction_cost:.0f})")
-        st.markdown(f"- Interest rate increased by 1.5% ({interest_rate:.1f}% → {pes_interest_rate:.1f}%)")
-        st.markdown(f"- Project duration increased by 6 months ({project_duration_months} → {pes_duration})")
-    
-    # Scenario comparison chart
-    st.markdown("### Scenario Comparison")
-    
-    scenario_data = {
-        'Scenario': ['Base Case', 'Optimistic', 'Pessimistic'],
-        'GDV': [gross_development_value, opt_gdv, pes_gdv],
-        'Total Cost': [total_development_costs, opt_total_costs, pes_total_costs],
-        'Profit': [profit, opt_profit, pes_profit],
-        'Profit Margin': [profit_margin, opt_margin, pes_margin]
-    }
-    
-    df_scenarios = pd.DataFrame(scenario_data)
-    
-    # Create bar chart for scenario comparison
-    fig_scenarios = px.bar(
-        df_scenarios,
-        x='Scenario',
-        y=['GDV', 'Total Cost', 'Profit'],
-        barmode='group',
-        title="Financial Comparison Across Scenarios",
-        labels={'value': 'Amount (£)', 'variable': 'Metric'},
-        color_discrete_sequence=['blue', 'green', 'red']
-    )
-    
-    fig_scenarios.update_layout(
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black'),
-        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
-        margin=dict(l=20, r=20, t=60, b=20)
-    )
-    
-    st.plotly_chart(fig_scenarios, use_container_width=True)
+            # Key assumptions
+            st.markdown("**Key Assumptions:**")
+            st.markdown(f"- Sales price decreased by 10% (£{sales_price_per_sqft:.0f} → £{pes_sales_price:.0f})")
+            st.markdown(f"- Construction cost increased by 15% (£{construction_cost_per_sqft:.0f} → £{pes_construction_cost:.0f})")
+            st.markdown(f"- Interest rate increased by 1.5% ({interest_rate:.1f}% → {pes_interest_rate:.1f}%)")
+            st.markdown(f"- Project duration increased by 6 months ({project_duration_months} → {pes_duration})")
+    
+        # Scenario comparison chart
+        st.markdown("### Scenario Comparison")
+    
+        scenario_data = {
+            'Scenario': ['Base Case', 'Optimistic', 'Pessimistic'],
+            'GDV': [gross_development_value, opt_gdv, pes_gdv],
+            'Total Cost': [total_development_costs, opt_total_costs, pes_total_costs],
+            'Profit': [profit, opt_profit, pes_profit],
+            'Profit Margin': [profit_margin, opt_margin, pes_margin]
+        }
     
-    # Create profit margin comparison
-    fig_margins = px.bar(
-        df_scenarios,
-        x='Scenario',
-        y='Profit Margin',
-        title="Profit Margin Comparison Across Scenarios",
-        labels={'Profit Margin': 'Profit Margin (%)'}
-    )
+        df_scenarios = pd.DataFrame(scenario_data)
+    
+        # Create bar chart for scenario comparison
+        def build_scenario_chart(df_scenarios):
+            fig_scenarios = px.bar(
+                df_scenarios,
+                x='Scenario',
+                y=['GDV', 'Total Cost', 'Profit'],
+                barmode='group',
+                title="Financial Comparison Across Scenarios",
+                labels={'value': 'Amount (£)', 'variable': 'Metric'},
+                color_discrete_sequence=['blue', 'green', 'red']
+            )
+    
+            fig_scenarios.update_layout(
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                margin=dict(l=20, r=20, t=60, b=20)
+            )
+            return fig_scenarios
+
+        fig_scenarios = dashboard_utils.cached_figure(build_scenario_chart, df_scenarios)
+    
+        st.plotly_chart(fig_scenarios, use_container_width=True)
+    
+        # Create profit margin comparison
+        fig_margins = px.bar(
+            df_scenarios,
+            x='Scenario',
+            y='Profit Margin',
+            title="Profit Margin Comparison Across Scenarios",
+            labels={'Profit Margin': 'Profit Margin (%)'}
+        )
     
-    fig_margins.update_traces(
-        marker_color=[
-            'blue',  # Base case
-            'green', # Optimistic
-            'red'   # Pessimistic
-        ]
-    )
+        fig_margins.update_traces(
+            marker_color=[
+                'blue',  # Base case
+                'green', # Optimistic
+                'red'   # Pessimistic
+            ]
+        )
     
-    fig_margins.update_layout(
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black'),
-        margin=dict(l=20, r=20, t=60, b=20)
-    )
+        fig_margins.update_layout(
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(color='black'),
+            margin=dict(l=20, r=20, t=60, b=20)
+        )
 
 # Risk Analysis
 st.subheader("Risk Analysis")
 
-with st.expander("Project Risk Assessment"):
-    # Create a simple risk matrix
-    risk_data = {
-        'Risk Factor': [
-            'Planning Permission Delay',
-            'Construction Cost Overrun',
-            'Interest Rate Increase',
-            'Sales Price Decrease',
-            'Construction Delay',
-            'Supply Chain Issues',
-            'Labor Shortages',
-            'Regulatory Changes',
-            'Market Downturn'
-        ],
-        'Impact (1-5)': [4, 5, 3, 5, 4, 3, 3, 2, 5],
-        'Probability (1-5)': [3, 4, 3, 2, 3, 3, 2, 2, 2],
-    }
-    
-    df_risk = pd.DataFrame(risk_data)
-    df_risk['Risk Score'] = df_risk['Impact (1-5)'] * df_risk['Probability (1-5)']
-    df_risk['Risk Level'] = df_risk['Risk Score'].apply(
-        lambda x: 'High' if x >= 16 else ('Medium' if x >= 9 else 'Low')
-    )
-    
-    # Sort by risk score
-    df_risk = df_risk.sort_values('Risk Score', ascending=False)
-    
-    # Display risk matrix
-    fig_risk = px.scatter(
-        df_risk, 
-        x='Probability (1-5)', 
-        y='Impact (1-5)', 
-        size='Risk Score',
-        color='Risk Level',
-        color_discrete_map={
-            'High': 'red', 
-            'Medium': 'yellow', 
-            'Low': 'green'
-        },
-        text='Risk Factor',
-        title="Risk Assessment Matrix"
-    )
+risk_section = dashboard_utils.lazy_expander("Project Risk Assessment", "risk_section")
+with risk_section:
+    if risk_section.open:
+        # Create a simple risk matrix
+        risk_data = {
+            'Risk Factor': [
+                'Planning Permission Delay',
+                'Construction Cost Overrun',
+                'Interest Rate Increase',
+                'Sales Price Decrease',
+                'Construction Delay',
+                'Supply Chain Issues',
+                'Labor Shortages',
+                'Regulatory Changes',
+                'Market Downturn'
+            ],
+            'Impact (1-5)': [4, 5, 3, 5, 4, 3, 3, 2, 5],
+            'Probability (1-5)': [3, 4, 3, 2, 3, 3, 2, 2, 2],
+        }
     
-    fig_risk.update_traces(
-        textposition='top center',
-        marker=dict(line=dict(width=1, color='black'))
-    )
-    fig_risk.update_layout(
-        xaxis=dict(range=[0.5, 5.5], title='Probability', gridcolor='white'),
-        yaxis=dict(range=[0.5, 5.5], title='Impact', gridcolor='white'),
-        height=500,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black')
-    )
+        df_risk = pd.DataFrame(risk_data)
+        df_risk['Risk Score'] = df_risk['Impact (1-5)'] * df_risk['Probability (1-5)']
+        df_risk['Risk Level'] = df_risk['Risk Score'].apply(
+            lambda x: 'High' if x >= 16 else ('Medium' if x >= 9 else 'Low')
+        )
     
-    st.plotly_chart(fig_risk, use_container_width=True)
-    st.table(df_risk)
+        # Sort by risk score
+        df_risk = df_risk.sort_values('Risk Score', ascending=False)
+    
+        # Display risk matrix
+        def build_risk_matrix(df_risk):
+            fig_risk = px.scatter(
+                df_risk, 
+                x='Probability (1-5)', 
+                y='Impact (1-5)', 
+                size='Risk Score',
+                color='Risk Level',
+                color_discrete_map={
+                    'High': 'red', 
+                    'Medium': 'yellow', 
+                    'Low': 'green'
+                },
+                text='Risk Factor',
+                title="Risk Assessment Matrix"
+            )
+    
+            fig_risk.update_traces(
+                textposition='top center',
+                marker=dict(line=dict(width=1, color='black'))
+            )
+            fig_risk.update_layout(
+                xaxis=dict(range=[0.5, 5.5], title='Probability', gridcolor='white'),
+                yaxis=dict(range=[0.5, 5.5], title='Impact', gridcolor='white'),
+                height=500,
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black')
+            )
+            return fig_risk
+
+        fig_risk = dashboard_utils.cached_figure(build_risk_matrix, df_risk)
+    
+        st.plotly_chart(fig_risk, use_container_width=True)
+        st.table(df_risk)
+
+# Monte Carlo Simulation
+st.subheader("Monte Carlo Simulation")
+
+with st.expander("Simulation Settings", expanded=False):
+    st.markdown("Set a low, most likely and high value for each uncertain input. For normal distributions the low and high are the 5th and 95th percentiles.")
+    mc_draws = st.select_slider("Number of Draws", options=[10000, 25000, 50000, 100000], value=100000)
+    mc_seed = st.number_input("Random Seed", min_value=0, value=42, step=1)
+
+    # (input, label, default distribution, default low, most likely, high, floor)
+    mc_inputs_config = [
+        ('sales_price_per_sqft', 'Sales Price (£ per sq ft)', 'normal', sales_price_per_sqft * 0.88, sales_price_per_sqft, sales_price_per_sqft * 1.12, 0.0),
+        ('construction_cost_per_sqft', 'Construction Cost (£ per sq ft)', 'triangular', construction_cost_per_sqft * 0.95, construction_cost_per_sqft, construction_cost_per_sqft * 1.2, 0.0),
+        ('interest_rate', 'Interest Rate (%)', 'normal', max(interest_rate - 1.5, 0.1), interest_rate, interest_rate + 1.5, 0.0),
+        ('project_duration_months', 'Project Duration (months)', 'triangular', max(project_duration_months - 3, 1), project_duration_months, project_duration_months + 9, 1.0),
+        ('contingency_drawdown_percent', 'Contingency Drawdown (% of allowance)', 'triangular', 25.0, 75.0, 125.0, 0.0)
+    ]
+    mc_ranges = {}
+    for name, label, default_dist, default_low, default_mode, default_high, floor in mc_inputs_config:
+        dist_col, low_col, mode_col, high_col = st.columns(4)
+        with dist_col:
+            dist = st.selectbox(label, ['triangular', 'normal', 'uniform'], index=['triangular', 'normal', 'uniform'].index(default_dist), key=f"mc_dist_{name}")
+        with low_col:
+            low = st.number_input("Low", value=float(default_low), key=f"mc_low_{name}")
+        with mode_col:
+            mode = st.number_input("Most Likely", value=float(default_mode), key=f"mc_mode_{name}")
+        with high_col:
+            high = st.number_input("High", value=float(default_high), key=f"mc_high_{name}")
+        mc_ranges[name] = (dist, low, mode, high, floor)
+
+    st.markdown("**Correlations**")
+    corr_col1, corr_col2, corr_col3 = st.columns(3)
+    with corr_col1:
+        mc_corr_price_cost = st.slider("Sales Price vs Construction Cost", min_value=-0.9, max_value=0.9, value=0.0, step=0.1)
+    with corr_col2:
+        mc_corr_rate_price = st.slider("Interest Rate vs Sales Price", min_value=-0.9, max_value=0.9, value=0.0, step=0.1)
+    with corr_col3:
+        mc_corr_cost_duration = st.slider("Construction Cost vs Duration", min_value=-0.9, max_value=0.9, value=0.0, step=0.1)
+    mc_correlation = {
+        ('sales_price_per_sqft', 'construction_cost_per_sqft'): mc_corr_price_cost,
+        ('interest_rate', 'sales_price_per_sqft'): mc_corr_rate_price,
+        ('construction_cost_per_sqft', 'project_duration_months'): mc_corr_cost_duration
+    }
+
+mc_inputs = (params, cost_profiles, mc_ranges, mc_correlation, mc_draws, mc_seed)
+
+if st.button("Run Monte Carlo Simulation"):
+    try:
+        mc_distributions = {name: montecarlo.range_distribution(*mc_range) for name, mc_range in mc_ranges.items()}
+        # Durations are simulated in whole months
+        mc_distributions['project_duration_months']['round'] = True
+        with st.spinner(f"Appraising {mc_draws:,} scenarios..."):
+            mc_outputs = montecarlo.simulate(
+                lambda draws: montecarlo.development_outputs(draws, cost_profiles),
+                params,
+                mc_distributions,
+                draws=mc_draws,
+                seed=int(mc_seed),
+                chunk_size=development_model.BATCH_CHUNK_SIZE,
+                correlation=mc_correlation
+            )
+        # Keep only the summary and a histogram so session state stays small
+        st.session_state.development_monte_carlo = {
+            'inputs': mc_inputs,
+            'summary': montecarlo.summarize(mc_outputs, [5, 10, 50, 90, 95]),
+            'prob_loss': float(np.mean(mc_outputs['profit'] < 0)),
+            'histogram': np.histogram(mc_outputs['profit'], bins=60)
+        }
+    except ValueError as e:
+        st.error(f"Simulation failed: {e}")
+
+mc_results = st.session_state.get('development_monte_carlo')
+if mc_results is None:
+    st.info("Set the distributions above and click 'Run Monte Carlo Simulation' to see the range of outcomes.")
+else:
+    if mc_results['inputs'] != mc_inputs:
+        st.warning("Inputs have changed since the last simulation. Re-run it to update these results.")
+
+    mc_summary = mc_results['summary']
+    mc_metric_col1, mc_metric_col2, mc_metric_col3 = st.columns(3)
+    with mc_metric_col1:
+        st.metric("Probability of Loss", f"{mc_results['prob_loss']*100:.1f}%")
+    with mc_metric_col2:
+        st.metric("Median Profit", f"£{mc_summary['profit'][50]:,.0f}")
+    with mc_metric_col3:
+        st.metric("P95 Peak Funding", f"£{mc_summary['peak_funding'][95]:,.0f}")
+
+    # Profit distribution
+    mc_counts, mc_edges = mc_results['histogram']
+    mc_centers = (mc_edges[:-1] + mc_edges[1:]) / 2
+    def build_monte_carlo_chart(mc_centers, mc_counts):
+        fig_monte_carlo = go.Figure()
+        fig_monte_carlo.add_trace(go.Bar(
+            x=mc_centers,
+            y=mc_counts / mc_counts.sum() * 100,
+            name="Profit",
+            marker_color=np.where(mc_centers < 0, 'red', 'blue')
+        ))
+        fig_monte_carlo.add_vline(x=0, line=dict(color='black', width=1, dash='dash'), annotation_text="Break-even")
+        fig_monte_carlo.update_layout(
+            title='Distribution of Development Profit',
+            xaxis=dict(title='Profit (£)'),
+            yaxis=dict(title='Share of Draws (%)'),
+            bargap=0,
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(color='black')
+        )
+        return fig_monte_carlo
+
+    fig_monte_carlo = dashboard_utils.cached_figure(build_monte_carlo_chart, mc_centers, mc_counts)
+    st.plotly_chart(fig_monte_carlo, use_container_width=True)
+
+    # Percentile table
+    df_monte_carlo = pd.DataFrame({
+        'Percentile': [f"P{percentile}" for percentile in mc_summary['profit']],
+        'Profit (£)': [f"£{value:,.0f}" for value in mc_summary['profit'].values()],
+        'Profit on Cost (%)': [f"{value:.2f}%" for value in mc_summary['profit_margin'].values()],
+        'Total Development Costs (£)': [f"£{value:,.0f}" for value in mc_summary['total_development_costs'].values()],
+        'Peak Funding (£)': [f"£{value:,.0f}" for value in mc_summary['peak_funding'].values()],
+        'NPV (£)': [f"£{value:,.0f}" for value in mc_summary['npv'].values()],
+        'Equity IRR (%)': [f"{value:.2f}%" for value in mc_summary['equity_irr'].values()],
+        'Peak Debt (£)': [f"£{value:,.0f}" for value in mc_summary['peak_debt'].values()]
+    })
+    st.table(df_monte_carlo)
 
 # Project Profitability Analysis
 st.subheader("Project Profitability Analysis")
@@ -1045,7 +1385,10 @@ profitability_data = {
         'Profit on Cost',
         'Profit on GDV',
         'Return on Equity',
-        'Internal Rate of Return (IRR)',
+        'Equity IRR',
+        'Project IRR',
+        f'NPV at {discount_rate:.1f}%',
+        'Discounted Payback',
         'Payback Period'
     ],
     'Value': [
@@ -1053,7 +1396,10 @@ profitability_data = {
         f"{profit_margin:.2f}%",
         f"{profit_on_gdv:.2f}%",
         f"{return_on_equity:.2f}%",
-        f"{return_on_equity / (project_duration_months/12):.2f}%",  # Simplified IRR
+        f"{equity_irr:.2f}%" if np.isfinite(equity_irr) else "N/A",
+        f"{project_irr:.2f}%" if np.isfinite(project_irr) else "N/A",
+        f"£{npv:,.0f}",
+        f"{discounted_payback_months:.1f} months" if np.isfinite(discounted_payback_months) else "Not reached",
         f"{project_duration_months} months"
     ],
     'Industry Benchmark': [
@@ -1062,6 +1408,9 @@ profitability_data = {
         '12-18%',
         '20-25%',
         '15-25%',
+        f'Above {discount_rate:.1f}%',
+        'Above £0',
+        'Within project',
         '24-36 months'
     ],
     'Status': [
@@ -1069,7 +1418,10 @@ profitability_data = {
         'Good' if profit_margin >= 15 else ('Average' if profit_margin >= 10 else 'Poor'),
         'Good' if profit_on_gdv >= 12 else ('Average' if profit_on_gdv >= 8 else 'Poor'),
         'Good' if return_on_equity >= 20 else ('Average' if return_on_equity >= 15 else 'Poor'),
-        'Good' if return_on_equity / (project_duration_months/12) >= 15 else ('Average' if return_on_equity / (project_duration_months/12) >= 10 else 'Poor'),
+        'Good' if equity_irr >= 15 else ('Average' if equity_irr >= 10 else 'Poor'),
+        'Good' if project_irr >= discount_rate else 'Poor',
+        'Good' if npv >= 0 else 'Poor',
+        'Good' if discounted_payback_months <= project_duration_months else 'Poor',
         'Good' if project_duration_months <= 24 else ('Average' if project_duration_months <= 36 else 'Poor')
     ]
 }
@@ -1120,112 +1472,124 @@ st.markdown("Property Development Financial Dashboard - Created for Central Lond
 # Add after the "Project Timeline & Cashflow" section
 st.subheader("Project Timeline Gantt Chart")
 
-with st.expander("Project Schedule"):
-    # Create a sample project schedule
-    today = datetime.now().date()
-    project_start_date = st.date_input("Project Start Date", today)
-    
-    # Calculate end dates based on durations
-    acquisition_duration = 1  # month
-    planning_duration = min(6, project_duration_months // 4)
-    design_duration = min(4, project_duration_months // 6)
-    construction_duration = max(project_duration_months - planning_duration - design_duration - acquisition_duration - 2, 
-                               project_duration_months // 2)
-    marketing_duration = min(6, project_duration_months // 4)
-    
-    # Create task data
-    tasks = [
-        dict(Task="Acquisition", Start=project_start_date, 
-             Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration),
-             Resource="Acquisition"),
-        dict(Task="Planning", 
-             Start=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration),
-             Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration),
-             Resource="Planning"),
-        dict(Task="Design", 
-             Start=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration - 1),
-             Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration - 1),
-             Resource="Design"),
-        dict(Task="Construction", 
-             Start=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration - 2),
-             Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 2),
-             Resource="Construction"),
-        dict(Task="Marketing & Sales", 
-             Start=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 4),
-             Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=project_duration_months),
-             Resource="Marketing")
-    ]
-    
-    # Convert to DataFrame
-    df_tasks = pd.DataFrame(tasks)
-    
-    # Create Gantt chart
-    fig_gantt = px.timeline(
-        df_tasks, 
-        x_start="Start", 
-        x_end="Finish", 
-        y="Task",
-        color="Resource",
-        title="Project Schedule Gantt Chart"
-    )
-    
-    fig_gantt.update_layout(
-        xaxis_title="Date",
-        yaxis_title="Project Phase",
-        height=400
-    )
+schedule_section = dashboard_utils.lazy_expander("Project Schedule", "schedule_section", ["project_start_date"] + [f"milestone_{i}" for i in range(11)])
+with schedule_section:
+    if schedule_section.open or pdf_requested:
+        # Create a sample project schedule
+        today = datetime.now().date()
+        project_start_date = st.date_input("Project Start Date", today, key="project_start_date")
+    
+        # Calculate end dates based on durations
+        acquisition_duration = 1  # month
+        planning_duration = min(6, project_duration_months // 4)
+        design_duration = min(4, project_duration_months // 6)
+        construction_duration = max(project_duration_months - planning_duration - design_duration - acquisition_duration - 2, 
+                                   project_duration_months // 2)
+        marketing_duration = min(6, project_duration_months // 4)
+    
+        # Create task data
+        tasks = [
+            dict(Task="Acquisition", Start=project_start_date, 
+                 Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration),
+                 Resource="Acquisition"),
+            dict(Task="Planning", 
+                 Start=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration),
+                 Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration),
+                 Resource="Planning"),
+            dict(Task="Design", 
+                 Start=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration - 1),
+                 Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration - 1),
+                 Resource="Design"),
+            dict(Task="Construction", 
+                 Start=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration - 2),
+                 Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 2),
+                 Resource="Construction"),
+            dict(Task="Marketing & Sales", 
+                 Start=pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 4),
+                 Finish=pd.Timestamp(project_start_date) + pd.DateOffset(months=project_duration_months),
+                 Resource="Marketing")
+        ]
     
-    st.plotly_chart(fig_gantt, use_container_width=True)
-    
-    # Add milestone tracking
-    st.markdown("### Key Project Milestones")
-    
-    milestone_data = {
-        'Milestone': [
-            'Land Acquisition Complete',
-            'Planning Permission Granted',
-            'Design Complete',
-            'Construction Start',
-            'Superstructure Complete',
-            'Building Watertight',
-            'Fit-out Complete',
-            'Practical Completion',
-            'Marketing Launch',
-            'First Sale/Letting',
-            'Project Completion'
-        ],
-        'Planned Date': [
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration - 1),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration - 2),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration//3),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration//2),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 1),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 4),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 2),
-            pd.Timestamp(project_start_date) + pd.DateOffset(months=project_duration_months)
-        ],
-        'Status': ['Not Started'] * 11
-    }
+        # Convert to DataFrame
+        df_tasks = pd.DataFrame(tasks)
+    
+        # Create Gantt chart
+        def build_gantt_chart(df_tasks):
+            fig_gantt = px.timeline(
+                df_tasks, 
+                x_start="Start", 
+                x_end="Finish", 
+                y="Task",
+                color="Resource",
+                title="Project Schedule Gantt Chart"
+            )
+    
+            fig_gantt.update_layout(
+                xaxis_title="Date",
+                yaxis_title="Project Phase",
+                height=400
+            )
+            return fig_gantt
+
+        fig_gantt = dashboard_utils.cached_figure(build_gantt_chart, df_tasks)
+    
+        st.plotly_chart(fig_gantt, use_container_width=True)
+    
+        # Status updates rerun only this fragment, not the whole dashboard
+        @st.fragment
+        def milestone_tracker(project_start_date, acquisition_duration, planning_duration, design_duration, construction_duration, project_duration_months):
+            # Add milestone tracking
+            st.markdown("### Key Project Milestones")
+    
+            milestone_data = {
+                'Milestone': [
+                    'Land Acquisition Complete',
+                    'Planning Permission Granted',
+                    'Design Complete',
+                    'Construction Start',
+                    'Superstructure Complete',
+                    'Building Watertight',
+                    'Fit-out Complete',
+                    'Practical Completion',
+                    'Marketing Launch',
+                    'First Sale/Letting',
+                    'Project Completion'
+                ],
+                'Planned Date': [
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration - 1),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration - 2),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration//3),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration//2),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 1),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 4),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=acquisition_duration + planning_duration + design_duration + construction_duration - 2),
+                    pd.Timestamp(project_start_date) + pd.DateOffset(months=project_duration_months)
+                ],
+                'Status': ['Not Started'] * 11
+            }
     
-    df_milestones = pd.DataFrame(milestone_data)
+            df_milestones = pd.DataFrame(milestone_data)
     
-    # Allow status updates
-    for i, milestone in enumerate(df_milestones['Milestone']):
-        status = st.selectbox(
-            f"Status - {milestone}",
-            options=['Not Started', 'In Progress', 'Completed', 'Delayed'],
-            key=f"milestone_{i}"
-        )
-        df_milestones.loc[i, 'Status'] = status
+            # Allow status updates
+            for i, milestone in enumerate(df_milestones['Milestone']):
+                status = st.selectbox(
+                    f"Status - {milestone}",
+                    options=['Not Started', 'In Progress', 'Completed', 'Delayed'],
+                    key=f"milestone_{i}"
+                )
+                df_milestones.loc[i, 'Status'] = status
     
-    # Format dates for display
-    df_milestones['Planned Date'] = df_milestones['Planned Date'].dt.strftime('%d %b %Y')
+            # Format dates for display
+            df_milestones['Planned Date'] = df_milestones['Planned Date'].dt.strftime('%d %b %Y')
     
-    # Display milestone table
-    st.table(df_milestones)
+            # Display milestone table
+            st.table(df_milestones)
+            return df_milestones
+
+        df_milestones = milestone_tracker(project_start_date, acquisition_duration, planning_duration, design_duration, construction_duration, project_duration_months)
 
 # Add this function after the imports
 def create_pdf_report(project_name, project_location, project_type, project_size_sqft, 
@@ -1398,7 +1762,7 @@ with export_col1:
     email_address = st.text_input("Email address for report delivery (optional)")
 
 with export_col2:
-    export_button = st.button("Generate PDF Report")
+    export_button = st.button("Generate PDF Report", key="generate_pdf_report")
 
 if export_button:
     with st.spinner("Generating PDF report..."):
@@ -19,6 +19,16 @@ from fpdf import FPDF
 import plotly.io as pio
 from PIL import Image
 
+import booking_sim
+import clinic_model
+import dashboard_utils
+import dataflow
+import montecarlo
+import optimizer
+import portfolio
+import sensitivity
+import week_profile
+
 # Set page configuration
 st.set_page_config(
     page_title="Longevity Clinic Financial Dashboard",
@@ -72,8 +82,37 @@ with st.sidebar.expander("Business Details", expanded=True):
     business_type = st.selectbox("Business Type", ["Wellness Center", "Medical Clinic", "Spa & Wellness", "Longevity Clinic"])
     business_location = st.text_input("Location", "Hatch End, London")
     business_size_sqft = st.number_input("Business Size (sq ft)", min_value=500, value=1600, step=100)
-    operating_hours_weekly = st.number_input("Operating Hours per Week", min_value=20, value=66, step=1)
-    
+    weekday_hours = st.slider("Weekday Opening Hours", min_value=0, max_value=24, value=week_profile.WEEKDAY_HOURS, step=1)
+    weekend_hours = st.slider("Weekend Opening Hours", min_value=0, max_value=24, value=week_profile.WEEKEND_HOURS, step=1)
+
+with st.sidebar.expander("Weekly Demand & Pricing", expanded=False):
+    st.markdown(f"Demand after {week_profile.AFTER_WORK_HOUR}:00 on weekdays and at weekends, relative to weekday daytime, and the discount on weekday daytime (off-peak) sessions.")
+    week_settings = st.data_editor(
+        pd.DataFrame({
+            'After-Work Demand (×)': 1.0,
+            'Weekend Demand (×)': 1.0,
+            'Off-Peak Discount (%)': 0.0
+        }, index=clinic_model.SERVICES),
+        column_config={
+            'After-Work Demand (×)': st.column_config.NumberColumn(min_value=0.0, max_value=5.0, step=0.1),
+            'Weekend Demand (×)': st.column_config.NumberColumn(min_value=0.0, max_value=5.0, step=0.1),
+            'Off-Peak Discount (%)': st.column_config.NumberColumn(min_value=0.0, max_value=100.0, step=5.0)
+        },
+        key="week_settings"
+    )
+
+# Hour-of-week profile; every projection below runs over it
+week = week_profile.build(
+    weekday_hours,
+    weekend_hours,
+    week_settings['After-Work Demand (×)'].to_numpy(dtype=float),
+    week_settings['Weekend Demand (×)'].to_numpy(dtype=float),
+    week_settings['Off-Peak Discount (%)'].to_numpy(dtype=float)
+)
+operating_hours_weekly = week_profile.weekly_hours(week)
+operating_days_weekly = week_profile.open_days(week)
+st.sidebar.caption(f"Open {operating_hours_weekly:.0f} hours a week over {operating_days_weekly} days.")
+
 with st.sidebar.expander("Initial Investment", expanded=True):
     renovation_cost = st.number_input("Renovation Cost (£)", min_value=10000, value=135000, step=5000)
     equipment_cost = st.number_input("Equipment Cost (£)", min_value=10000, value=50000, step=5000)
@@ -117,6 +156,9 @@ with st.sidebar.expander("Capacity & Utilization", expanded=True):
     infrared_sauna_utilization_factor = st.slider("Infrared Sauna Utilization Factor", min_value=0.5, max_value=1.5, value=1.2, step=0.1)
     iv_therapy_utilization_factor = st.slider("IV Therapy Utilization Factor", min_value=0.5, max_value=1.5, value=0.5, step=0.1)
     face_treatment_utilization_factor = st.slider("Face Treatment Utilization Factor", min_value=0.5, max_value=1.5, value=1.0, step=0.1)
+    
+    # Shape of the month-by-month ramp between the starting and ending utilization
+    utilization_ramp = st.selectbox("Monthly Utilization Ramp", ["Linear", "Logistic"])
 
 with st.sidebar.expander("Operating Expenses", expanded=True):
     rent_monthly = st.number_input("Monthly Rent (£)", min_value=1000, value=5000, step=500)
@@ -138,6 +180,7 @@ with st.sidebar.expander("Growth & Inflation", expanded=True):
     price_increase_y3 = st.number_input("Price Increase Year 3 (%)", min_value=0.0, value=5.0, step=1.0)
     expense_inflation = st.number_input("Annual Expense Inflation (%)", min_value=0.0, value=3.0, step=0.5)
     maintenance_increase = st.number_input("Annual Maintenance Increase (%)", min_value=0.0, value=25.0, step=5.0)
+    discount_rate = st.number_input("Discount Rate (%)", min_value=0.0, value=10.0, step=0.5)
 
 # Add this in the "Capacity & Utilization" section
 with st.sidebar.expander("Membership Projections", expanded=True):
@@ -150,246 +193,126 @@ with st.sidebar.expander("Membership Projections", expanded=True):
     membership_growth_y3 = st.slider("Membership Growth Year 3 (%)", min_value=0, max_value=100, value=30, step=10)
 
 # Calculations
-# Initial investment
-total_initial_investment = renovation_cost + equipment_cost + marketing_branding_initial + legal_permits_licenses
-
-# Revenue calculations for Year 1
-weeks_per_year = 52
-
-# Calculate service-specific utilization rates for Year 1
-cryo_util_y1 = (year1_avg_utilization / 100) * cryotherapy_utilization_factor
-sauna_util_y1 = (year1_avg_utilization / 100) * infrared_sauna_utilization_factor
-iv_util_y1 = (year1_avg_utilization / 100) * iv_therapy_utilization_factor
-face_util_y1 = (year1_avg_utilization / 100) * face_treatment_utilization_factor
-
-# Cap utilization at 100%
-cryo_util_y1 = min(cryo_util_y1, 1.0)
-sauna_util_y1 = min(sauna_util_y1, 1.0)
-iv_util_y1 = min(iv_util_y1, 1.0)
-face_util_y1 = min(face_util_y1, 1.0)
-
-# Year 1 Revenue
-cryo_revenue_y1 = cryotherapy_price * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * cryo_util_y1
-sauna_revenue_y1 = infrared_sauna_price * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * sauna_util_y1
-iv_revenue_y1 = avg_iv_therapy_price * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * iv_util_y1
-face_revenue_y1 = face_treatment_price * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * face_util_y1
-
-# Calculate membership revenue
-silver_revenue_y1 = silver_members_y1 * silver_membership_price * 12  # Annual revenue
-gold_revenue_y1 = gold_members_y1 * gold_membership_price * 12
-platinum_revenue_y1 = platinum_members_y1 * platinum_membership_price * 12
-membership_revenue_y1 = silver_revenue_y1 + gold_revenue_y1 + platinum_revenue_y1
-
-# After calculating individual service revenues and membership revenue, add:
-total_revenue_y1 = cryo_revenue_y1 + sauna_revenue_y1 + iv_revenue_y1 + face_revenue_y1 + membership_revenue_y1
-
-# Then calculate expenses that depend on total revenue
-supplies_y1 = total_revenue_y1 * (supplies_percent_of_revenue / 100)
-marketing_y1 = total_revenue_y1 * (marketing_percent_of_revenue_y1 / 100)
-
-# Year 1 Expenses
-rent_annual = rent_monthly * 12
-staff_cost_annual = staff_count * staff_annual_salary * (1 + staff_benefits_tax_percent / 100)
-equipment_finance_annual = equipment_finance_monthly * 12
-utilities_annual = utilities_monthly * 12
-insurance_annual = insurance_annual
-
-total_expenses_y1 = (
-    rent_annual + 
-    staff_cost_annual + 
-    equipment_finance_annual + 
-    utilities_annual + 
-    supplies_y1 + 
-    insurance_annual + 
-    marketing_y1 + 
-    accounting_legal_annual + 
-    maintenance_annual + 
-    miscellaneous_annual
-)
-
-# Year 1 EBITDA
-ebitda_y1 = total_revenue_y1 - total_expenses_y1
-ebitda_margin_y1 = (ebitda_y1 / total_revenue_y1) * 100 if total_revenue_y1 > 0 else 0
-
-# Year 2 calculations
-# Price increases for Year 2
-cryo_price_y2 = cryotherapy_price * (1 + price_increase_y2 / 100)
-sauna_price_y2 = infrared_sauna_price * (1 + price_increase_y2 / 100)
-iv_price_y2 = avg_iv_therapy_price * (1 + price_increase_y2 / 100)
-face_price_y2 = face_treatment_price * (1 + price_increase_y2 / 100)
-
-# Calculate service-specific utilization rates for Year 2
-cryo_util_y2 = (year2_avg_utilization / 100) * cryotherapy_utilization_factor
-sauna_util_y2 = (year2_avg_utilization / 100) * infrared_sauna_utilization_factor
-iv_util_y2 = (year2_avg_utilization / 100) * iv_therapy_utilization_factor
-face_util_y2 = (year2_avg_utilization / 100) * face_treatment_utilization_factor
-
-# Cap utilization at 100%
-cryo_util_y2 = min(cryo_util_y2, 1.0)
-sauna_util_y2 = min(sauna_util_y2, 1.0)
-iv_util_y2 = min(iv_util_y2, 1.0)
-face_util_y2 = min(face_util_y2, 1.0)
-
-# Year 2 Revenue
-cryo_revenue_y2 = cryo_price_y2 * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * cryo_util_y2
-sauna_revenue_y2 = sauna_price_y2 * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * sauna_util_y2
-iv_revenue_y2 = iv_price_y2 * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * iv_util_y2
-face_revenue_y2 = face_price_y2 * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * face_util_y2
-
-# Calculate membership revenue
-silver_members_y2 = silver_members_y1 * (1 + membership_growth_y2/100)
-gold_members_y2 = gold_members_y1 * (1 + membership_growth_y2/100)
-platinum_members_y2 = platinum_members_y1 * (1 + membership_growth_y2/100)
-
-silver_price_y2 = silver_membership_price * (1 + price_increase_y2/100)
-gold_price_y2 = gold_membership_price * (1 + price_increase_y2/100)
-platinum_price_y2 = platinum_membership_price * (1 + price_increase_y2/100)
-
-silver_revenue_y2 = silver_members_y2 * silver_price_y2 * 12
-gold_revenue_y2 = gold_members_y2 * gold_price_y2 * 12
-platinum_revenue_y2 = platinum_members_y2 * platinum_price_y2 * 12
-membership_revenue_y2 = silver_revenue_y2 + gold_revenue_y2 + platinum_revenue_y2
-
-# After calculating individual service revenues and membership revenue, add:
-total_revenue_y2 = cryo_revenue_y2 + sauna_revenue_y2 + iv_revenue_y2 + face_revenue_y2 + membership_revenue_y2
-
-# After calculating total_revenue_y2, add:
-supplies_y2 = total_revenue_y2 * (supplies_percent_of_revenue / 100)
-
-# Year 2 Expenses with inflation
-rent_annual_y2 = rent_annual * (1 + expense_inflation / 100)
-staff_cost_annual_y2 = staff_cost_annual * (1 + expense_inflation / 100)
-utilities_annual_y2 = utilities_annual * (1 + expense_inflation / 100)
-insurance_annual_y2 = insurance_annual * (1 + expense_inflation / 100)
-marketing_y2 = total_revenue_y2 * (marketing_percent_of_revenue / 100)
-accounting_legal_annual_y2 = accounting_legal_annual * (1 + expense_inflation / 100)
-maintenance_annual_y2 = maintenance_annual * (1 + maintenance_increase / 100)
-miscellaneous_annual_y2 = miscellaneous_annual * (1 + expense_inflation / 100)
-
-total_expenses_y2 = (
-    rent_annual_y2 + 
-    staff_cost_annual_y2 + 
-    equipment_finance_annual + 
-    utilities_annual_y2 + 
-    supplies_y2 + 
-    insurance_annual_y2 + 
-    marketing_y2 + 
-    accounting_legal_annual_y2 + 
-    maintenance_annual_y2 + 
-    miscellaneous_annual_y2
-)
-
-# Year 2 EBITDA
-ebitda_y2 = total_revenue_y2 - total_expenses_y2
-ebitda_margin_y2 = (ebitda_y2 / total_revenue_y2) * 100 if total_revenue_y2 > 0 else 0
-
-# Year 3 calculations
-# Price increases for Year 3
-cryo_price_y3 = cryo_price_y2 * (1 + price_increase_y3 / 100)
-sauna_price_y3 = sauna_price_y2 * (1 + price_increase_y3 / 100)
-iv_price_y3 = iv_price_y2 * (1 + price_increase_y3 / 100)
-face_price_y3 = face_price_y2 * (1 + price_increase_y3 / 100)
-
-# Calculate service-specific utilization rates for Year 3
-cryo_util_y3 = (year3_utilization / 100) * cryotherapy_utilization_factor
-sauna_util_y3 = (year3_utilization / 100) * infrared_sauna_utilization_factor
-iv_util_y3 = (year3_utilization / 100) * iv_therapy_utilization_factor
-face_util_y3 = (year3_utilization / 100) * face_treatment_utilization_factor
-
-# Cap utilization at 100%
-cryo_util_y3 = min(cryo_util_y3, 1.0)
-sauna_util_y3 = min(sauna_util_y3, 1.0)
-iv_util_y3 = min(iv_util_y3, 1.0)
-face_util_y3 = min(face_util_y3, 1.0)
-
-# Year 3 Revenue
-cryo_revenue_y3 = cryo_price_y3 * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * cryo_util_y3
-sauna_revenue_y3 = sauna_price_y3 * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * sauna_util_y3
-iv_revenue_y3 = iv_price_y3 * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * iv_util_y3
-face_revenue_y3 = face_price_y3 * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * face_util_y3
-
-# Calculate membership revenue
-silver_members_y3 = silver_members_y2 * (1 + membership_growth_y3/100)
-gold_members_y3 = gold_members_y2 * (1 + membership_growth_y3/100)
-platinum_members_y3 = platinum_members_y2 * (1 + membership_growth_y3/100)
-
-silver_price_y3 = silver_price_y2 * (1 + price_increase_y3/100)
-gold_price_y3 = gold_price_y2 * (1 + price_increase_y3/100)
-platinum_price_y3 = platinum_price_y2 * (1 + price_increase_y3/100)
-
-silver_revenue_y3 = silver_members_y3 * silver_price_y3 * 12
-gold_revenue_y3 = gold_members_y3 * gold_price_y3 * 12
-platinum_revenue_y3 = platinum_members_y3 * platinum_price_y3 * 12
-membership_revenue_y3 = silver_revenue_y3 + gold_revenue_y3 + platinum_revenue_y3
-
-# After calculating individual service revenues and membership revenue, add:
-total_revenue_y3 = cryo_revenue_y3 + sauna_revenue_y3 + iv_revenue_y3 + face_revenue_y3 + membership_revenue_y3
-
-# After calculating total_revenue_y3, add:
-supplies_y3 = total_revenue_y3 * (supplies_percent_of_revenue / 100)
-
-# Year 3 Expenses with inflation
-rent_annual_y3 = rent_annual_y2 * (1 + expense_inflation / 100)
-# Increase staff for Year 3 (3.5 FTE as per forecast)
-staff_cost_annual_y3 = (staff_count + 0.5) * staff_annual_salary * (1 + staff_benefits_tax_percent / 100) * (1 + expense_inflation / 100)
-utilities_annual_y3 = utilities_annual_y2 * (1 + expense_inflation / 100)
-insurance_annual_y3 = insurance_annual_y2 * (1 + expense_inflation / 100)
-marketing_y3 = total_revenue_y3 * (marketing_percent_of_revenue / 100)
-accounting_legal_annual_y3 = accounting_legal_annual_y2 * (1 + expense_inflation / 100)
-maintenance_annual_y3 = maintenance_annual_y2 * (1 + maintenance_increase / 100)
-miscellaneous_annual_y3 = miscellaneous_annual_y2 * (1 + expense_inflation / 100)
-
-total_expenses_y3 = (
-    rent_annual_y3 + 
-    staff_cost_annual_y3 + 
-    equipment_finance_annual + 
-    utilities_annual_y3 + 
-    supplies_y3 + 
-    insurance_annual_y3 + 
-    marketing_y3 + 
-    accounting_legal_annual_y3 + 
-    maintenance_annual_y3 + 
-    miscellaneous_annual_y3
-)
-
-# Year 3 EBITDA
-ebitda_y3 = total_revenue_y3 - total_expenses_y3
-ebitda_margin_y3 = (ebitda_y3 / total_revenue_y3) * 100 if total_revenue_y3 > 0 else 0
-
-# Break-even analysis
-monthly_fixed_costs = (
-    rent_monthly + 
-    (staff_cost_annual / 12) + 
-    equipment_finance_monthly + 
-    utilities_monthly + 
-    (insurance_annual / 12) + 
-    (accounting_legal_annual / 12) + 
-    (maintenance_annual / 12) + 
-    (miscellaneous_annual / 12)
-)
-
-# Calculate average revenue and variable cost per customer visit
-avg_service_price = (cryotherapy_price + infrared_sauna_price + avg_iv_therapy_price + face_treatment_price) / 4
-avg_variable_cost_per_visit = avg_service_price * ((supplies_percent_of_revenue + marketing_percent_of_revenue_y1) / 100)
-contribution_margin_per_visit = avg_service_price - avg_variable_cost_per_visit
-
-# Break-even calculations
-monthly_break_even_visits = monthly_fixed_costs / contribution_margin_per_visit
-weekly_break_even_visits = monthly_break_even_visits / 4.33  # Average weeks per month
-daily_break_even_visits = weekly_break_even_visits / 6  # Assuming 6 days per week operation
-
-# ROI calculations
-cumulative_ebitda_y1 = ebitda_y1
-cumulative_ebitda_y2 = ebitda_y1 + ebitda_y2
-cumulative_ebitda_y3 = ebitda_y1 + ebitda_y2 + ebitda_y3
-
-roi_y1 = (ebitda_y1 / total_initial_investment) * 100
-roi_y2 = (cumulative_ebitda_y2 / total_initial_investment) * 100
-roi_y3 = (cumulative_ebitda_y3 / total_initial_investment) * 100
-
-# Payback period calculation (simplified)
-monthly_ebitda_y1 = ebitda_y1 / 12
-payback_months = total_initial_investment / monthly_ebitda_y1 if monthly_ebitda_y1 > 0 else float('inf')
+# Collect the numeric sidebar inputs under the model's input names and
+# evaluate the projection's dataflow graph over the weekly profile, which only
+# recomputes figures downstream of changed inputs
+params = {
+    'business_size_sqft': business_size_sqft,
+    'operating_hours_weekly': operating_hours_weekly,
+    'operating_days_weekly': operating_days_weekly,
+    'renovation_cost': renovation_cost,
+    'equipment_cost': equipment_cost,
+    'marketing_branding_initial': marketing_branding_initial,
+    'legal_permits_licenses': legal_permits_licenses,
+    'cryotherapy_price': cryotherapy_price,
+    'infrared_sauna_price': infrared_sauna_price,
+    'iv_therapy_basic_price': iv_therapy_basic_price,
+    'iv_therapy_premium_price': iv_therapy_premium_price,
+    'face_treatment_price': face_treatment_price,
+    'silver_membership_price': silver_membership_price,
+    'gold_membership_price': gold_membership_price,
+    'platinum_membership_price': platinum_membership_price,
+    'cryotherapy_capacity_per_hour': cryotherapy_capacity_per_hour,
+    'infrared_sauna_capacity_per_hour': infrared_sauna_capacity_per_hour,
+    'iv_therapy_capacity_per_hour': iv_therapy_capacity_per_hour,
+    'face_treatment_capacity_per_hour': face_treatment_capacity_per_hour,
+    'year1_start_utilization': year1_start_utilization,
+    'year1_end_utilization': year1_end_utilization,
+    'year2_start_utilization': year2_start_utilization,
+    'year2_end_utilization': year2_end_utilization,
+    'year3_utilization': year3_utilization,
+    'cryotherapy_utilization_factor': cryotherapy_utilization_factor,
+    'infrared_sauna_utilization_factor': infrared_sauna_utilization_factor,
+    'iv_therapy_utilization_factor': iv_therapy_utilization_factor,
+    'face_treatment_utilization_factor': face_treatment_utilization_factor,
+    'rent_monthly': rent_monthly,
+    'staff_count': staff_count,
+    'staff_annual_salary': staff_annual_salary,
+    'staff_benefits_tax_percent': staff_benefits_tax_percent,
+    'equipment_finance_monthly': equipment_finance_monthly,
+    'utilities_monthly': utilities_monthly,
+    'supplies_percent_of_revenue': supplies_percent_of_revenue,
+    'insurance_annual': insurance_annual,
+    'marketing_percent_of_revenue_y1': marketing_percent_of_revenue_y1,
+    'marketing_percent_of_revenue': marketing_percent_of_revenue,
+    'accounting_legal_annual': accounting_legal_annual,
+    'maintenance_annual': maintenance_annual,
+    'miscellaneous_annual': miscellaneous_annual,
+    'price_increase_y2': price_increase_y2,
+    'price_increase_y3': price_increase_y3,
+    'expense_inflation': expense_inflation,
+    'maintenance_increase': maintenance_increase,
+    'discount_rate': discount_rate,
+    'silver_members_y1': silver_members_y1,
+    'gold_members_y1': gold_members_y1,
+    'platinum_members_y1': platinum_members_y1,
+    'membership_growth_y2': membership_growth_y2,
+    'membership_growth_y3': membership_growth_y3
+}
+projection = dashboard_utils.clinic_dataflow(params, week)
+
+with st.sidebar.expander("Input Influence"):
+    influence_input = st.selectbox("Input", dataflow.inputs(dashboard_utils.CLINIC_GRAPH), format_func=lambda name: name.replace('_', ' ').capitalize(), key="influence_input")
+    influenced = dataflow.downstream(dashboard_utils.CLINIC_GRAPH, [influence_input])
+    st.markdown("Changing it recomputes: " + (", ".join(f"`{name}`" for name in influenced) or "nothing in the projection"))
+
+weeks_per_year = clinic_model.WEEKS_PER_YEAR
+total_initial_investment = projection['initial_investment']
+
+# Service-specific utilization rates and revenue per year
+(
+    (cryo_util_y1, cryo_util_y2, cryo_util_y3),
+    (sauna_util_y1, sauna_util_y2, sauna_util_y3),
+    (iv_util_y1, iv_util_y2, iv_util_y3),
+    (face_util_y1, face_util_y2, face_util_y3)
+) = projection['utilization']
+(
+    (cryo_revenue_y1, cryo_revenue_y2, cryo_revenue_y3),
+    (sauna_revenue_y1, sauna_revenue_y2, sauna_revenue_y3),
+    (iv_revenue_y1, iv_revenue_y2, iv_revenue_y3),
+    (face_revenue_y1, face_revenue_y2, face_revenue_y3)
+) = projection['service_revenue']
+membership_revenue_y1, membership_revenue_y2, membership_revenue_y3 = projection['membership_revenue'].sum(axis=0)
+total_revenue_y1, total_revenue_y2, total_revenue_y3 = projection['revenue']
+
+# Expenses per category and year
+(
+    (rent_annual, rent_annual_y2, rent_annual_y3),
+    (staff_cost_annual, staff_cost_annual_y2, staff_cost_annual_y3),
+    (equipment_finance_annual, _, _),
+    (utilities_annual, utilities_annual_y2, utilities_annual_y3),
+    (supplies_y1, supplies_y2, supplies_y3),
+    (insurance_annual, insurance_annual_y2, insurance_annual_y3),
+    (marketing_y1, marketing_y2, marketing_y3),
+    (accounting_legal_annual, accounting_legal_annual_y2, accounting_legal_annual_y3),
+    (maintenance_annual, maintenance_annual_y2, maintenance_annual_y3),
+    (miscellaneous_annual, miscellaneous_annual_y2, miscellaneous_annual_y3)
+) = projection['expenses']
+total_expenses_y1, total_expenses_y2, total_expenses_y3 = projection['total_expenses']
+
+# EBITDA
+ebitda_y1, ebitda_y2, ebitda_y3 = projection['ebitda']
+ebitda_margin_y1, ebitda_margin_y2, ebitda_margin_y3 = projection['ebitda_margin']
+
+# Break-even analysis, weighted by the projected service and membership mix
+break_even = dashboard_utils.clinic_break_even(params, ramp=utilization_ramp.lower(), week=week)
+monthly_fixed_costs = break_even['monthly_fixed_costs']
+contribution_margin_per_visit = break_even['contribution_margin_per_visit']
+monthly_break_even_visits = break_even['monthly_break_even_visits']
+weekly_break_even_visits = break_even['weekly_break_even_visits']
+daily_break_even_visits = break_even['daily_break_even_visits']
+ebitda_positive_month = break_even['ebitda_positive_month']
+cash_break_even_month = break_even['cash_break_even_month']
+
+# ROI and payback period
+roi_y1, roi_y2, roi_y3 = projection['roi']
+payback_months = projection['payback_months']
+
+# Discounted returns from the monthly cashflows over the three projection years
+clinic_returns = dashboard_utils.clinic_returns(params, ramp=utilization_ramp.lower(), week=week)
+npv = clinic_returns['npv']
+irr = clinic_returns['irr']
+discounted_payback_months = clinic_returns['discounted_payback_months']
 
 # Main dashboard
 # KPI metrics in columns
@@ -413,66 +336,147 @@ ebitda_data = [ebitda_y1, ebitda_y2, ebitda_y3]
 margin_data = [ebitda_margin_y1, ebitda_margin_y2, ebitda_margin_y3]
 
 # Create a figure with two y-axes
-fig = go.Figure()
-
-# Add revenue bars
-fig.add_trace(go.Bar(
-    x=years,
-    y=revenue_data,
-    name="Revenue",
-    marker_color='blue',
-    opacity=0.7
-))
-
-# Add EBITDA bars
-fig.add_trace(go.Bar(
-    x=years,
-    y=ebitda_data,
-    name="EBITDA",
-    marker_color='green',
-    opacity=0.7
-))
-
-# Add EBITDA margin line
-fig.add_trace(go.Scatter(
-    x=years,
-    y=margin_data,
-    name="EBITDA Margin (%)",
-    mode='lines+markers',
-    yaxis='y2',
-    line=dict(color='red', width=3),
-    marker=dict(size=10)
-))
-
-# Update layout for dual y-axis
-fig.update_layout(
-    title='Revenue, EBITDA & Margin Growth',
-    yaxis=dict(
-        title=dict(text="Amount (£)", font=dict(color="blue")),
-        tickfont=dict(color="blue")
-    ),
-    yaxis2=dict(
-        title=dict(text="EBITDA Margin (%)", font=dict(color="red")),
-        tickfont=dict(color="red"),
-        anchor="x",
-        overlaying="y",
-        side="right"
-    ),
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=1.02,
-        xanchor="right",
-        x=1
-    ),
-    barmode='group',
-    plot_bgcolor='white',
-    paper_bgcolor='white',
-    font=dict(color='black')
-)
+def build_growth_chart(years, revenue_data, ebitda_data, margin_data):
+    fig = go.Figure()
+
+    # Add revenue bars
+    fig.add_trace(go.Bar(
+        x=years,
+        y=revenue_data,
+        name="Revenue",
+        marker_color='blue',
+        opacity=0.7
+    ))
+
+    # Add EBITDA bars
+    fig.add_trace(go.Bar(
+        x=years,
+        y=ebitda_data,
+        name="EBITDA",
+        marker_color='green',
+        opacity=0.7
+    ))
+
+    # Add EBITDA margin line
+    fig.add_trace(go.Scatter(
+        x=years,
+        y=margin_data,
+        name="EBITDA Margin (%)",
+        mode='lines+markers',
+        yaxis='y2',
+        line=dict(color='red', width=3),
+        marker=dict(size=10)
+    ))
+
+    # Update layout for dual y-axis
+    fig.update_layout(
+        title='Revenue, EBITDA & Margin Growth',
+        yaxis=dict(
+            title=dict(text="Amount (£)", font=dict(color="blue")),
+            tickfont=dict(color="blue")
+        ),
+        yaxis2=dict(
+            title=dict(text="EBITDA Margin (%)", font=dict(color="red")),
+            tickfont=dict(color="red"),
+            anchor="x",
+            overlaying="y",
+            side="right"
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        barmode='group',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='black')
+    )
+    return fig
+
+fig = dashboard_utils.cached_figure(build_growth_chart, years, revenue_data, ebitda_data, margin_data)
 
 st.plotly_chart(fig, use_container_width=True)
 
+# Monthly cash flow
+st.subheader("Monthly Cash Flow")
+
+projection_months = st.slider("Projection Horizon (months)", min_value=36, max_value=120, value=36, step=12)
+monthly_projection = dashboard_utils.clinic_project_monthly(params, months=projection_months, ramp=utilization_ramp.lower(), week=week)
+projection_month_numbers = monthly_projection['months']
+
+def build_monthly_cash_chart(projection_month_numbers, monthly_projection):
+    fig_monthly_cash = go.Figure()
+
+    # Add monthly revenue and cost bars
+    fig_monthly_cash.add_trace(go.Bar(
+        x=projection_month_numbers,
+        y=monthly_projection['revenue'],
+        name="Revenue",
+        marker_color='blue',
+        opacity=0.7
+    ))
+
+    fig_monthly_cash.add_trace(go.Bar(
+        x=projection_month_numbers,
+        y=monthly_projection['fixed_costs'] + monthly_projection['variable_costs'],
+        name="Operating Costs",
+        marker_color='orange',
+        opacity=0.7
+    ))
+
+    # Add cumulative cash line, net of the initial investment
+    fig_monthly_cash.add_trace(go.Scatter(
+        x=projection_month_numbers,
+        y=monthly_projection['cumulative_cash'],
+        name="Cumulative Cash",
+        mode='lines',
+        yaxis='y2',
+        line=dict(color='green', width=3)
+    ))
+
+    fig_monthly_cash.update_layout(
+        title='Monthly Revenue, Costs & Cumulative Cash',
+        xaxis=dict(title='Month'),
+        yaxis=dict(title="Monthly Amount (£)"),
+        yaxis2=dict(
+            title="Cumulative Cash (£)",
+            anchor="x",
+            overlaying="y",
+            side="right"
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        barmode='group',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='black')
+    )
+    return fig_monthly_cash
+
+fig_monthly_cash = dashboard_utils.cached_figure(build_monthly_cash_chart, projection_month_numbers, monthly_projection)
+
+st.plotly_chart(fig_monthly_cash, use_container_width=True)
+
+with st.expander("Monthly Cash Flow Table"):
+    df_monthly_cash = pd.DataFrame({
+        'Month': projection_month_numbers,
+        'Base Utilization (%)': dashboard_utils.clinic_monthly_utilization(params, projection_months, utilization_ramp.lower()) * 100,
+        'Revenue (£)': monthly_projection['revenue'],
+        'Variable Costs (£)': monthly_projection['variable_costs'],
+        'Fixed Costs (£)': monthly_projection['fixed_costs'],
+        'EBITDA (£)': monthly_projection['ebitda'],
+        'Cumulative Cash (£)': monthly_projection['cumulative_cash']
+    })
+    st.dataframe(df_monthly_cash.round(1), use_container_width=True, hide_index=True)
+
 # Two columns for Revenue Breakdown and Expense Breakdown
 col1, col2 = st.columns(2)
 
@@ -488,24 +492,28 @@ with col1:
         ]
     }
     df_revenue = pd.DataFrame(revenue_data)
-    fig_revenue = px.pie(
-        df_revenue, 
-        values='Revenue', 
-        names='Service',
-        title='Revenue Breakdown by Service',
-        color_discrete_sequence=['blue', 'green', 'red', 'orange', 'purple'],
-        hole=0.4
-    )
-    fig_revenue.update_traces(
-        textposition='inside', 
-        textinfo='percent+label',
-        marker=dict(line=dict(color='white', width=2))
-    )
-    fig_revenue.update_layout(
-        font=dict(color='black'),
-        legend=dict(orientation='h', yanchor='bottom', y=-0.2),
-        paper_bgcolor='white'
-    )
+    def build_revenue_pie(df_revenue):
+        fig_revenue = px.pie(
+            df_revenue, 
+            values='Revenue', 
+            names='Service',
+            title='Revenue Breakdown by Service',
+            color_discrete_sequence=['blue', 'green', 'red', 'orange', 'purple'],
+            hole=0.4
+        )
+        fig_revenue.update_traces(
+            textposition='inside', 
+            textinfo='percent+label',
+            marker=dict(line=dict(color='white', width=2))
+        )
+        fig_revenue.update_layout(
+            font=dict(color='black'),
+            legend=dict(orientation='h', yanchor='bottom', y=-0.2),
+            paper_bgcolor='white'
+        )
+        return fig_revenue
+
+    fig_revenue = dashboard_utils.cached_figure(build_revenue_pie, df_revenue)
     st.plotly_chart(fig_revenue, use_container_width=True)
 
 # Expense breakdown pie chart
@@ -523,24 +531,28 @@ with col2:
         ]
     }
     df_expenses = pd.DataFrame(expense_data)
-    fig_expenses = px.pie(
-        df_expenses, 
-        values='Expense', 
-        names='Category',
-        title='Expense Breakdown',
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        hole=0.4
-    )
-    fig_expenses.update_traces(
-        textposition='inside', 
-        textinfo='percent+label',
-        marker=dict(line=dict(color='white', width=2))
-    )
-    fig_expenses.update_layout(
-        font=dict(color='black'),
-        legend=dict(orientation='h', yanchor='bottom', y=-0.2),
-        paper_bgcolor='white'
-    )
+    def build_expense_pie(df_expenses):
+        fig_expenses = px.pie(
+            df_expenses, 
+            values='Expense', 
+            names='Category',
+            title='Expense Breakdown',
+            color_discrete_sequence=px.colors.qualitative.Pastel,
+            hole=0.4
+        )
+        fig_expenses.update_traces(
+            textposition='inside', 
+            textinfo='percent+label',
+            marker=dict(line=dict(color='white', width=2))
+        )
+        fig_expenses.update_layout(
+            font=dict(color='black'),
+            legend=dict(orientation='h', yanchor='bottom', y=-0.2),
+            paper_bgcolor='white'
+        )
+        return fig_expenses
+
+    fig_expenses = dashboard_utils.cached_figure(build_expense_pie, df_expenses)
     st.plotly_chart(fig_expenses, use_container_width=True)
 
 # Financial metrics
@@ -560,7 +572,13 @@ financial_metrics = {
         'Monthly Break-Even (Visits)',
         'Weekly Break-Even (Visits)',
         'Daily Break-Even (Visits)',
+        'Contribution per Visit',
+        'EBITDA Positive Month',
+        'Cash Break-Even Month',
         'Payback Period (Months)',
+        f'3-Year NPV at {discount_rate:.1f}%',
+        '3-Year IRR',
+        'Discounted Payback (Months)',
         '1-Year ROI',
         '2-Year ROI',
         '3-Year ROI'
@@ -579,7 +597,13 @@ financial_metrics = {
         f"{monthly_break_even_visits:.0f}",
         f"{weekly_break_even_visits:.0f}",
         f"{daily_break_even_visits:.0f}",
+        f"£{contribution_margin_per_visit:,.2f}",
+        f"{ebitda_positive_month:.0f}" if np.isfinite(ebitda_positive_month) else "Not reached",
+        f"{cash_break_even_month:.0f}" if np.isfinite(cash_break_even_month) else "Not reached",
         f"{payback_months:.1f}",
+        f"£{npv:,.0f}",
+        f"{irr:.1f}%" if np.isfinite(irr) else "N/A",
+        f"{discounted_payback_months:.1f}" if np.isfinite(discounted_payback_months) else "Not reached",
         f"{roi_y1:.1f}%",
         f"{roi_y2:.1f}%",
         f"{roi_y3:.1f}%"
@@ -699,662 +723,1262 @@ st.table(df_detailed_expenses)
 # Add Budget vs. Actual Tracking
 st.subheader("Budget vs. Actual Tracking")
 
-with st.expander("Budget vs. Actual Revenue Tracking"):
-    # Create tabs for data entry and visualization
-    budget_actual_tab1, budget_actual_tab2 = st.tabs(["Data Entry", "Visualization"])
+budget_section = dashboard_utils.lazy_expander("Budget vs. Actual Revenue Tracking", "budget_section", [f"actual_revenue_{i}" for i in range(4)] + [f"completion_{i}" for i in range(4)])
+with budget_section:
+    if budget_section.open:
+        # Data entry reruns only this fragment, not the whole dashboard
+        @st.fragment
+        def budget_vs_actual(cryo_revenue_y1, sauna_revenue_y1, iv_revenue_y1, face_revenue_y1):
+            # Create tabs for data entry and visualization
+            budget_actual_tab1, budget_actual_tab2 = st.tabs(["Data Entry", "Visualization"])
     
-    with budget_actual_tab1:
-        st.markdown("### Enter Actual Revenue")
-        st.markdown("Track your business's actual revenue against the budget.")
-        
-        # Create a dataframe with the main revenue categories
-        actual_revenue_data = {
-            'Service Category': [
-                'Cryotherapy',
-                'Infrared Sauna',
-                'IV Therapy',
-                'Face Treatments'
-            ],
-            'Budgeted Revenue': [
-                cryo_revenue_y1,
-                sauna_revenue_y1,
-                iv_revenue_y1,
-                face_revenue_y1
-            ],
-            'Actual Revenue': [0, 0, 0, 0],
-            'Completion (%)': [0, 0, 0, 0]
-        }
-        
-        df_actual_revenue = pd.DataFrame(actual_revenue_data)
-        
-        # Create input fields for actual revenue and completion percentages
-        for i, category in enumerate(df_actual_revenue['Service Category']):
-            col1, col2 = st.columns(2)
-            with col1:
-                actual_revenue = st.number_input(
-                    f"Actual Revenue - {category} (£)",
-                    min_value=0,
-                    value=int(df_actual_revenue.loc[i, 'Actual Revenue']),
-                    step=1000
-                )
-                df_actual_revenue.loc[i, 'Actual Revenue'] = actual_revenue
+            with budget_actual_tab1:
+                st.markdown("### Enter Actual Revenue")
+                st.markdown("Track your business's actual revenue against the budget.")
+        
+                # Create a dataframe with the main revenue categories
+                actual_revenue_data = {
+                    'Service Category': [
+                        'Cryotherapy',
+                        'Infrared Sauna',
+                        'IV Therapy',
+                        'Face Treatments'
+                    ],
+                    'Budgeted Revenue': [
+                        cryo_revenue_y1,
+                        sauna_revenue_y1,
+                        iv_revenue_y1,
+                        face_revenue_y1
+                    ],
+                    'Actual Revenue': [0, 0, 0, 0],
+                    'Completion (%)': [0, 0, 0, 0]
+                }
+        
+                df_actual_revenue = pd.DataFrame(actual_revenue_data)
+        
+                # Create input fields for actual revenue and completion percentages
+                for i, category in enumerate(df_actual_revenue['Service Category']):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        actual_revenue = st.number_input(
+                            f"Actual Revenue - {category} (£)",
+                            min_value=0,
+                            value=int(df_actual_revenue.loc[i, 'Actual Revenue']),
+                            step=1000,
+                            key=f"actual_revenue_{i}"
+                        )
+                        df_actual_revenue.loc[i, 'Actual Revenue'] = actual_revenue
             
-            with col2:
-                completion = st.slider(
-                    f"Completion % - {category}",
-                    min_value=0,
-                    max_value=100,
-                    value=int(df_actual_revenue.loc[i, 'Completion (%)']),
-                    step=5
-                )
-                df_actual_revenue.loc[i, 'Completion (%)'] = completion
-        
-        # Calculate variance
-        df_actual_revenue['Variance'] = df_actual_revenue['Budgeted Revenue'] - df_actual_revenue['Actual Revenue']
-        df_actual_revenue['Variance %'] = (df_actual_revenue['Variance'] / df_actual_revenue['Budgeted Revenue']) * 100
-        
-        # Format for display
-        df_actual_revenue_display = df_actual_revenue.copy()
-        df_actual_revenue_display['Budgeted Revenue'] = df_actual_revenue_display['Budgeted Revenue'].apply(lambda x: f"£{x:,.0f}")
-        df_actual_revenue_display['Actual Revenue'] = df_actual_revenue_display['Actual Revenue'].apply(lambda x: f"£{x:,.0f}")
-        df_actual_revenue_display['Variance'] = df_actual_revenue_display['Variance'].apply(lambda x: f"£{x:,.0f}")
-        df_actual_revenue_display['Variance %'] = df_actual_revenue_display['Variance %'].apply(lambda x: f"{x:.1f}%")
-        df_actual_revenue_display['Completion (%)'] = df_actual_revenue_display['Completion (%)'].apply(lambda x: f"{x}%")
-        
-        st.table(df_actual_revenue_display)
+                    with col2:
+                        completion = st.slider(
+                            f"Completion % - {category}",
+                            min_value=0,
+                            max_value=100,
+                            value=int(df_actual_revenue.loc[i, 'Completion (%)']),
+                            step=5,
+                            key=f"completion_{i}"
+                        )
+                        df_actual_revenue.loc[i, 'Completion (%)'] = completion
+        
+                # Calculate variance
+                df_actual_revenue['Variance'] = df_actual_revenue['Budgeted Revenue'] - df_actual_revenue['Actual Revenue']
+                df_actual_revenue['Variance %'] = (df_actual_revenue['Variance'] / df_actual_revenue['Budgeted Revenue']) * 100
+        
+                # Format for display
+                df_actual_revenue_display = df_actual_revenue.copy()
+                df_actual_revenue_display['Budgeted Revenue'] = df_actual_revenue_display['Budgeted Revenue'].apply(lambda x: f"£{x:,.0f}")
+                df_actual_revenue_display['Actual Revenue'] = df_actual_revenue_display['Actual Revenue'].apply(lambda x: f"£{x:,.0f}")
+                df_actual_revenue_display['Variance'] = df_actual_revenue_display['Variance'].apply(lambda x: f"£{x:,.0f}")
+                df_actual_revenue_display['Variance %'] = df_actual_revenue_display['Variance %'].apply(lambda x: f"{x:.1f}%")
+                df_actual_revenue_display['Completion (%)'] = df_actual_revenue_display['Completion (%)'].apply(lambda x: f"{x}%")
+        
+                st.table(df_actual_revenue_display)
     
-    with budget_actual_tab2:
-        # Create visualizations for budget vs actual
-        st.markdown("### Budget vs. Actual Visualization")
-        
-        # Bar chart comparing budget vs actual
-        budget_vs_actual_data = pd.DataFrame({
-            'Category': df_actual_revenue['Service Category'],
-            'Budgeted': df_actual_revenue['Budgeted Revenue'],
-            'Actual': df_actual_revenue['Actual Revenue']
-        })
-        
-        budget_vs_actual_melted = pd.melt(
-            budget_vs_actual_data, 
-            id_vars=['Category'],
-            value_vars=['Budgeted', 'Actual'],
-            var_name='Type',
-            value_name='Revenue'
-        )
-        
-        fig_budget_actual = px.bar(
-            budget_vs_actual_melted,
-            x='Category',
-            y='Revenue',
-            color='Type',
-            barmode='group',
-            title="Budget vs. Actual Revenue by Service",
-            labels={'Revenue': 'Revenue (£)', 'Category': 'Service Category'},
-            color_discrete_map={
-                'Budgeted': 'blue',
-                'Actual': 'green'
-            }
-        )
-        
-        fig_budget_actual.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(color='black'),
-            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
-            margin=dict(l=20, r=20, t=60, b=20)
-        )
-        
-        st.plotly_chart(fig_budget_actual, use_container_width=True)
-        
-        # Calculate overall project completion and budget status
-        total_budget = sum(df_actual_revenue['Budgeted Revenue'])
-        total_actual = sum(df_actual_revenue['Actual Revenue'])
-        budget_variance = total_budget - total_actual
-        budget_variance_pct = (budget_variance / total_budget) * 100 if total_budget > 0 else 0
-        weighted_completion = sum(df_actual_revenue['Completion (%)'] * df_actual_revenue['Budgeted Revenue']) / total_budget if total_budget > 0 else 0
+            with budget_actual_tab2:
+                # Create visualizations for budget vs actual
+                st.markdown("### Budget vs. Actual Visualization")
+        
+                # Bar chart comparing budget vs actual
+                budget_vs_actual_data = pd.DataFrame({
+                    'Category': df_actual_revenue['Service Category'],
+                    'Budgeted': df_actual_revenue['Budgeted Revenue'],
+                    'Actual': df_actual_revenue['Actual Revenue']
+                })
+        
+                budget_vs_actual_melted = pd.melt(
+                    budget_vs_actual_data, 
+                    id_vars=['Category'],
+                    value_vars=['Budgeted', 'Actual'],
+                    var_name='Type',
+                    value_name='Revenue'
+                )
         
-        # Create KPI metrics for business status
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Overall Completion", f"{weighted_completion:.1f}%")
-        with col2:
-            st.metric("Budget Variance", f"£{budget_variance:,.0f}", f"{budget_variance_pct:.1f}%")
-        with col3:
-            status = "On Budget" if abs(budget_variance_pct) < 5 else ("Over Budget" if budget_variance_pct < 0 else "Under Budget")
-            st.metric("Budget Status", status)
+                def build_budget_actual_chart(budget_vs_actual_melted):
+                    fig_budget_actual = px.bar(
+                        budget_vs_actual_melted,
+                        x='Category',
+                        y='Revenue',
+                        color='Type',
+                        barmode='group',
+                        title="Budget vs. Actual Revenue by Service",
+                        labels={'Revenue': 'Revenue (£)', 'Category': 'Service Category'},
+                        color_discrete_map={
+                            'Budgeted': 'blue',
+                            'Actual': 'green'
+                        }
+                    )
+        
+                    fig_budget_actual.update_layout(
+                        plot_bgcolor='white',
+                        paper_bgcolor='white',
+                        font=dict(color='black'),
+                        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                        margin=dict(l=20, r=20, t=60, b=20)
+                    )
+                    return fig_budget_actual
+
+                fig_budget_actual = dashboard_utils.cached_figure(build_budget_actual_chart, budget_vs_actual_melted)
+        
+                st.plotly_chart(fig_budget_actual, use_container_width=True)
+        
+                # Calculate overall project completion and budget status
+                total_budget = sum(df_actual_revenue['Budgeted Revenue'])
+                total_actual = sum(df_actual_revenue['Actual Revenue'])
+                budget_variance = total_budget - total_actual
+                budget_variance_pct = (budget_variance / total_budget) * 100 if total_budget > 0 else 0
+                weighted_completion = sum(df_actual_revenue['Completion (%)'] * df_actual_revenue['Budgeted Revenue']) / total_budget if total_budget > 0 else 0
+        
+                # Create KPI metrics for business status
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Overall Completion", f"{weighted_completion:.1f}%")
+                with col2:
+                    st.metric("Budget Variance", f"£{budget_variance:,.0f}", f"{budget_variance_pct:.1f}%")
+                with col3:
+                    status = "On Budget" if abs(budget_variance_pct) < 5 else ("Over Budget" if budget_variance_pct < 0 else "Under Budget")
+                    st.metric("Budget Status", status)
+
+        budget_vs_actual(cryo_revenue_y1, sauna_revenue_y1, iv_revenue_y1, face_revenue_y1)
 
 # Sensitivity Analysis
 st.subheader("Sensitivity Analysis")
 
-with st.expander("Profit Sensitivity Analysis"):
-    # 1. Price sensitivity
-    st.subheader("Price Sensitivity")
-    price_variations = np.linspace(0.8, 1.2, 9)  # 80% to 120% of current prices
-    price_ebitda_results = []
-    price_margin_results = []
-    
-    for price_factor in price_variations:
-        # Recalculate revenues with adjusted prices
-        new_cryo_revenue = cryotherapy_price * price_factor * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * cryo_util_y1
-        new_sauna_revenue = infrared_sauna_price * price_factor * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * sauna_util_y1
-        new_iv_revenue = avg_iv_therapy_price * price_factor * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * iv_util_y1
-        new_face_revenue = face_treatment_price * price_factor * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * face_util_y1
-        
-        new_total_revenue = new_cryo_revenue + new_sauna_revenue + new_iv_revenue + new_face_revenue
-        
-        # Recalculate variable expenses
-        new_supplies = new_total_revenue * (supplies_percent_of_revenue / 100)
-        new_marketing = new_total_revenue * (marketing_percent_of_revenue_y1 / 100)
-        
-        # Fixed expenses remain the same
-        new_total_expenses = (
-            rent_annual + 
-            staff_cost_annual + 
-            equipment_finance_annual + 
-            utilities_annual + 
-            new_supplies + 
-            insurance_annual + 
-            new_marketing + 
-            accounting_legal_annual + 
-            maintenance_annual + 
-            miscellaneous_annual
+sensitivity_section = dashboard_utils.lazy_expander("Profit Sensitivity Analysis", "sensitivity_section", ["grid_price_range", "grid_utilization_range", "grid_points", "grid_year", "tornado_percent", "tornado_metric", "tornado_top"])
+with sensitivity_section:
+    if sensitivity_section.open:
+        # 1. Price sensitivity
+        st.subheader("Price Sensitivity")
+        price_variations = np.linspace(0.8, 1.2, 9)  # 80% to 120% of current prices
+        price_results = dashboard_utils.clinic_evaluate_batch(
+            clinic_model.adjust(clinic_model.param_matrix(params, len(price_variations)), price_factor=price_variations),
+            week=week
         )
-        
-        new_ebitda = new_total_revenue - new_total_expenses
-        new_margin = (new_ebitda / new_total_revenue) * 100 if new_total_revenue > 0 else 0
-        
-        price_ebitda_results.append(new_ebitda)
-        price_margin_results.append(new_margin)
+        price_ebitda_results = price_results['ebitda_y1']
+        price_margin_results = price_results['ebitda_margin_y1']
     
-    price_sensitivity_df = pd.DataFrame({
-        'Price Factor': [f"{factor:.1f}x" for factor in price_variations],
-        'EBITDA (£)': [f"£{ebitda:,.0f}" for ebitda in price_ebitda_results],
-        'EBITDA Margin (%)': [f"{margin:.1f}%" for margin in price_margin_results]
-    })
+        price_sensitivity_df = pd.DataFrame({
+            'Price Factor': [f"{factor:.1f}x" for factor in price_variations],
+            'EBITDA (£)': [f"£{ebitda:,.0f}" for ebitda in price_ebitda_results],
+            'EBITDA Margin (%)': [f"{margin:.1f}%" for margin in price_margin_results]
+        })
     
-    st.table(price_sensitivity_df)
+        st.table(price_sensitivity_df)
     
-    fig_price_sensitivity = px.line(
-        x=price_variations, 
-        y=price_ebitda_results,
-        labels={'x': 'Price Factor', 'y': 'EBITDA (£)'},
-        title="EBITDA Sensitivity to Pricing"
-    )
-    fig_price_sensitivity.update_traces(
-        line=dict(color='blue', width=3),
-        mode='lines+markers',
-        marker=dict(size=8, color='blue')
-    )
-    fig_price_sensitivity.add_hline(
-        y=ebitda_y1,
-        line=dict(color='red', width=1, dash='dash'),
-        annotation_text="Current EBITDA",
-        annotation_position="bottom right"
-    )
-    fig_price_sensitivity.update_layout(
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black'),
-        xaxis=dict(gridcolor='white', linecolor='white', tickformat='.1f'),
-        yaxis=dict(gridcolor='white', linecolor='white'),
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-    st.plotly_chart(fig_price_sensitivity, use_container_width=True)
-
-    # 2. Utilization sensitivity
-    st.subheader("Utilization Sensitivity")
-    utilization_variations = np.linspace(0.5, 1.5, 9)  # 50% to 150% of current utilization
-    utilization_ebitda_results = []
-    utilization_margin_results = []
-    
-    for util_factor in utilization_variations:
-        # Recalculate revenues with adjusted utilization
-        new_cryo_util = min((year1_avg_utilization / 100) * cryotherapy_utilization_factor * util_factor, 1.0)
-        new_sauna_util = min((year1_avg_utilization / 100) * infrared_sauna_utilization_factor * util_factor, 1.0)
-        new_iv_util = min((year1_avg_utilization / 100) * iv_therapy_utilization_factor * util_factor, 1.0)
-        new_face_util = min((year1_avg_utilization / 100) * face_treatment_utilization_factor * util_factor, 1.0)
-        
-        new_cryo_revenue = cryotherapy_price * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * new_cryo_util
-        new_sauna_revenue = infrared_sauna_price * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * new_sauna_util
-        new_iv_revenue = avg_iv_therapy_price * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * new_iv_util
-        new_face_revenue = face_treatment_price * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * new_face_util
-        
-        new_total_revenue = new_cryo_revenue + new_sauna_revenue + new_iv_revenue + new_face_revenue
-        
-        # Recalculate variable expenses
-        new_supplies = new_total_revenue * (supplies_percent_of_revenue / 100)
-        new_marketing = new_total_revenue * (marketing_percent_of_revenue_y1 / 100)
-        
-        # Fixed expenses remain the same
-        new_total_expenses = (
-            rent_annual + 
-            staff_cost_annual + 
-            equipment_finance_annual + 
-            utilities_annual + 
-            new_supplies + 
-            insurance_annual + 
-            new_marketing + 
-            accounting_legal_annual + 
-            maintenance_annual + 
-            miscellaneous_annual
+        def build_price_sensitivity_chart(price_variations, price_ebitda_results, ebitda_y1):
+            fig_price_sensitivity = px.line(
+                x=price_variations, 
+                y=price_ebitda_results,
+                labels={'x': 'Price Factor', 'y': 'EBITDA (£)'},
+                title="EBITDA Sensitivity to Pricing"
+            )
+            fig_price_sensitivity.update_traces(
+                line=dict(color='blue', width=3),
+                mode='lines+markers',
+                marker=dict(size=8, color='blue')
+            )
+            fig_price_sensitivity.add_hline(
+                y=ebitda_y1,
+                line=dict(color='red', width=1, dash='dash'),
+                annotation_text="Current EBITDA",
+                annotation_position="bottom right"
+            )
+            fig_price_sensitivity.update_layout(
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                xaxis=dict(gridcolor='white', linecolor='white', tickformat='.1f'),
+                yaxis=dict(gridcolor='white', linecolor='white'),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            return fig_price_sensitivity
+
+        fig_price_sensitivity = dashboard_utils.cached_figure(build_price_sensitivity_chart, price_variations, price_ebitda_results, ebitda_y1)
+        st.plotly_chart(fig_price_sensitivity, use_container_width=True)
+
+        # 2. Utilization sensitivity
+        st.subheader("Utilization Sensitivity")
+        utilization_variations = np.linspace(0.5, 1.5, 9)  # 50% to 150% of current utilization
+        utilization_results = dashboard_utils.clinic_evaluate_batch(
+            clinic_model.adjust(clinic_model.param_matrix(params, len(utilization_variations)), utilization_factor=utilization_variations),
+            week=week
         )
-        
-        new_ebitda = new_total_revenue - new_total_expenses
-        new_margin = (new_ebitda / new_total_revenue) * 100 if new_total_revenue > 0 else 0
-        
-        utilization_ebitda_results.append(new_ebitda)
-        utilization_margin_results.append(new_margin)
+        utilization_ebitda_results = utilization_results['ebitda_y1']
+        utilization_margin_results = utilization_results['ebitda_margin_y1']
     
-    utilization_sensitivity_df = pd.DataFrame({
-        'Utilization Factor': [f"{factor:.1f}x" for factor in utilization_variations],
-        'EBITDA (£)': [f"£{ebitda:,.0f}" for ebitda in utilization_ebitda_results],
-        'EBITDA Margin (%)': [f"{margin:.1f}%" for margin in utilization_margin_results]
-    })
+        utilization_sensitivity_df = pd.DataFrame({
+            'Utilization Factor': [f"{factor:.1f}x" for factor in utilization_variations],
+            'EBITDA (£)': [f"£{ebitda:,.0f}" for ebitda in utilization_ebitda_results],
+            'EBITDA Margin (%)': [f"{margin:.1f}%" for margin in utilization_margin_results]
+        })
     
-    st.table(utilization_sensitivity_df)
+        st.table(utilization_sensitivity_df)
     
-    fig_utilization_sensitivity = px.line(
-        x=utilization_variations, 
-        y=utilization_ebitda_results,
-        labels={'x': 'Utilization Factor', 'y': 'EBITDA (£)'},
-        title="EBITDA Sensitivity to Utilization"
-    )
-    fig_utilization_sensitivity.update_traces(
-        line=dict(color='green', width=3),
-        mode='lines+markers',
-        marker=dict(size=8, color='green')
-    )
-    fig_utilization_sensitivity.add_hline(
-        y=ebitda_y1,
-        line=dict(color='red', width=1, dash='dash'),
-        annotation_text="Current EBITDA",
-        annotation_position="bottom right"
-    )
-    fig_utilization_sensitivity.update_layout(
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black'),
-        xaxis=dict(gridcolor='white', linecolor='white', tickformat='.1f'),
-        yaxis=dict(gridcolor='white', linecolor='white'),
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-    st.plotly_chart(fig_utilization_sensitivity, use_container_width=True)
+        def build_utilization_sensitivity_chart(utilization_variations, utilization_ebitda_results, ebitda_y1):
+            fig_utilization_sensitivity = px.line(
+                x=utilization_variations, 
+                y=utilization_ebitda_results,
+                labels={'x': 'Utilization Factor', 'y': 'EBITDA (£)'},
+                title="EBITDA Sensitivity to Utilization"
+            )
+            fig_utilization_sensitivity.update_traces(
+                line=dict(color='green', width=3),
+                mode='lines+markers',
+                marker=dict(size=8, color='green')
+            )
+            fig_utilization_sensitivity.add_hline(
+                y=ebitda_y1,
+                line=dict(color='red', width=1, dash='dash'),
+                annotation_text="Current EBITDA",
+                annotation_position="bottom right"
+            )
+            fig_utilization_sensitivity.update_layout(
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                xaxis=dict(gridcolor='white', linecolor='white', tickformat='.1f'),
+                yaxis=dict(gridcolor='white', linecolor='white'),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            return fig_utilization_sensitivity
+
+        fig_utilization_sensitivity = dashboard_utils.cached_figure(build_utilization_sensitivity_chart, utilization_variations, utilization_ebitda_results, ebitda_y1)
+        st.plotly_chart(fig_utilization_sensitivity, use_container_width=True)
+
+        # 3. Two-way price x utilization sensitivity
+        st.subheader("Price × Utilization Sensitivity")
+        grid_col1, grid_col2, grid_col3, grid_col4 = st.columns(4)
+        with grid_col1:
+            grid_price_range = st.slider("Price Factor Range", min_value=0.5, max_value=1.5, value=(0.8, 1.2), step=0.05, key="grid_price_range")
+        with grid_col2:
+            grid_utilization_range = st.slider("Utilization Factor Range", min_value=0.25, max_value=2.0, value=(0.5, 1.5), step=0.05, key="grid_utilization_range")
+        with grid_col3:
+            grid_points = st.slider("Grid Resolution", min_value=20, max_value=sensitivity.MAX_GRID_POINTS, value=100, step=10, key="grid_points")
+        with grid_col4:
+            grid_year = st.selectbox("EBITDA Year", [1, 2, 3], key="grid_year")
+
+        grid_price_factors = np.linspace(*grid_price_range, grid_points)
+        grid_utilization_factors = np.linspace(*grid_utilization_range, grid_points)
+        grid_projection = dashboard_utils.clinic_price_utilization_grid(params, grid_price_factors, grid_utilization_factors, week=week)
+        grid_ebitda = grid_projection['ebitda'][..., grid_year - 1]
+
+        def build_grid_sensitivity_chart(grid_price_factors, grid_utilization_factors, grid_ebitda, grid_year):
+            fig_grid_sensitivity = go.Figure()
+            fig_grid_sensitivity.add_trace(go.Heatmap(
+                x=grid_price_factors,
+                y=grid_utilization_factors,
+                z=grid_ebitda,
+                colorscale='RdYlGn',
+                zmid=0,
+                colorbar=dict(title='EBITDA (£)'),
+                hovertemplate='Price: %{x:.2f}x<br>Utilization: %{y:.2f}x<br>EBITDA: £%{z:,.0f}<extra></extra>'
+            ))
+            # Break-even contour
+            fig_grid_sensitivity.add_trace(go.Contour(
+                x=grid_price_factors,
+                y=grid_utilization_factors,
+                z=grid_ebitda,
+                contours=dict(start=0, end=0, size=1, coloring='lines', showlabels=False),
+                line=dict(color='black', width=3),
+                showscale=False,
+                hoverinfo='skip',
+                name='Break-even'
+            ))
+            fig_grid_sensitivity.add_trace(go.Scatter(
+                x=[1.0],
+                y=[1.0],
+                mode='markers',
+                marker=dict(symbol='x', size=12, color='black'),
+                name='Current'
+            ))
+            fig_grid_sensitivity.update_layout(
+                title=f"Year {grid_year} EBITDA by Price and Utilization Factor",
+                xaxis=dict(title='Price Factor', tickformat='.2f'),
+                yaxis=dict(title='Utilization Factor', tickformat='.2f'),
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                showlegend=False,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            return fig_grid_sensitivity
+
+        fig_grid_sensitivity = dashboard_utils.cached_figure(build_grid_sensitivity_chart, grid_price_factors, grid_utilization_factors, grid_ebitda, grid_year)
+        st.plotly_chart(fig_grid_sensitivity, use_container_width=True)
+        st.markdown(
+            f"EBITDA is positive in **{np.mean(grid_ebitda > 0)*100:.1f}%** of the {grid_points}×{grid_points} combinations shown. "
+            "The black line marks break-even."
+        )
+
+        # 4. Tornado across every sidebar input
+        st.subheader("Tornado Analysis")
+        tornado_col1, tornado_col2, tornado_col3 = st.columns(3)
+        with tornado_col1:
+            tornado_percent = st.slider("Perturbation (± %)", min_value=1, max_value=50, value=10, step=1, key="tornado_percent")
+        with tornado_col2:
+            tornado_metric = st.selectbox("Rank Impact On", ["Year 3 EBITDA", "3-Year ROI"], key="tornado_metric")
+        with tornado_col3:
+            tornado_top = st.slider("Inputs Shown", min_value=5, max_value=len(clinic_model.PARAM_NAMES), value=15, step=1, key="tornado_top")
+
+        tornado_key, tornado_base, tornado_unit = {
+            "Year 3 EBITDA": ('ebitda_y3', ebitda_y3, '£'),
+            "3-Year ROI": ('roi_y3', roi_y3, '%')
+        }[tornado_metric]
+        tornado_impacts = dashboard_utils.clinic_tornado(params, tornado_percent, week=week)[tornado_key]
+        tornado_order = sensitivity.rank_by_swing(tornado_impacts)
+
+        df_tornado = pd.DataFrame({
+            'Input': [clinic_model.PARAM_NAMES[i] for i in tornado_order],
+            f'-{tornado_percent}%': tornado_impacts[tornado_order, 0] - tornado_base,
+            f'+{tornado_percent}%': tornado_impacts[tornado_order, 1] - tornado_base
+        })
+        df_tornado['Swing'] = (df_tornado[f'+{tornado_percent}%'] - df_tornado[f'-{tornado_percent}%']).abs()
+
+        # Largest swing at the top
+        df_tornado_top = df_tornado.head(tornado_top).iloc[::-1]
+        def build_tornado_chart(df_tornado_top, tornado_percent, tornado_metric, tornado_unit):
+            fig_tornado = go.Figure()
+            fig_tornado.add_trace(go.Bar(
+                y=df_tornado_top['Input'],
+                x=df_tornado_top[f'-{tornado_percent}%'],
+                orientation='h',
+                name=f'Input -{tornado_percent}%',
+                marker_color='firebrick'
+            ))
+            fig_tornado.add_trace(go.Bar(
+                y=df_tornado_top['Input'],
+                x=df_tornado_top[f'+{tornado_percent}%'],
+                orientation='h',
+                name=f'Input +{tornado_percent}%',
+                marker_color='seagreen'
+            ))
+            fig_tornado.update_layout(
+                title=f"Change in {tornado_metric} for ±{tornado_percent}% on Each Input",
+                barmode='overlay',
+                xaxis=dict(title=f"Change from Base ({tornado_unit})"),
+                height=max(400, 28 * len(df_tornado_top)),
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                margin=dict(l=20, r=20, t=60, b=20)
+            )
+            return fig_tornado
+
+        fig_tornado = dashboard_utils.cached_figure(build_tornado_chart, df_tornado_top, tornado_percent, tornado_metric, tornado_unit)
+        st.plotly_chart(fig_tornado, use_container_width=True)
+
+        st.markdown("**All Inputs Ranked by Swing**")
+        st.dataframe(df_tornado.style.format({
+            f'-{tornado_percent}%': '{:,.1f}',
+            f'+{tornado_percent}%': '{:,.1f}',
+            'Swing': '{:,.1f}'
+        }), use_container_width=True)
+
+# Goal Seek
+st.subheader("Goal Seek")
+
+# Inputs that can be solved for: label, search bounds and display format
+goal_seek_inputs = {
+    'cryotherapy_price': ("Cryotherapy Session Price (£)", 10, 200, "£{:,.2f}"),
+    'infrared_sauna_price': ("Infrared Sauna Session Price (£)", 10, 200, "£{:,.2f}"),
+    'iv_therapy_basic_price': ("IV Therapy Basic Session Price (£)", 50, 500, "£{:,.2f}"),
+    'iv_therapy_premium_price': ("IV Therapy Premium Session Price (£)", 100, 800, "£{:,.2f}"),
+    'face_treatment_price': ("Infrared Face Treatment Price (£)", 10, 200, "£{:,.2f}"),
+    'year1_end_utilization': ("Year 1 Ending Utilization (%)", 0, 100, "{:.1f}%"),
+    'staff_count': ("Number of Staff", 1, 30, "{:.2f}"),
+    'rent_monthly': ("Monthly Rent (£)", 1000, 50000, "£{:,.0f}")
+}
+# Targets: label, default value, unit and the extra levels drawn on the frontier chart
+goal_seek_targets = {
+    'ebitda_y1': ("Year 1 EBITDA", 0.0, "£", [-50000.0, 0.0, 50000.0, 100000.0]),
+    'ebitda_margin_y1': ("Year 1 EBITDA Margin", 20.0, "%", [10.0, 20.0, 30.0]),
+    'payback_months': ("Payback Period (Months)", 24.0, "months", [12.0, 24.0, 36.0])
+}
+
+goal_section = dashboard_utils.lazy_expander(
+    "Find the Input Needed to Hit a Target",
+    "goal_section",
+    ["goal_input", "goal_metric", "goal_frontier_input"]
+    + [f"goal_range_{name}" for name in goal_seek_inputs]
+    + [f"goal_target_{metric}" for metric in goal_seek_targets]
+)
+with goal_section:
+    if goal_section.open:
+        goal_col1, goal_col2, goal_col3 = st.columns(3)
+        with goal_col1:
+            goal_input = st.selectbox("Solve For", list(goal_seek_inputs), format_func=lambda name: goal_seek_inputs[name][0], key="goal_input")
+        with goal_col2:
+            goal_metric = st.selectbox("Target", list(goal_seek_targets), format_func=lambda metric: goal_seek_targets[metric][0], key="goal_metric")
+        with goal_col3:
+            goal_target = st.number_input(
+                f"Target Value ({goal_seek_targets[goal_metric][2]})",
+                value=goal_seek_targets[goal_metric][1],
+                key=f"goal_target_{goal_metric}"
+            )
+
+        goal_label, goal_min, goal_max, goal_format = goal_seek_inputs[goal_input]
+        goal_range = st.slider("Search Range", min_value=goal_min, max_value=goal_max, value=(goal_min, goal_max), key=f"goal_range_{goal_input}")
+        goal_value = dashboard_utils.clinic_goal_seek(params, goal_input, goal_metric, goal_target, *goal_range, week=week)
+
+        goal_metric_col1, goal_metric_col2 = st.columns(2)
+        with goal_metric_col1:
+            st.metric(f"Current {goal_label}", goal_format.format(params[goal_input]))
+        with goal_metric_col2:
+            if np.isnan(goal_value):
+                st.metric(f"Required {goal_label}", "Not reached")
+            else:
+                st.metric(
+                    f"Required {goal_label}",
+                    goal_format.format(goal_value),
+                    delta=f"{goal_value - params[goal_input]:+,.2f}"
+                )
+        if np.isnan(goal_value):
+            st.warning(f"{goal_seek_targets[goal_metric][0]} does not reach {goal_target:,.1f} {goal_seek_targets[goal_metric][2]} anywhere in the search range. Widen the range or change the target.")
+        else:
+            st.markdown(
+                f"With every other input unchanged, {goal_seek_targets[goal_metric][0].lower()} reaches "
+                f"**{goal_target:,.1f} {goal_seek_targets[goal_metric][2]}** at {goal_label.lower()} of **{goal_format.format(goal_value)}**."
+            )
+
+        # Iso-target frontier against a second input, every target level solved at once
+        st.markdown("**Iso-Target Frontier**")
+        goal_frontier_options = [name for name in goal_seek_inputs if name != goal_input]
+        if st.session_state.get("goal_frontier_input") not in goal_frontier_options:
+            st.session_state.goal_frontier_input = 'rent_monthly' if goal_input != 'rent_monthly' else 'year1_end_utilization'
+        goal_frontier_input = st.selectbox("Against", goal_frontier_options, format_func=lambda name: goal_seek_inputs[name][0], key="goal_frontier_input")
+        frontier_label, frontier_min, frontier_max, _ = goal_seek_inputs[goal_frontier_input]
+        frontier_x = np.linspace(frontier_min, frontier_max, 60)
+        frontier_targets = sorted(set(goal_seek_targets[goal_metric][3]) | {float(goal_target)})
+        frontier_values = dashboard_utils.clinic_frontier(params, goal_input, goal_metric, frontier_targets, *goal_range, goal_frontier_input, frontier_x, week=week)
+
+        def build_frontier_chart(frontier_x, frontier_values, frontier_targets, goal_target, current_x, current_y, x_label, y_label, target_label, target_unit):
+            fig_frontier = go.Figure()
+            for target, values in zip(frontier_targets, frontier_values):
+                fig_frontier.add_trace(go.Scatter(
+                    x=frontier_x,
+                    y=values,
+                    mode='lines',
+                    name=f"{target:,.0f} {target_unit}",
+                    line=dict(width=3 if target == goal_target else 1.5, dash='solid' if target == goal_target else 'dot')
+                ))
+            fig_frontier.add_trace(go.Scatter(
+                x=[current_x],
+                y=[current_y],
+                mode='markers',
+                marker=dict(symbol='x', size=12, color='black'),
+                name='Current'
+            ))
+            fig_frontier.update_layout(
+                title=f"{y_label} Needed for Each {target_label} Target",
+                xaxis=dict(title=x_label),
+                yaxis=dict(title=y_label),
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font=dict(color='black'),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            return fig_frontier
+
+        fig_frontier = dashboard_utils.cached_figure(
+            build_frontier_chart, frontier_x, frontier_values, frontier_targets, float(goal_target),
+            float(params[goal_frontier_input]), float(params[goal_input]),
+            frontier_label, goal_label, goal_seek_targets[goal_metric][0], goal_seek_targets[goal_metric][2]
+        )
+        st.plotly_chart(fig_frontier, use_container_width=True)
+        st.markdown("Gaps in a line mark values of the second input where that target cannot be reached within the search range.")
+
+# Pricing Optimizer
+st.subheader("Pricing Optimizer")
+
+optimizer_objectives = {'cumulative_ebitda': "3-Year Cumulative EBITDA", 'npv': "3-Year NPV"}
+optimizer_section = dashboard_utils.lazy_expander(
+    "Optimize Prices and Membership Mix",
+    "optimizer_section",
+    ["optimizer_objective", "optimizer_discount_rate", "optimizer_service_elasticity", "optimizer_membership_elasticity", "optimizer_price_range"]
+)
+with optimizer_section:
+    if optimizer_section.open:
+        st.markdown(
+            "Searches the five service prices, the three membership prices and the number of members per tier. "
+            "Demand responds to price through the elasticities below, and pay-per-visit sessions plus member visits "
+            "must fit within the capacity set by the sessions per hour and the weekly opening hours."
+        )
+        opt_col1, opt_col2, opt_col3 = st.columns(3)
+        with opt_col1:
+            optimizer_objective = st.selectbox("Maximize", list(optimizer_objectives), format_func=optimizer_objectives.get, key="optimizer_objective")
+            optimizer_discount_rate = st.slider("Discount Rate (%)", min_value=0.0, max_value=20.0, value=optimizer.DEFAULT_DISCOUNT_RATE, step=0.5, key="optimizer_discount_rate", disabled=optimizer_objective != 'npv')
+        with opt_col2:
+            optimizer_service_elasticity = st.slider("Service Price Elasticity", min_value=0.0, max_value=3.0, value=optimizer.DEFAULT_SERVICE_ELASTICITY, step=0.1, key="optimizer_service_elasticity")
+            optimizer_membership_elasticity = st.slider("Membership Price Elasticity", min_value=0.0, max_value=3.0, value=optimizer.DEFAULT_MEMBERSHIP_ELASTICITY, step=0.1, key="optimizer_membership_elasticity")
+        with opt_col3:
+            optimizer_price_range = st.slider("Price Bounds (× current price)", min_value=0.25, max_value=2.0, value=(0.5, 1.5), step=0.05, key="optimizer_price_range")
+
+        # Per-price bounds, editable; moving the bounds slider resets them
+        optimizer_bounds_table = pd.DataFrame([
+            {'Price': name.replace('_', ' ').capitalize(), 'Min (£)': low, 'Max (£)': high}
+            for name, (low, high) in optimizer.price_bounds(params, *optimizer_price_range).items()
+        ], index=clinic_model.SERVICE_PRICE_INPUTS + clinic_model.MEMBERSHIP_PRICE_INPUTS)
+        optimizer_bounds_table = st.data_editor(
+            optimizer_bounds_table,
+            disabled=['Price'],
+            hide_index=True,
+            use_container_width=True,
+            key=f"optimizer_bounds_{optimizer_price_range}"
+        )
+        optimizer_bounds = {
+            name: (min(row['Min (£)'], row['Max (£)']), max(row['Min (£)'], row['Max (£)']))
+            for name, row in optimizer_bounds_table.iterrows()
+        }
+        optimizer_inputs = (params, dashboard_utils.fingerprint(week), optimizer_bounds, optimizer_objective, optimizer_service_elasticity, optimizer_membership_elasticity, optimizer_discount_rate)
+
+        if st.button("Run Optimizer"):
+            with st.spinner("Searching prices and membership mix..."):
+                st.session_state.clinic_optimizer = {
+                    'inputs': optimizer_inputs,
+                    'result': optimizer.optimize(
+                        params,
+                        optimizer_bounds,
+                        target=optimizer_objective,
+                        service_elasticity=optimizer_service_elasticity,
+                        membership_elasticity=optimizer_membership_elasticity,
+                        discount_rate=optimizer_discount_rate,
+                        week=week
+                    )
+                }
+
+        optimizer_results = st.session_state.get('clinic_optimizer')
+        if optimizer_results is None:
+            st.info("Set the bounds and elasticities above and click 'Run Optimizer' to search for better prices.")
+        else:
+            if optimizer_results['inputs'] != optimizer_inputs:
+                st.warning("Inputs have changed since the last optimization. Re-run it to update these results.")
+            optimizer_result = optimizer_results['result']
+            optimizer_label = optimizer_objectives[optimizer_results['inputs'][2]]
+
+            opt_metric_col1, opt_metric_col2, opt_metric_col3 = st.columns(3)
+            with opt_metric_col1:
+                st.metric(f"Current {optimizer_label}", f"£{optimizer_result['baseline_value']:,.0f}")
+            with opt_metric_col2:
+                st.metric(
+                    f"Optimized {optimizer_label}",
+                    f"£{optimizer_result['value']:,.0f}",
+                    delta=f"£{optimizer_result['value'] - optimizer_result['baseline_value']:,.0f}"
+                )
+            with opt_metric_col3:
+                st.metric("Peak Capacity Used", f"{np.max(optimizer_result['sessions_used'] / optimizer_result['sessions_available'])*100:.1f}%")
+            if optimizer_result['violation'] > 0:
+                st.warning("No plan within these bounds fits the clinic's capacity; the result shown exceeds it the least.")
+
+            optimizer_rows = clinic_model.SERVICE_PRICE_INPUTS + clinic_model.MEMBERSHIP_PRICE_INPUTS + clinic_model.MEMBERSHIP_COUNT_INPUTS
+            optimizer_base = optimizer_results['inputs'][0]
+            df_optimizer = pd.DataFrame({
+                'Input': [name.replace('_', ' ').capitalize() for name in optimizer_rows],
+                'Current': [
+                    f"£{optimizer_base[name]:,.2f}" if name not in clinic_model.MEMBERSHIP_COUNT_INPUTS else f"{optimizer_base[name]:,.0f}"
+                    for name in optimizer_rows
+                ],
+                'Optimized': [
+                    f"£{optimizer_result['params'][name]:,.2f}" if name not in clinic_model.MEMBERSHIP_COUNT_INPUTS else f"{optimizer_result['params'][name]:,.0f}"
+                    for name in optimizer_rows
+                ],
+                'Change': [
+                    f"{(optimizer_result['params'][name] / optimizer_base[name] - 1) * 100:+.1f}%" if optimizer_base[name] else "n/a"
+                    for name in optimizer_rows
+                ]
+            })
+            st.table(df_optimizer)
+
+            st.markdown("**Capacity Use (sessions per year)**")
+            st.dataframe(pd.DataFrame({
+                'Year': [f"Year {year}" for year in range(1, len(optimizer_result['sessions_used']) + 1)],
+                'Sessions Used': [f"{x:,.0f}" for x in optimizer_result['sessions_used']],
+                'Sessions Available': [f"{x:,.0f}" for x in optimizer_result['sessions_available']],
+                'Utilization': [f"{used / available * 100:.1f}%" for used, available in zip(optimizer_result['sessions_used'], optimizer_result['sessions_available'])]
+            }), hide_index=True, use_container_width=True)
+
+            def build_optimizer_chart(history, baseline_value, label):
+                fig_optimizer = go.Figure()
+                fig_optimizer.add_trace(go.Scatter(
+                    x=np.arange(1, len(history) + 1),
+                    y=history,
+                    mode='lines',
+                    name='Best Plan',
+                    line=dict(color='darkblue', width=3)
+                ))
+                fig_optimizer.add_hline(y=baseline_value, line_dash='dash', line_color='black', annotation_text='Current')
+                fig_optimizer.update_layout(
+                    title=f'Best {label} by Generation',
+                    xaxis=dict(title='Generation'),
+                    yaxis=dict(title=f'{label} (£)'),
+                    plot_bgcolor='white',
+                    paper_bgcolor='white',
+                    font=dict(color='black'),
+                    showlegend=False
+                )
+                return fig_optimizer
+
+            fig_optimizer = dashboard_utils.cached_figure(build_optimizer_chart, optimizer_result['history'], optimizer_result['baseline_value'], optimizer_label)
+            st.plotly_chart(fig_optimizer, use_container_width=True)
+
+# Booking Simulation
+st.subheader("Booking Simulation")
+
+booking_section = dashboard_utils.lazy_expander(
+    "Simulate a Year of Bookings",
+    "booking_section",
+    ["booking_year", "booking_max_wait", "booking_seed"] + [f"booking_minutes_{i}" for i in range(len(clinic_model.SERVICES))]
+)
+with booking_section:
+    if booking_section.open:
+        st.markdown(
+            "Simulates every booking request of a projection year hour by hour, following the weekly opening hours, demand and prices in the sidebar. "
+            "A client who cannot start within the maximum wait, or whose session would run past closing, is turned away. "
+            "Members use the same rooms but pay through their membership."
+        )
+        booking_col1, booking_col2, booking_col3 = st.columns(3)
+        with booking_col1:
+            booking_year = st.selectbox("Projection Year", [1, 2, 3], key="booking_year")
+        with booking_col2:
+            booking_max_wait = st.slider("Maximum Wait (minutes)", min_value=0, max_value=120, value=booking_sim.DEFAULT_MAX_WAIT_MINUTES, step=5, key="booking_max_wait")
+        with booking_col3:
+            booking_seed = st.number_input("Random Seed", min_value=0, value=42, step=1, key="booking_seed")
+
+        booking_minute_cols = st.columns(len(clinic_model.SERVICES))
+        booking_minutes = []
+        for i, (service, minutes) in enumerate(zip(clinic_model.SERVICES, booking_sim.SESSION_MINUTES)):
+            with booking_minute_cols[i]:
+                booking_minutes.append(st.number_input(f"{service} Session (minutes)", min_value=5, max_value=240, value=minutes, step=5, key=f"booking_minutes_{i}"))
+        booking_inputs = (params, dashboard_utils.fingerprint(week), booking_year, booking_max_wait, booking_seed, booking_minutes)
+
+        if st.button("Run Booking Simulation"):
+            with st.spinner(f"Simulating a year of bookings for Year {booking_year}..."):
+                st.session_state.clinic_booking = {
+                    'inputs': booking_inputs,
+                    'result': booking_sim.simulate(params, booking_year, booking_max_wait, booking_minutes, week, seed=int(booking_seed))
+                }
+
+        booking_results = st.session_state.get('clinic_booking')
+        if booking_results is None:
+            st.info("Click 'Run Booking Simulation' to compare the simulated year with the projection.")
+        else:
+            if booking_results['inputs'] != booking_inputs:
+                st.warning("Inputs have changed since the last simulation. Re-run it to update these results.")
+            booking = booking_results['result']
+
+            booking_metric_col1, booking_metric_col2, booking_metric_col3 = st.columns(3)
+            with booking_metric_col1:
+                st.metric(
+                    "Simulated Service Revenue",
+                    f"£{booking['revenue'].sum():,.0f}",
+                    delta=f"£{booking['revenue'].sum() - booking['projected_revenue'].sum():,.0f} vs projection"
+                )
+            with booking_metric_col2:
+                booking_requests = booking['demand'].sum() + booking['member_demand'].sum()
+                booking_turned_away = booking['turned_away'].sum() + booking['member_turned_away'].sum()
+                st.metric("Requests Turned Away", f"{booking_turned_away:,.0f}", delta=f"{booking_turned_away / booking_requests * 100:.1f}% of requests" if booking_requests else None, delta_color="off")
+            with booking_metric_col3:
+                st.metric("Booking Events Simulated", f"{booking['events']:,}")
+
+            df_booking = pd.DataFrame({
+                'Service': clinic_model.SERVICES,
+                'Rooms': booking['rooms'],
+                'Paying Requests': [f"{x:,.0f}" for x in booking['demand']],
+                'Paying Turned Away': [f"{x:,.0f}" for x in booking['turned_away']],
+                'Member Requests': [f"{x:,.0f}" for x in booking['member_demand']],
+                'Member Turned Away': [f"{x:,.0f}" for x in booking['member_turned_away']],
+                'Avg Wait (min)': [f"{x:.1f}" for x in booking['wait_minutes']],
+                'Projected Utilization': [f"{x*100:.1f}%" for x in booking['projected_utilization']],
+                'Simulated Utilization': [f"{x*100:.1f}%" for x in booking['utilization']],
+                'Projected Revenue': [f"£{x:,.0f}" for x in booking['projected_revenue']],
+                'Simulated Revenue': [f"£{x:,.0f}" for x in booking['revenue']]
+            })
+            st.dataframe(df_booking, hide_index=True, use_container_width=True)
+            st.markdown(
+                f"Membership revenue is unaffected by turned-away visits: **£{booking['membership_revenue']:,.0f}** in Year {booking_results['inputs'][2]}. "
+                "Simulated utilization includes member visits, which the projection does not count."
+            )
+
+            # Room utilization by hour of the week, open hours only
+            booking_hours = np.nonzero(booking['schedule'])[0]
+
+            def build_booking_heatmap(hourly_utilization, booking_hours):
+                fig_booking = go.Figure(go.Heatmap(
+                    x=week_profile.hour_labels(booking_hours),
+                    y=clinic_model.SERVICES,
+                    z=hourly_utilization[:, booking_hours] * 100,
+                    colorscale='Blues',
+                    zmin=0,
+                    zmax=100,
+                    colorbar=dict(title='Utilization (%)'),
+                    hovertemplate='%{y}, %{x}<br>Utilization: %{z:.1f}%<extra></extra>'
+                ))
+                fig_booking.update_layout(
+                    title='Simulated Room Utilization by Hour of Week',
+                    xaxis=dict(title='Hour of Week', tickangle=-45, nticks=24),
+                    plot_bgcolor='white',
+                    paper_bgcolor='white',
+                    font=dict(color='black'),
+                    margin=dict(l=20, r=20, t=40, b=20)
+                )
+                return fig_booking
+
+            fig_booking = dashboard_utils.cached_figure(build_booking_heatmap, booking['hourly_utilization'], booking_hours)
+            st.plotly_chart(fig_booking, use_container_width=True)
 
 # Scenario Comparison
 st.subheader("Scenario Comparison")
 
-with st.expander("Compare Different Scenarios"):
-    st.markdown("### Create and Compare Business Scenarios")
+# Evaluate base, optimistic and pessimistic scenarios as one batch
+scenario_params = clinic_model.adjust(
+    clinic_model.param_matrix(params, 3),
+    price_factor=np.array([1.0, 1.1, 0.9]),  # Optimistic +10%, pessimistic -10% prices
+    utilization_factor=np.array([1.0, 1.2, 0.8]),  # Optimistic +20%, pessimistic -20% utilization
+    supplies_percent_change=np.array([0.0, -2.0, 2.0])  # Supplies cost -2% / +2% of revenue
+)
+scenario_results = dashboard_utils.clinic_evaluate_batch(scenario_params, week=week)
+scenario_break_even = dashboard_utils.clinic_break_even(clinic_model.params_from_matrix(scenario_params), ramp=utilization_ramp.lower(), week=week)
+
+scenario_section = dashboard_utils.lazy_expander("Compare Different Scenarios", "scenario_section")
+with scenario_section:
+    if scenario_section.open:
+        st.markdown("### Create and Compare Business Scenarios")
     
-    # Create tabs for different scenarios
-    scenario_tab1, scenario_tab2, scenario_tab3 = st.tabs(["Base Case", "Optimistic", "Pessimistic"])
+        # Create tabs for different scenarios
+        scenario_tab1, scenario_tab2, scenario_tab3 = st.tabs(["Base Case", "Optimistic", "Pessimistic"])
     
-    # Base case (current values)
-    with scenario_tab1:
-        st.markdown("#### Base Case Scenario")
-        st.markdown("Current business parameters")
-        
-        base_metrics = {
-            'Metric': [
-                'Year 1 Revenue (£)',
-                'Year 1 EBITDA (£)',
-                'Year 1 EBITDA Margin (%)',
-                'Year 3 Revenue (£)',
-                'Year 3 EBITDA (£)',
-                'Year 3 EBITDA Margin (%)',
-                'Break-Even (Daily Visits)',
-                'Payback Period (Months)'
-            ],
-            'Value': [
-                f"{total_revenue_y1:,.0f}",
-                f"{ebitda_y1:,.0f}",
-                f"{ebitda_margin_y1:.1f}",
-                f"{total_revenue_y3:,.0f}",
-                f"{ebitda_y3:,.0f}",
-                f"{ebitda_margin_y3:.1f}",
-                f"{daily_break_even_visits:.1f}",
-                f"{payback_months:.1f}"
-            ]
-        }
+        # Base case (current values)
+        with scenario_tab1:
+            st.markdown("#### Base Case Scenario")
+            st.markdown("Current business parameters")
+        
+            base_metrics = {
+                'Metric': [
+                    'Year 1 Revenue (£)',
+                    'Year 1 EBITDA (£)',
+                    'Year 1 EBITDA Margin (%)',
+                    'Year 3 Revenue (£)',
+                    'Year 3 EBITDA (£)',
+                    'Year 3 EBITDA Margin (%)',
+                    'Break-Even (Daily Visits)',
+                    'Cash Break-Even Month',
+                    'Payback Period (Months)'
+                ],
+                'Value': [
+                    f"{total_revenue_y1:,.0f}",
+                    f"{ebitda_y1:,.0f}",
+                    f"{ebitda_margin_y1:.1f}",
+                    f"{total_revenue_y3:,.0f}",
+                    f"{ebitda_y3:,.0f}",
+                    f"{ebitda_margin_y3:.1f}",
+                    f"{daily_break_even_visits:.1f}",
+                    f"{cash_break_even_month:.0f}" if np.isfinite(cash_break_even_month) else "Not reached",
+                    f"{payback_months:.1f}"
+                ]
+            }
         
-        st.table(pd.DataFrame(base_metrics))
+            st.table(pd.DataFrame(base_metrics))
     
-    # Optimistic scenario
-    with scenario_tab2:
-        st.markdown("#### Optimistic Scenario")
-        
-        # Optimistic adjustments
-        opt_price_factor = 1.1  # 10% higher prices
-        opt_util_factor = 1.2   # 20% higher utilization
-        opt_supplies_percent = supplies_percent_of_revenue - 2  # 2% lower supplies cost
-        
-        # Recalculate with optimistic values for Year 1
-        opt_cryo_util_y1 = min((year1_avg_utilization / 100) * cryotherapy_utilization_factor * opt_util_factor, 1.0)
-        opt_sauna_util_y1 = min((year1_avg_utilization / 100) * infrared_sauna_utilization_factor * opt_util_factor, 1.0)
-        opt_iv_util_y1 = min((year1_avg_utilization / 100) * iv_therapy_utilization_factor * opt_util_factor, 1.0)
-        opt_face_util_y1 = min((year1_avg_utilization / 100) * face_treatment_utilization_factor * opt_util_factor, 1.0)
-        
-        opt_cryo_revenue_y1 = cryotherapy_price * opt_price_factor * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * opt_cryo_util_y1
-        opt_sauna_revenue_y1 = infrared_sauna_price * opt_price_factor * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * opt_sauna_util_y1
-        opt_iv_revenue_y1 = avg_iv_therapy_price * opt_price_factor * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * opt_iv_util_y1
-        opt_face_revenue_y1 = face_treatment_price * opt_price_factor * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * opt_face_util_y1
-        
-        opt_total_revenue_y1 = opt_cryo_revenue_y1 + opt_sauna_revenue_y1 + opt_iv_revenue_y1 + opt_face_revenue_y1 + membership_revenue_y1
-        
-        opt_supplies_y1 = opt_total_revenue_y1 * (opt_supplies_percent / 100)
-        opt_marketing_y1 = opt_total_revenue_y1 * (marketing_percent_of_revenue_y1 / 100)
-        
-        opt_total_expenses_y1 = (
-            rent_annual + 
-            staff_cost_annual + 
-            equipment_finance_annual + 
-            utilities_annual + 
-            opt_supplies_y1 + 
-            insurance_annual + 
-            opt_marketing_y1 + 
-            accounting_legal_annual + 
-            maintenance_annual + 
-            miscellaneous_annual
-        )
-        
-        opt_ebitda_y1 = opt_total_revenue_y1 - opt_total_expenses_y1
-        opt_ebitda_margin_y1 = (opt_ebitda_y1 / opt_total_revenue_y1) * 100 if opt_total_revenue_y1 > 0 else 0
-        
-        # Optimistic Year 3
-        opt_cryo_util_y3 = min((year3_utilization / 100) * cryotherapy_utilization_factor * opt_util_factor, 1.0)
-        opt_sauna_util_y3 = min((year3_utilization / 100) * infrared_sauna_utilization_factor * opt_util_factor, 1.0)
-        opt_iv_util_y3 = min((year3_utilization / 100) * iv_therapy_utilization_factor * opt_util_factor, 1.0)
-        opt_face_util_y3 = min((year3_utilization / 100) * face_treatment_utilization_factor * opt_util_factor, 1.0)
-        
-        # Year 3 prices with optimistic increases
-        opt_cryo_price_y3 = cryotherapy_price * (1 + price_increase_y2 / 100) * (1 + price_increase_y3 / 100) * opt_price_factor
-        opt_sauna_price_y3 = infrared_sauna_price * (1 + price_increase_y2 / 100) * (1 + price_increase_y3 / 100) * opt_price_factor
-        opt_iv_price_y3 = avg_iv_therapy_price * (1 + price_increase_y2 / 100) * (1 + price_increase_y3 / 100) * opt_price_factor
-        opt_face_price_y3 = face_treatment_price * (1 + price_increase_y2 / 100) * (1 + price_increase_y3 / 100) * opt_price_factor
-        
-        opt_cryo_revenue_y3 = opt_cryo_price_y3 * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * opt_cryo_util_y3
-        opt_sauna_revenue_y3 = opt_sauna_price_y3 * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * opt_sauna_util_y3
-        opt_iv_revenue_y3 = opt_iv_price_y3 * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * opt_iv_util_y3
-        opt_face_revenue_y3 = opt_face_price_y3 * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * opt_face_util_y3
-        
-        opt_total_revenue_y3 = opt_cryo_revenue_y3 + opt_sauna_revenue_y3 + opt_iv_revenue_y3 + opt_face_revenue_y3 + membership_revenue_y3
-        
-        opt_supplies_y3 = opt_total_revenue_y3 * (opt_supplies_percent / 100)
-        opt_marketing_y3 = opt_total_revenue_y3 * (marketing_percent_of_revenue / 100)
-        
-        # Other Year 3 expenses remain the same as base case
-        opt_total_expenses_y3 = (
-            rent_annual_y3 + 
-            staff_cost_annual_y3 + 
-            equipment_finance_annual + 
-            utilities_annual_y3 + 
-            opt_supplies_y3 + 
-            insurance_annual_y3 + 
-            opt_marketing_y3 + 
-            accounting_legal_annual_y3 + 
-            maintenance_annual_y3 + 
-            miscellaneous_annual_y3
-        )
-        
-        opt_ebitda_y3 = opt_total_revenue_y3 - opt_total_expenses_y3
-        opt_ebitda_margin_y3 = (opt_ebitda_y3 / opt_total_revenue_y3) * 100 if opt_total_revenue_y3 > 0 else 0
-        
-        # Optimistic break-even and payback
-        opt_avg_service_price = avg_service_price * opt_price_factor
-        opt_avg_variable_cost_per_visit = opt_avg_service_price * ((opt_supplies_percent + marketing_percent_of_revenue_y1) / 100)
-        opt_contribution_margin_per_visit = opt_avg_service_price - opt_avg_variable_cost_per_visit
-        
-        opt_daily_break_even_visits = (monthly_fixed_costs / opt_contribution_margin_per_visit) / 26  # 26 days per month
-        opt_monthly_ebitda_y1 = opt_ebitda_y1 / 12
-        opt_payback_months = total_initial_investment / opt_monthly_ebitda_y1 if opt_monthly_ebitda_y1 > 0 else float('inf')
-        
-        # Display optimistic metrics
-        opt_metrics = {
-            'Metric': [
-                'Year 1 Revenue (£)',
-                'Year 1 EBITDA (£)',
-                'Year 1 EBITDA Margin (%)',
-                'Year 3 Revenue (£)',
-                'Year 3 EBITDA (£)',
-                'Year 3 EBITDA Margin (%)',
-                'Break-Even (Daily Visits)',
-                'Payback Period (Months)'
-            ],
-            'Value': [
-                f"{opt_total_revenue_y1:,.0f}",
-                f"{opt_ebitda_y1:,.0f}",
-                f"{opt_ebitda_margin_y1:.1f}",
-                f"{opt_total_revenue_y3:,.0f}",
-                f"{opt_ebitda_y3:,.0f}",
-                f"{opt_ebitda_margin_y3:.1f}",
-                f"{opt_daily_break_even_visits:.1f}",
-                f"{opt_payback_months:.1f}"
-            ],
-            'Change from Base': [
-                f"{((opt_total_revenue_y1/total_revenue_y1)-1)*100:+.1f}%",
-                f"{((opt_ebitda_y1/ebitda_y1)-1)*100:+.1f}%",
-                f"{opt_ebitda_margin_y1-ebitda_margin_y1:+.1f}%",
-                f"{((opt_total_revenue_y3/total_revenue_y3)-1)*100:+.1f}%",
-                f"{((opt_ebitda_y3/ebitda_y3)-1)*100:+.1f}%",
-                f"{opt_ebitda_margin_y3-ebitda_margin_y3:+.1f}%",
-                f"{opt_daily_break_even_visits-daily_break_even_visits:+.1f}",
-                f"{opt_payback_months-payback_months:+.1f}"
-            ]
-        }
-        
-        st.table(pd.DataFrame(opt_metrics))
-        
-        # Key assumptions
-        st.markdown("**Key Assumptions:**")
-        st.markdown(f"- Service prices increased by 10%")
-        st.markdown(f"- Utilization rates increased by 20%")
-        st.markdown(f"- Supplies cost reduced by 2%")
-        
-    # Pessimistic scenario
-    with scenario_tab3:
-        st.markdown("#### Pessimistic Scenario")
-        
-        # Pessimistic adjustments
-        pes_price_factor = 0.9  # 10% lower prices
-        pes_util_factor = 0.8   # 20% lower utilization
-        pes_supplies_percent = supplies_percent_of_revenue + 2  # 2% higher supplies cost
-        
-        # Recalculate with pessimistic values for Year 1
-        pes_cryo_util_y1 = min((year1_avg_utilization / 100) * cryotherapy_utilization_factor * pes_util_factor, 1.0)
-        pes_sauna_util_y1 = min((year1_avg_utilization / 100) * infrared_sauna_utilization_factor * pes_util_factor, 1.0)
-        pes_iv_util_y1 = min((year1_avg_utilization / 100) * iv_therapy_utilization_factor * pes_util_factor, 1.0)
-        pes_face_util_y1 = min((year1_avg_utilization / 100) * face_treatment_utilization_factor * pes_util_factor, 1.0)
-        
-        pes_cryo_revenue_y1 = cryotherapy_price * pes_price_factor * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * pes_cryo_util_y1
-        pes_sauna_revenue_y1 = infrared_sauna_price * pes_price_factor * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * pes_sauna_util_y1
-        pes_iv_revenue_y1 = avg_iv_therapy_price * pes_price_factor * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * pes_iv_util_y1
-        pes_face_revenue_y1 = face_treatment_price * pes_price_factor * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * pes_face_util_y1
-        
-        pes_total_revenue_y1 = pes_cryo_revenue_y1 + pes_sauna_revenue_y1 + pes_iv_revenue_y1 + pes_face_revenue_y1 + membership_revenue_y1
-        
-        pes_supplies_y1 = pes_total_revenue_y1 * (pes_supplies_percent / 100)
-        pes_marketing_y1 = pes_total_revenue_y1 * (marketing_percent_of_revenue_y1 / 100)
-        
-        # Other Year 1 expenses remain the same
-        pes_total_expenses_y1 = (
-            rent_annual + 
-            staff_cost_annual + 
-            equipment_finance_annual + 
-            utilities_annual + 
-            pes_supplies_y1 + 
-            insurance_annual + 
-            pes_marketing_y1 + 
-            accounting_legal_annual + 
-            maintenance_annual + 
-            miscellaneous_annual
-        )
-        
-        pes_ebitda_y1 = pes_total_revenue_y1 - pes_total_expenses_y1
-        pes_ebitda_margin_y1 = (pes_ebitda_y1 / pes_total_revenue_y1) * 100 if pes_total_revenue_y1 > 0 else 0
-        
-        # Pessimistic Year 3
-        pes_cryo_util_y3 = min((year3_utilization / 100) * cryotherapy_utilization_factor * pes_util_factor, 1.0)
-        pes_sauna_util_y3 = min((year3_utilization / 100) * infrared_sauna_utilization_factor * pes_util_factor, 1.0)
-        pes_iv_util_y3 = min((year3_utilization / 100) * iv_therapy_utilization_factor * pes_util_factor, 1.0)
-        pes_face_util_y3 = min((year3_utilization / 100) * face_treatment_utilization_factor * pes_util_factor, 1.0)
-        
-        # Year 3 prices with pessimistic decreases
-        pes_cryo_price_y3 = cryotherapy_price * (1 - price_increase_y2 / 100) * (1 - price_increase_y3 / 100) * pes_price_factor
-        pes_sauna_price_y3 = infrared_sauna_price * (1 - price_increase_y2 / 100) * (1 - price_increase_y3 / 100) * pes_price_factor
-        pes_iv_price_y3 = avg_iv_therapy_price * (1 - price_increase_y2 / 100) * (1 - price_increase_y3 / 100) * pes_price_factor
-        pes_face_price_y3 = face_treatment_price * (1 - price_increase_y2 / 100) * (1 - price_increase_y3 / 100) * pes_price_factor
-        
-        pes_cryo_revenue_y3 = pes_cryo_price_y3 * cryotherapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * pes_cryo_util_y3
-        pes_sauna_revenue_y3 = pes_sauna_price_y3 * infrared_sauna_capacity_per_hour * operating_hours_weekly * weeks_per_year * pes_sauna_util_y3
-        pes_iv_revenue_y3 = pes_iv_price_y3 * iv_therapy_capacity_per_hour * operating_hours_weekly * weeks_per_year * pes_iv_util_y3
-        pes_face_revenue_y3 = pes_face_price_y3 * face_treatment_capacity_per_hour * operating_hours_weekly * weeks_per_year * pes_face_util_y3
-        
-        pes_total_revenue_y3 = pes_cryo_revenue_y3 + pes_sauna_revenue_y3 + pes_iv_revenue_y3 + pes_face_revenue_y3 + membership_revenue_y3
-        
-        pes_supplies_y3 = pes_total_revenue_y3 * (pes_supplies_percent / 100)
-        pes_marketing_y3 = pes_total_revenue_y3 * (marketing_percent_of_revenue / 100)
-        
-        # Other Year 3 expenses remain the same as base case
-        pes_total_expenses_y3 = (
-            rent_annual_y3 + 
-            staff_cost_annual_y3 + 
-            equipment_finance_annual + 
-            utilities_annual_y3 + 
-            pes_supplies_y3 + 
-            insurance_annual_y3 + 
-            pes_marketing_y3 + 
-            accounting_legal_annual_y3 + 
-            maintenance_annual_y3 + 
-            miscellaneous_annual_y3
-        )
-        
-        pes_ebitda_y3 = pes_total_revenue_y3 - pes_total_expenses_y3
-        pes_ebitda_margin_y3 = (pes_ebitda_y3 / pes_total_revenue_y3) * 100 if pes_total_revenue_y3 > 0 else 0
-        
-        # Pessimistic break-even and payback
-        pes_avg_service_price = avg_service_price * pes_price_factor
-        pes_avg_variable_cost_per_visit = pes_avg_service_price * ((pes_supplies_percent + marketing_percent_of_revenue_y1) / 100)
-        pes_contribution_margin_per_visit = pes_avg_service_price - pes_avg_variable_cost_per_visit
-        
-        pes_daily_break_even_visits = (monthly_fixed_costs / pes_contribution_margin_per_visit) / 26  # 26 days per month
-        pes_monthly_ebitda_y1 = pes_ebitda_y1 / 12
-        pes_payback_months = total_initial_investment / pes_monthly_ebitda_y1 if pes_monthly_ebitda_y1 > 0 else float('inf')
+        # Optimistic scenario
+        with scenario_tab2:
+            st.markdown("#### Optimistic Scenario")
+        
+            # Optimistic: prices +10%, utilization +20%, supplies -2% of revenue
+            opt_result = scenario_results[1]
+            opt_total_revenue_y1 = opt_result['revenue_y1']
+            opt_ebitda_y1 = opt_result['ebitda_y1']
+            opt_ebitda_margin_y1 = opt_result['ebitda_margin_y1']
+            opt_total_revenue_y3 = opt_result['revenue_y3']
+            opt_ebitda_y3 = opt_result['ebitda_y3']
+            opt_ebitda_margin_y3 = opt_result['ebitda_margin_y3']
+            opt_daily_break_even_visits = scenario_break_even['daily_break_even_visits'][1]
+            opt_cash_break_even_month = scenario_break_even['cash_break_even_month'][1]
+            opt_payback_months = opt_result['payback_months']
+        
+            # Display optimistic metrics
+            opt_metrics = {
+                'Metric': [
+                    'Year 1 Revenue (£)',
+                    'Year 1 EBITDA (£)',
+                    'Year 1 EBITDA Margin (%)',
+                    'Year 3 Revenue (£)',
+                    'Year 3 EBITDA (£)',
+                    'Year 3 EBITDA Margin (%)',
+                    'Break-Even (Daily Visits)',
+                    'Cash Break-Even Month',
+                    'Payback Period (Months)'
+                ],
+                'Value': [
+                    f"{opt_total_revenue_y1:,.0f}",
+                    f"{opt_ebitda_y1:,.0f}",
+                    f"{opt_ebitda_margin_y1:.1f}",
+                    f"{opt_total_revenue_y3:,.0f}",
+                    f"{opt_ebitda_y3:,.0f}",
+                    f"{opt_ebitda_margin_y3:.1f}",
+                    f"{opt_daily_break_even_visits:.1f}",
+                    f"{opt_cash_break_even_month:.0f}" if np.isfinite(opt_cash_break_even_month) else "Not reached",
+                    f"{opt_payback_months:.1f}"
+                ],
+                'Change from Base': [
+                    f"{((opt_total_revenue_y1/total_revenue_y1)-1)*100:+.1f}%",
+                    f"{((opt_ebitda_y1/ebitda_y1)-1)*100:+.1f}%",
+                    f"{opt_ebitda_margin_y1-ebitda_margin_y1:+.1f}%",
+                    f"{((opt_total_revenue_y3/total_revenue_y3)-1)*100:+.1f}%",
+                    f"{((opt_ebitda_y3/ebitda_y3)-1)*100:+.1f}%",
+                    f"{opt_ebitda_margin_y3-ebitda_margin_y3:+.1f}%",
+                    f"{opt_daily_break_even_visits-daily_break_even_visits:+.1f}",
+                    f"{opt_cash_break_even_month-cash_break_even_month:+.0f}" if np.isfinite(opt_cash_break_even_month - cash_break_even_month) else "N/A",
+                    f"{opt_payback_months-payback_months:+.1f}"
+                ]
+            }
         
-        # Display pessimistic metrics
-        pes_metrics = {
-            'Metric': [
-                'Year 1 Revenue (£)',
-                'Year 1 EBITDA (£)',
-                'Year 1 EBITDA Margin (%)',
-                'Year 3 Revenue (£)',
-                'Year 3 EBITDA (£)',
-                'Year 3 EBITDA Margin (%)',
-                'Break-Even (Daily Visits)',
-                'Payback Period (Months)'
-            ],
-            'Value': [
-                f"{pes_total_revenue_y1:,.0f}",
-                f"{pes_ebitda_y1:,.0f}",
-                f"{pes_ebitda_margin_y1:.1f}",
-                f"{pes_total_revenue_y3:,.0f}",
-                f"{pes_ebitda_y3:,.0f}",
-                f"{pes_ebitda_margin_y3:.1f}",
-                f"{pes_daily_break_even_visits:.1f}",
-                f"{pes_payback_months:.1f}"
-            ],
-            'Change from Base': [
-                f"{((pes_total_revenue_y1/total_revenue_y1)-1)*100:+.1f}%",
-                f"{((pes_ebitda_y1/ebitda_y1)-1)*100:+.1f}%" if ebitda_y1 != 0 else "N/A",
-                f"{pes_ebitda_margin_y1-ebitda_margin_y1:+.1f}%",
-                f"{((pes_total_revenue_y3/total_revenue_y3)-1)*100:+.1f}%",
-                f"{((pes_ebitda_y3/ebitda_y3)-1)*100:+.1f}%" if ebitda_y3 != 0 else "N/A",
-                f"{pes_ebitda_margin_y3-ebitda_margin_y3:+.1f}%",
-                f"{pes_daily_break_even_visits-daily_break_even_visits:+.1f}" if pes_daily_break_even_visits != float('inf') else "N/A",
-                f"{pes_payback_months-payback_months:+.1f}" if pes_payback_months != float('inf') else "N/A"
-            ]
-        }
+            st.table(pd.DataFrame(opt_metrics))
+        
+            # Key assumptions
+            st.markdown("**Key Assumptions:**")
+            st.markdown(f"- Service prices increased by 10%")
+            st.markdown(f"- Utilization rates increased by 20%")
+            st.markdown(f"- Supplies cost reduced by 2%")
+        
+        # Pessimistic scenario
+        with scenario_tab3:
+            st.markdown("#### Pessimistic Scenario")
+        
+            # Pessimistic: prices -10%, utilization -20%, supplies +2% of revenue
+            pes_result = scenario_results[2]
+            pes_total_revenue_y1 = pes_result['revenue_y1']
+            pes_ebitda_y1 = pes_result['ebitda_y1']
+            pes_ebitda_margin_y1 = pes_result['ebitda_margin_y1']
+            pes_total_revenue_y3 = pes_result['revenue_y3']
+            pes_ebitda_y3 = pes_result['ebitda_y3']
+            pes_ebitda_margin_y3 = pes_result['ebitda_margin_y3']
+            pes_daily_break_even_visits = scenario_break_even['daily_break_even_visits'][2]
+            pes_cash_break_even_month = scenario_break_even['cash_break_even_month'][2]
+            pes_payback_months = pes_result['payback_months']
+        
+            # Display pessimistic metrics
+            pes_metrics = {
+                'Metric': [
+                    'Year 1 Revenue (£)',
+                    'Year 1 EBITDA (£)',
+                    'Year 1 EBITDA Margin (%)',
+                    'Year 3 Revenue (£)',
+                    'Year 3 EBITDA (£)',
+                    'Year 3 EBITDA Margin (%)',
+                    'Break-Even (Daily Visits)',
+                    'Cash Break-Even Month',
+                    'Payback Period (Months)'
+                ],
+                'Value': [
+                    f"{pes_total_revenue_y1:,.0f}",
+                    f"{pes_ebitda_y1:,.0f}",
+                    f"{pes_ebitda_margin_y1:.1f}",
+                    f"{pes_total_revenue_y3:,.0f}",
+                    f"{pes_ebitda_y3:,.0f}",
+                    f"{pes_ebitda_margin_y3:.1f}",
+                    f"{pes_daily_break_even_visits:.1f}",
+                    f"{pes_cash_break_even_month:.0f}" if np.isfinite(pes_cash_break_even_month) else "Not reached",
+                    f"{pes_payback_months:.1f}"
+                ],
+                'Change from Base': [
+                    f"{((pes_total_revenue_y1/total_revenue_y1)-1)*100:+.1f}%",
+                    f"{((pes_ebitda_y1/ebitda_y1)-1)*100:+.1f}%" if ebitda_y1 != 0 else "N/A",
+                    f"{pes_ebitda_margin_y1-ebitda_margin_y1:+.1f}%",
+                    f"{((pes_total_revenue_y3/total_revenue_y3)-1)*100:+.1f}%",
+                    f"{((pes_ebitda_y3/ebitda_y3)-1)*100:+.1f}%" if ebitda_y3 != 0 else "N/A",
+                    f"{pes_ebitda_margin_y3-ebitda_margin_y3:+.1f}%",
+                    f"{pes_daily_break_even_visits-daily_break_even_visits:+.1f}" if pes_daily_break_even_visits != float('inf') else "N/A",
+                    f"{pes_cash_break_even_month-cash_break_even_month:+.0f}" if np.isfinite(pes_cash_break_even_month - cash_break_even_month) else "N/A",
+                    f"{pes_payback_months-payback_months:+.1f}" if pes_payback_months != float('inf') else "N/A"
+                ]
+            }
         
-        st.table(pd.DataFrame(pes_metrics))
+            st.table(pd.DataFrame(pes_metrics))
         
-        # Key assumptions
-        st.markdown("**Key Assumptions:**")
-        st.markdown(f"- Service prices decreased by 10%")
-        st.markdown(f"- Utilization rates decreased by 20%")
-        st.markdown(f"- Supplies cost increased by 2% of revenue")
+            # Key assumptions
+            st.markdown("**Key Assumptions:**")
+            st.markdown(f"- Service prices decreased by 10%")
+            st.markdown(f"- Utilization rates decreased by 20%")
+            st.markdown(f"- Supplies cost increased by 2% of revenue")
 
 # Compare all scenarios in a chart
 st.subheader("Scenario Comparison Chart")
 
-# Create data for comparison chart
+# Create data for comparison chart straight from the scenario batch, which is
+# evaluated whether or not the scenario section is open
 scenario_names = ["Pessimistic", "Base Case", "Optimistic"]
-y1_revenue_data = [pes_total_revenue_y1, total_revenue_y1, opt_total_revenue_y1]
-y1_ebitda_data = [pes_ebitda_y1, ebitda_y1, opt_ebitda_y1]
-y3_revenue_data = [pes_total_revenue_y3, total_revenue_y3, opt_total_revenue_y3]
-y3_ebitda_data = [pes_ebitda_y3, ebitda_y3, opt_ebitda_y3]
+y1_revenue_data = [scenario_results[2]['revenue_y1'], total_revenue_y1, scenario_results[1]['revenue_y1']]
+y1_ebitda_data = [scenario_results[2]['ebitda_y1'], ebitda_y1, scenario_results[1]['ebitda_y1']]
+y3_revenue_data = [scenario_results[2]['revenue_y3'], total_revenue_y3, scenario_results[1]['revenue_y3']]
+y3_ebitda_data = [scenario_results[2]['ebitda_y3'], ebitda_y3, scenario_results[1]['ebitda_y3']]
 
 # Create figure
-fig_scenarios = go.Figure()
-
-# Add Year 1 Revenue bars
-fig_scenarios.add_trace(go.Bar(
-    x=scenario_names,
-    y=y1_revenue_data,
-    name="Year 1 Revenue",
-    marker_color='lightblue',
-    text=[f"£{x:,.0f}" for x in y1_revenue_data],
-    textposition='auto'
-))
-
-# Add Year 1 EBITDA bars
-fig_scenarios.add_trace(go.Bar(
-    x=scenario_names,
-    y=y1_ebitda_data,
-    name="Year 1 EBITDA",
-    marker_color='darkblue',
-    text=[f"£{x:,.0f}" for x in y1_ebitda_data],
-    textposition='auto'
-))
-
-# Add Year 3 Revenue bars
-fig_scenarios.add_trace(go.Bar(
-    x=scenario_names,
-    y=y3_revenue_data,
-    name="Year 3 Revenue",
-    marker_color='lightgreen',
-    text=[f"£{x:,.0f}" for x in y3_revenue_data],
-    textposition='auto'
-))
-
-# Add Year 3 EBITDA bars
-fig_scenarios.add_trace(go.Bar(
-    x=scenario_names,
-    y=y3_ebitda_data,
-    name="Year 3 EBITDA",
-    marker_color='darkgreen',
-    text=[f"£{x:,.0f}" for x in y3_ebitda_data],
-    textposition='auto'
-))
-
-# Update layout
-fig_scenarios.update_layout(
-    title='Financial Comparison Across Scenarios',
-    barmode='group',
-    xaxis=dict(title='Scenario'),
-    yaxis=dict(title='Amount (£)'),
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=1.02,
-        xanchor="right",
-        x=1
-    ),
-    plot_bgcolor='white',
-    paper_bgcolor='white',
-    font=dict(color='black')
-)
+def build_scenario_chart(scenario_names, y1_revenue_data, y1_ebitda_data, y3_revenue_data, y3_ebitda_data):
+    fig_scenarios = go.Figure()
+
+    # Add Year 1 Revenue bars
+    fig_scenarios.add_trace(go.Bar(
+        x=scenario_names,
+        y=y1_revenue_data,
+        name="Year 1 Revenue",
+        marker_color='lightblue',
+        text=[f"£{x:,.0f}" for x in y1_revenue_data],
+        textposition='auto'
+    ))
+
+    # Add Year 1 EBITDA bars
+    fig_scenarios.add_trace(go.Bar(
+        x=scenario_names,
+        y=y1_ebitda_data,
+        name="Year 1 EBITDA",
+        marker_color='darkblue',
+        text=[f"£{x:,.0f}" for x in y1_ebitda_data],
+        textposition='auto'
+    ))
+
+    # Add Year 3 Revenue bars
+    fig_scenarios.add_trace(go.Bar(
+        x=scenario_names,
+        y=y3_revenue_data,
+        name="Year 3 Revenue",
+        marker_color='lightgreen',
+        text=[f"£{x:,.0f}" for x in y3_revenue_data],
+        textposition='auto'
+    ))
+
+    # Add Year 3 EBITDA bars
+    fig_scenarios.add_trace(go.Bar(
+        x=scenario_names,
+        y=y3_ebitda_data,
+        name="Year 3 EBITDA",
+        marker_color='darkgreen',
+        text=[f"£{x:,.0f}" for x in y3_ebitda_data],
+        textposition='auto'
+    ))
+
+    # Update layout
+    fig_scenarios.update_layout(
+        title='Financial Comparison Across Scenarios',
+        barmode='group',
+        xaxis=dict(title='Scenario'),
+        yaxis=dict(title='Amount (£)'),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='black')
+    )
+    return fig_scenarios
+
+fig_scenarios = dashboard_utils.cached_figure(build_scenario_chart, scenario_names, y1_revenue_data, y1_ebitda_data, y3_revenue_data, y3_ebitda_data)
 
 st.plotly_chart(fig_scenarios, use_container_width=True)
 
+# Monte Carlo Simulation
+st.subheader("Monte Carlo Simulation")
+
+with st.expander("Simulation Settings", expanded=False):
+    mc_col1, mc_col2, mc_col3 = st.columns(3)
+    with mc_col1:
+        mc_draws = st.select_slider("Number of Draws", options=[100000, 250000, 500000, 1000000], value=1000000)
+        mc_seed = st.number_input("Random Seed", min_value=0, value=42, step=1)
+        mc_utilization_downside = st.slider("Utilization Downside (%)", min_value=0, max_value=50, value=25, step=5)
+        mc_utilization_upside = st.slider("Utilization Upside (%)", min_value=0, max_value=50, value=10, step=5)
+    with mc_col2:
+        mc_price_sd = st.slider("Service Price Std Dev (%)", min_value=0.0, max_value=20.0, value=5.0, step=0.5)
+        mc_members_sd = st.slider("Year 1 Members Std Dev (%)", min_value=0, max_value=50, value=20, step=5)
+        mc_growth_sd = st.slider("Membership Growth Std Dev (pts)", min_value=0, max_value=50, value=15, step=5)
+    with mc_col3:
+        mc_supplies_range = st.slider("Supplies % Range (pts from input)", min_value=-10.0, max_value=10.0, value=(-2.0, 4.0), step=0.5)
+        mc_rent_inflation_range = st.slider("Rent Inflation Range (%)", min_value=0.0, max_value=15.0, value=(1.0, 6.0), step=0.5)
+        mc_returns = st.checkbox("Include NPV & IRR (slower)", value=False, help="Values every draw's monthly cashflows as well, at about ten times the cost per draw.")
+
+mc_distributions = montecarlo.clinic_distributions(
+    params,
+    utilization_downside=mc_utilization_downside,
+    utilization_upside=mc_utilization_upside,
+    price_sd_percent=mc_price_sd,
+    members_sd_percent=mc_members_sd,
+    membership_growth_sd=mc_growth_sd,
+    supplies_range=mc_supplies_range,
+    rent_inflation_range=mc_rent_inflation_range
+)
+mc_inputs = (params, dashboard_utils.fingerprint(week), mc_distributions, mc_draws, mc_seed, mc_returns)
+
+if st.button("Run Monte Carlo Simulation"):
+    with st.spinner(f"Simulating {mc_draws:,} scenarios..."):
+        mc_outputs = montecarlo.simulate(
+            lambda draw_params: montecarlo.clinic_outputs(draw_params, returns=mc_returns, week=week),
+            params, mc_distributions, draws=mc_draws, seed=int(mc_seed)
+        )
+        # Keep only the summary and a histogram so session state stays small
+        st.session_state.clinic_monte_carlo = {
+            'inputs': mc_inputs,
+            'summary': montecarlo.summarize(mc_outputs),
+            'prob_negative_ebitda_y1': float(np.mean(mc_outputs['ebitda_y1'] < 0)),
+            'histogram': np.histogram(mc_outputs['ebitda_y1'], bins=60)
+        }
+
+mc_results = st.session_state.get('clinic_monte_carlo')
+if mc_results is None:
+    st.info("Set the uncertainty ranges above and click 'Run Monte Carlo Simulation' to see the distribution of outcomes.")
+else:
+    if mc_results['inputs'] != mc_inputs:
+        st.warning("Inputs have changed since the last simulation. Re-run it to update these results.")
+
+    mc_summary = mc_results['summary']
+    mc_metric_col1, mc_metric_col2, mc_metric_col3 = st.columns(3)
+    with mc_metric_col1:
+        st.metric("Probability of Negative Year 1 EBITDA", f"{mc_results['prob_negative_ebitda_y1']*100:.2f}%")
+    with mc_metric_col2:
+        st.metric("Median Year 1 EBITDA", f"£{mc_summary['ebitda_y1'][50]:,.0f}")
+    with mc_metric_col3:
+        st.metric("Median Payback Period", f"{mc_summary['payback_months'][50]:.1f} months")
+
+    # Percentile table
+    mc_rows = [
+        ('Year 1 EBITDA (£)', 'ebitda_y1', "{:,.0f}"),
+        ('Year 2 EBITDA (£)', 'ebitda_y2', "{:,.0f}"),
+        ('Year 3 EBITDA (£)', 'ebitda_y3', "{:,.0f}"),
+        ('Year 1 ROI (%)', 'roi_y1', "{:.1f}"),
+        ('Year 2 ROI (%)', 'roi_y2', "{:.1f}"),
+        ('Year 3 ROI (%)', 'roi_y3', "{:.1f}"),
+        ('Payback Period (Months)', 'payback_months', "{:.1f}")
+    ]
+    mc_deterministic = [
+        f"{ebitda_y1:,.0f}",
+        f"{ebitda_y2:,.0f}",
+        f"{ebitda_y3:,.0f}",
+        f"{roi_y1:.1f}",
+        f"{roi_y2:.1f}",
+        f"{roi_y3:.1f}",
+        f"{payback_months:.1f}"
+    ]
+    if 'npv' in mc_summary:
+        mc_rows += [
+            ('3-Year NPV (£)', 'npv', "{:,.0f}"),
+            ('3-Year IRR (%)', 'irr', "{:.1f}"),
+            ('Discounted Payback (Months)', 'discounted_payback_months', "{:.1f}")
+        ]
+        mc_deterministic += [f"{npv:,.0f}", f"{irr:.1f}", f"{discounted_payback_months:.1f}"]
+    df_monte_carlo = pd.DataFrame({
+        'Metric': [label for label, _, _ in mc_rows],
+        'P5': [fmt.format(mc_summary[key][5]) for _, key, fmt in mc_rows],
+        'P50': [fmt.format(mc_summary[key][50]) for _, key, fmt in mc_rows],
+        'P95': [fmt.format(mc_summary[key][95]) for _, key, fmt in mc_rows],
+        'Deterministic': mc_deterministic
+    })
+    st.table(df_monte_carlo)
+
+    # Year 1 EBITDA distribution
+    mc_counts, mc_edges = mc_results['histogram']
+    mc_centers = (mc_edges[:-1] + mc_edges[1:]) / 2
+    def build_monte_carlo_chart(mc_centers, mc_counts, mc_summary):
+        fig_monte_carlo = go.Figure()
+        fig_monte_carlo.add_trace(go.Bar(
+            x=mc_centers,
+            y=mc_counts / mc_counts.sum() * 100,
+            name="Year 1 EBITDA",
+            marker_color=np.where(mc_centers < 0, 'firebrick', 'darkblue')
+        ))
+        for percentile, dash in [(5, 'dot'), (50, 'dash'), (95, 'dot')]:
+            fig_monte_carlo.add_vline(
+                x=mc_summary['ebitda_y1'][percentile],
+                line_dash=dash,
+                line_color='black',
+                annotation_text=f"P{percentile}"
+            )
+        fig_monte_carlo.update_layout(
+            title='Distribution of Year 1 EBITDA',
+            xaxis=dict(title='Year 1 EBITDA (£)'),
+            yaxis=dict(title='Share of Draws (%)'),
+            bargap=0,
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(color='black')
+        )
+        return fig_monte_carlo
+
+    fig_monte_carlo = dashboard_utils.cached_figure(build_monte_carlo_chart, mc_centers, mc_counts, mc_summary)
+    st.plotly_chart(fig_monte_carlo, use_container_width=True)
+
+# Multi-site portfolio
+st.subheader("Portfolio")
+
+portfolio_section = dashboard_utils.lazy_expander("Multi-Site Portfolio", "portfolio_section", ["portfolio_regions", "portfolio_years", "portfolio_site"])
+if not portfolio_section.open and "portfolio_edited" in st.session_state:
+    # The table editor forgets its edits while collapsed, so keep them as the starting table
+    st.session_state.portfolio_sites = st.session_state.pop("portfolio_edited")
+
+with portfolio_section:
+    if portfolio_section.open:
+        st.markdown("One row per site. Blank cells, and inputs without a column, take the sidebar values. "
+                    "Upload a CSV with `site`, `region`, `opening_year` and any sidebar input names as columns to replace the table.")
+        portfolio_upload = st.file_uploader("Upload Sites (CSV)", type="csv", key="portfolio_upload")
+        if portfolio_upload is not None and st.session_state.get("portfolio_upload_id") != portfolio_upload.file_id:
+            st.session_state.portfolio_upload_id = portfolio_upload.file_id
+            st.session_state.portfolio_sites = pd.read_csv(portfolio_upload)
+            st.session_state.pop("portfolio_edited", None)
+            st.session_state.portfolio_editor_version = st.session_state.get("portfolio_editor_version", 0) + 1
+        if "portfolio_sites" not in st.session_state:
+            st.session_state.portfolio_sites = portfolio.site_table(business_name, business_location, datetime.now().year, params)
+
+        portfolio_sites = st.data_editor(
+            st.session_state.portfolio_sites,
+            num_rows="dynamic",
+            use_container_width=True,
+            key=f"portfolio_editor_{st.session_state.get('portfolio_editor_version', 0)}"
+        )
+        st.session_state.portfolio_edited = portfolio_sites
+
+        try:
+            # Rows without an opening year are still being filled in
+            portfolio_results = dashboard_utils.portfolio_evaluate(portfolio_sites.dropna(subset=['opening_year']).reset_index(drop=True), params, week=week)
+        except (KeyError, ValueError) as e:
+            st.error(f"Could not evaluate the portfolio: {e}")
+            portfolio_results = None
+
+        if portfolio_results is not None and len(portfolio_results):
+            # Slice by region and opening year; an empty selection means all
+            portfolio_region_options = sorted(portfolio_results['region'].unique())
+            portfolio_year_options = sorted(portfolio_results['opening_year'].unique().tolist())
+            for key, options in [("portfolio_regions", portfolio_region_options), ("portfolio_years", portfolio_year_options)]:
+                if key in st.session_state:
+                    st.session_state[key] = [value for value in st.session_state[key] if value in options]
+            filter_col1, filter_col2 = st.columns(2)
+            with filter_col1:
+                portfolio_regions = st.multiselect("Regions", portfolio_region_options, placeholder="All regions", key="portfolio_regions")
+            with filter_col2:
+                portfolio_years = st.multiselect("Opening Years", portfolio_year_options, placeholder="All years", key="portfolio_years")
+            portfolio_mask = np.ones(len(portfolio_results), dtype=bool)
+            if portfolio_regions:
+                portfolio_mask &= portfolio_results['region'].isin(portfolio_regions).to_numpy()
+            if portfolio_years:
+                portfolio_mask &= portfolio_results['opening_year'].isin(portfolio_years).to_numpy()
+            portfolio_selected = portfolio_results[portfolio_mask].reset_index(drop=True)
+
+            if len(portfolio_selected) == 0:
+                st.info("No sites match the selected regions and opening years.")
+            else:
+                portfolio_by_year = portfolio.consolidate(portfolio_selected)
+                portfolio_payback = portfolio.payback_months(portfolio_selected)
+
+                pf_col1, pf_col2, pf_col3, pf_col4 = st.columns(4)
+                with pf_col1:
+                    st.metric("Sites", f"{len(portfolio_selected)}")
+                with pf_col2:
+                    st.metric("Total Capex", f"£{portfolio_selected['capex'].sum():,.0f}")
+                with pf_col3:
+                    st.metric("Year 3 EBITDA (All Sites)", f"£{portfolio_selected['ebitda_y3'].sum():,.0f}")
+                with pf_col4:
+                    st.metric("Portfolio Payback", f"{portfolio_payback:.1f} months" if np.isfinite(portfolio_payback) else "Not reached")
+
+                # Consolidated revenue, EBITDA and capex by calendar year
+                def build_portfolio_chart(portfolio_by_year):
+                    fig_portfolio = go.Figure()
+                    fig_portfolio.add_trace(go.Bar(x=portfolio_by_year['year'], y=portfolio_by_year['revenue'], name='Revenue', marker_color='darkblue'))
+                    fig_portfolio.add_trace(go.Bar(x=portfolio_by_year['year'], y=portfolio_by_year['ebitda'], name='EBITDA', marker_color='green'))
+                    fig_portfolio.add_trace(go.Bar(x=portfolio_by_year['year'], y=portfolio_by_year['capex'], name='Capex', marker_color='firebrick'))
+                    fig_portfolio.add_trace(go.Scatter(
+                        x=portfolio_by_year['year'],
+                        y=portfolio_by_year['cumulative_cash'],
+                        name='Cumulative Cash',
+                        mode='lines+markers',
+                        line=dict(color='black', width=2)
+                    ))
+                    fig_portfolio.update_layout(
+                        title='Consolidated Portfolio by Calendar Year',
+                        xaxis=dict(title='Year', dtick=1),
+                        yaxis=dict(title='Amount (£)'),
+                        barmode='group',
+                        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                        plot_bgcolor='white',
+                        paper_bgcolor='white',
+                        font=dict(color='black')
+                    )
+                    return fig_portfolio
+
+                fig_portfolio = dashboard_utils.cached_figure(build_portfolio_chart, portfolio_by_year)
+                st.plotly_chart(fig_portfolio, use_container_width=True)
+
+                st.dataframe(pd.DataFrame({
+                    'Year': portfolio_by_year['year'].astype(str),
+                    'Sites Open': portfolio_by_year['sites_open'],
+                    'Revenue': [f"£{x:,.0f}" for x in portfolio_by_year['revenue']],
+                    'EBITDA': [f"£{x:,.0f}" for x in portfolio_by_year['ebitda']],
+                    'Capex': [f"£{x:,.0f}" for x in portfolio_by_year['capex']],
+                    'Cumulative Cash': [f"£{x:,.0f}" for x in portfolio_by_year['cumulative_cash']]
+                }), hide_index=True, use_container_width=True)
+
+                # Site table and drill-down
+                st.markdown("**Sites**")
+                st.dataframe(
+                    portfolio_selected[['site', 'region', 'opening_year', 'capex', 'revenue_y1', 'ebitda_y1', 'revenue_y3', 'ebitda_y3', 'payback_months', 'cash_break_even_month']],
+                    column_config={
+                        'site': "Site",
+                        'region': "Region",
+                        'opening_year': st.column_config.NumberColumn("Opening Year", format="%d"),
+                        'capex': st.column_config.NumberColumn("Capex", format="£%,.0f"),
+                        'revenue_y1': st.column_config.NumberColumn("Year 1 Revenue", format="£%,.0f"),
+                        'ebitda_y1': st.column_config.NumberColumn("Year 1 EBITDA", format="£%,.0f"),
+                        'revenue_y3': st.column_config.NumberColumn("Year 3 Revenue", format="£%,.0f"),
+                        'ebitda_y3': st.column_config.NumberColumn("Year 3 EBITDA", format="£%,.0f"),
+                        'payback_months': st.column_config.NumberColumn("Payback (Months)", format="%.1f"),
+                        'cash_break_even_month': st.column_config.NumberColumn("Cash Break-Even Month", format="%d")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+                if st.session_state.get("portfolio_site", 0) >= len(portfolio_selected):
+                    st.session_state.portfolio_site = 0
+                portfolio_site = st.selectbox(
+                    "Site Details",
+                    range(len(portfolio_selected)),
+                    format_func=lambda i: f"{portfolio_selected['site'][i]} ({portfolio_selected['region'][i]}, {portfolio_selected['opening_year'][i]})",
+                    key="portfolio_site"
+                )
+                site_row = portfolio_selected.iloc[portfolio_site]
+                site_col1, site_col2, site_col3, site_col4 = st.columns(4)
+                with site_col1:
+                    st.metric("Capex", f"£{site_row['capex']:,.0f}")
+                with site_col2:
+                    st.metric("Year 3 ROI", f"{site_row['roi_y3']:.1f}%")
+                with site_col3:
+                    st.metric("Payback Period", f"{site_row['payback_months']:.1f} months" if np.isfinite(site_row['payback_months']) else "Not reached")
+                with site_col4:
+                    st.metric("Cash Break-Even", f"Month {site_row['cash_break_even_month']:.0f}" if np.isfinite(site_row['cash_break_even_month']) else "Not reached")
+                st.table(pd.DataFrame({
+                    'Calendar Year': [str(site_row['opening_year'] + year - 1) for year in range(1, 4)],
+                    'Revenue': [f"£{site_row[f'revenue_y{year}']:,.0f}" for year in range(1, 4)],
+                    'EBITDA': [f"£{site_row[f'ebitda_y{year}']:,.0f}" for year in range(1, 4)],
+                    'ROI': [f"{site_row[f'roi_y{year}']:.1f}%" for year in range(1, 4)]
+                }, index=['Year 1', 'Year 2', 'Year 3']))
+
 # Business Recommendations
 st.subheader("Business Recommendations")
 
@@ -1412,6 +2036,12 @@ with st.expander("Key Recommendations", expanded=True):
         "**Staff Retention**: Skilled staff are essential for service delivery. High turnover could impact quality and customer satisfaction."
     ]
     
+    if mc_results is not None:
+        risk_factors[1] += (
+            f" In the Monte Carlo simulation, Year 1 EBITDA ranges from £{mc_results['summary']['ebitda_y1'][5]:,.0f} (P5)"
+            f" to £{mc_results['summary']['ebitda_y1'][95]:,.0f} (P95), with a {mc_results['prob_negative_ebitda_y1']*100:.1f}% chance of a loss."
+        )
+
     for i, risk in enumerate(risk_factors, 1):
         st.markdown(f"{i}. {risk}")
 
@@ -0,0 +1,168 @@
+"""
+Discrete-event booking simulation for the clinic's treatment rooms.
+
+The projection engine books ``capacity_per_hour * operating_hours_weekly * 52
+* utilization`` sessions a year, as if demand arrived evenly and never
+clashed. This module simulates the year client by client instead: clients
+ask for a service at a time drawn from its hour-of-week demand in a
+``week_profile`` profile, and
+each service's rooms (cryotherapy chambers, saunas, IV chairs and face
+treatment rooms) are allocated from a heap of the times they next come free.
+A client who cannot start within ``max_wait_minutes`` of the time they asked
+for, or whose session would run past closing, is turned away. Members book
+the same rooms as paying clients but pay through their membership.
+
+Demand is scaled so that, without clashes, each service would sell exactly
+the sessions the projection expects in the simulated year, so the gap
+between the two shows what peaks and queueing cost.
+"""
+import heapq
+
+import numpy as np
+
+import clinic_model
+import week_profile
+
+MINUTES_PER_WEEK = week_profile.HOURS_PER_WEEK * 60
+
+# Treatment length in minutes, including turnaround; with the default
+# sessions per hour this gives one cryotherapy chamber, three saunas, one IV
+# chair and one face treatment room
+SESSION_MINUTES = [20, 45, 60, 30]
+
+DEFAULT_MAX_WAIT_MINUTES = 30
+
+
+def _closing_minutes(schedule):
+    """Minute of the week at which the open block containing each hour closes."""
+    closing = np.zeros(week_profile.HOURS_PER_WEEK)
+    close = 0
+    for hour in range(2 * week_profile.HOURS_PER_WEEK - 1, -1, -1):
+        if not schedule[hour % week_profile.HOURS_PER_WEEK]:
+            close = hour * 60
+        elif hour < week_profile.HOURS_PER_WEEK:
+            closing[hour] = close
+    return closing
+
+
+def _arrivals(rng, rates, weeks):
+    """Poisson arrival times in minutes for hourly ``rates`` shaped (weeks, 168)."""
+    counts = rng.poisson(rates).ravel()
+    hour_starts = np.arange(weeks * week_profile.HOURS_PER_WEEK, dtype=float) * 60
+    return np.sort(np.repeat(hour_starts, counts) + rng.random(counts.sum()) * 60)
+
+
+def _allocate(times, closes, rooms, minutes, max_wait):
+    """
+    Start time for each request in ``times`` (sorted), or NaN if turned away.
+
+    ``rooms`` identical rooms are kept in a heap keyed by the minute each is
+    next free; every request takes the earliest free room.
+    """
+    free = [0.0] * rooms
+    starts = np.full(len(times), np.nan)
+    for i, (time, close) in enumerate(zip(times.tolist(), closes.tolist())):
+        start = max(time, free[0])
+        if start - time <= max_wait and start + minutes <= close:
+            heapq.heapreplace(free, start + minutes)
+            starts[i] = start
+    return starts
+
+
+def _busy_by_hour(starts, minutes):
+    """Busy room-minutes per hour of the week for sessions starting at ``starts``."""
+    minute_of_week = starts % MINUTES_PER_WEEK
+    hour = (minute_of_week // 60).astype(int)
+    first = np.minimum(60 - minute_of_week % 60, minutes)
+    busy = np.bincount(hour, weights=first, minlength=week_profile.HOURS_PER_WEEK)
+    busy += np.bincount((hour + 1) % week_profile.HOURS_PER_WEEK, weights=minutes - first, minlength=week_profile.HOURS_PER_WEEK)
+    return busy
+
+
+def simulate(params=None, year=1, max_wait_minutes=DEFAULT_MAX_WAIT_MINUTES, session_minutes=None, week=None, seed=None):
+    """
+    Simulate one projection year of bookings, 52 weeks.
+
+    Weekly demand follows the monthly utilization ramp of ``year``, times each
+    service's utilization factor, spread over the open hours by the demand
+    multipliers of ``week`` (``week_profile.build()`` if not given); sessions
+    are charged at that hour's price. ``session_minutes`` overrides
+    SESSION_MINUTES per service. Returns, per
+    service in clinic_model.SERVICES order, the paying and member
+    ``demand``, ``served`` and ``turned_away`` counts, realized and projected
+    ``utilization`` and ``revenue``, the ``rooms`` simulated, the average
+    ``wait_minutes`` and ``hourly_utilization`` shaped (services, 168); plus
+    the open-hour ``schedule``, ``membership_revenue`` and the number of
+    booking ``events`` processed.
+    """
+    p = clinic_model.resolve_params(params)
+    rng = np.random.default_rng(seed)
+    weeks = clinic_model.WEEKS_PER_YEAR
+    session_minutes = np.asarray(session_minutes if session_minutes is not None else SESSION_MINUTES, dtype=float)
+    capacities = np.array([float(p[name]) for name in clinic_model.SERVICE_CAPACITY_INPUTS])
+    factors = np.array([float(p[name]) for name in clinic_model.SERVICE_UTILIZATION_FACTOR_INPUTS])
+    rooms = np.maximum(np.rint(capacities * session_minutes / 60), 1).astype(int)
+
+    week = week or week_profile.build()
+    schedule = np.asarray(week['open']) > 0
+    demand = np.asarray(week['demand'], dtype=float) * schedule
+    closes = _closing_minutes(schedule)
+
+    # Weekly base utilization from the monthly ramp of the simulated year
+    months = clinic_model.monthly_utilization(p, 12 * year)[-12:]
+    week_utilization = months[np.minimum(np.arange(weeks) * 12 // weeks, 11)]
+
+    projection = clinic_model.project(p, year, week=week)
+    prices = projection['service_prices'][:, -1, None] * np.asarray(week['price'], dtype=float)
+    members = projection['members'][:, -1]
+    member_weekly_visits = (members * np.asarray(clinic_model.MEMBERSHIP_VISITS_PER_MONTH)).sum() * 12 / weeks
+    # Members split their visits across services like paying clients
+    service_mix = capacities * factors / (capacities * factors).sum()
+
+    results = {name: np.zeros(len(clinic_model.SERVICES)) for name in (
+        'demand', 'served', 'turned_away', 'member_demand', 'member_served', 'member_turned_away',
+        'utilization', 'revenue', 'wait_minutes'
+    )}
+    hourly_utilization = np.zeros((len(clinic_model.SERVICES), week_profile.HOURS_PER_WEEK))
+    events = 0
+    open_minutes = schedule.sum() * 60 * weeks
+
+    for s in range(len(clinic_model.SERVICES)):
+        paying_rates = (capacities[s] * factors[s] * week_utilization)[:, None] * demand[s]
+        member_rates = np.full((weeks, 1), member_weekly_visits * service_mix[s] / schedule.sum()) * demand[s]
+        paying = _arrivals(rng, paying_rates, weeks)
+        member = _arrivals(rng, member_rates, weeks)
+
+        times = np.concatenate([paying, member])
+        is_member = np.concatenate([np.zeros(len(paying), dtype=bool), np.ones(len(member), dtype=bool)])
+        order = np.argsort(times, kind='stable')
+        times, is_member = times[order], is_member[order]
+        week_start = times // MINUTES_PER_WEEK * MINUTES_PER_WEEK
+        request_hours = (times % MINUTES_PER_WEEK // 60).astype(int)
+        request_closes = week_start + closes[request_hours]
+
+        starts = _allocate(times, request_closes, int(rooms[s]), session_minutes[s], max_wait_minutes)
+        served = ~np.isnan(starts)
+        events += len(times) + served.sum()
+
+        results['demand'][s] = np.sum(~is_member)
+        results['served'][s] = np.sum(served & ~is_member)
+        results['member_demand'][s] = np.sum(is_member)
+        results['member_served'][s] = np.sum(served & is_member)
+        results['utilization'][s] = served.sum() * session_minutes[s] / (rooms[s] * open_minutes)
+        results['revenue'][s] = prices[s][request_hours[served & ~is_member]].sum()
+        results['wait_minutes'][s] = np.mean(starts[served] - times[served]) if served.any() else 0.0
+        hourly_utilization[s] = _busy_by_hour(starts[served], session_minutes[s]) / (rooms[s] * 60 * weeks)
+
+    results['turned_away'] = results['demand'] - results['served']
+    results['member_turned_away'] = results['member_demand'] - results['member_served']
+    results.update({
+        'rooms': rooms,
+        'schedule': schedule,
+        'hourly_utilization': hourly_utilization,
+        'projected_utilization': projection['utilization'][:, -1],
+        'projected_revenue': projection['service_revenue'][:, -1],
+        'membership_revenue': float(projection['membership_revenue'][:, -1].sum()),
+        'events': int(events)
+    })
+    return results
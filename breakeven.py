@@ -0,0 +1,98 @@
+"""
+Mix-weighted break-even analysis for the clinic model.
+
+The annual projection's break-even figures divide fixed costs by the margin
+on an unweighted average of the service prices and leave memberships out.
+This module works on the monthly projection instead: every month's revenue
+per visit and contribution per visit come from the visits actually projected,
+pay-per-visit sessions from each service's utilization and capacity plus the
+visits members are entitled to, so the margin is weighted by the projected
+service and membership mix.
+
+It also finds the first month monthly EBITDA turns positive and the first
+month cumulative cash, net of the initial investment, does. Every input may be
+an array, as in ``clinic_model.project``, so whole batches of parameter sets
+are analysed in one monthly projection.
+"""
+import numpy as np
+
+import clinic_model
+import week_profile
+
+DEFAULT_MONTHS = 60
+
+
+def first_month(condition):
+    """First 1-based month along the last axis where ``condition`` holds, NaN if it never does."""
+    condition = np.asarray(condition, dtype=bool)
+    return np.where(condition.any(axis=-1), condition.argmax(axis=-1) + 1.0, np.nan)
+
+
+def monthly_visits(params, projection, week=None):
+    """
+    Visits per month, shaped like ``projection['revenue']``: pay-per-visit
+    sessions from the projected utilization of each service's capacity, plus
+    the visits included in every member's tier.
+    """
+    p = clinic_model.resolve_params(params)
+    weekly_hours = p['operating_hours_weekly'] if week is None else week_profile.weekly_hours(week)
+    monthly_hours = np.asarray(weekly_hours * clinic_model.WEEKS_PER_YEAR / 12)[..., None]
+    sessions = sum(
+        projection['utilization'][..., i, :] * p[name][..., None] * monthly_hours
+        for i, name in enumerate(clinic_model.SERVICE_CAPACITY_INPUTS)
+    )
+    member_visits = sum(
+        projection['members'][..., i, :] * visits
+        for i, visits in enumerate(clinic_model.MEMBERSHIP_VISITS_PER_MONTH)
+    )
+    return sessions + member_visits
+
+
+def analyse(params=None, months=DEFAULT_MONTHS, ramp='linear', week=None):
+    """
+    Break-even visits and months from the monthly projection.
+
+    Per month, shaped (..., months): ``visits``, ``revenue_per_visit``,
+    ``contribution_per_visit`` (revenue less variable costs, per visit) and
+    ``break_even_visits``, the visits that would cover that month's fixed
+    costs at its mix. For Year 1: ``contribution_margin_per_visit`` over the
+    first twelve months and the ``monthly_break_even_visits``,
+    ``weekly_break_even_visits`` and ``daily_break_even_visits`` covering the
+    Year 1 fixed costs at it, per day over ``operating_days_weekly`` or the
+    open days of ``week``. Then ``ebitda_positive_month`` and
+    ``cash_break_even_month``, NaN when not reached within ``months``.
+    Break-even visits are infinite where the contribution is not positive.
+    """
+    p = clinic_model.resolve_params(params)
+    projection = clinic_model.project_monthly(p, months, ramp, week=week)
+    visits = monthly_visits(p, projection, week)
+    contribution = projection['revenue'] - projection['variable_costs']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        revenue_per_visit = np.where(visits > 0, projection['revenue'] / visits, 0.0)
+        contribution_per_visit = np.where(visits > 0, contribution / visits, 0.0)
+        break_even_visits = np.where(contribution_per_visit > 0, projection['fixed_costs'] / contribution_per_visit, np.inf)
+
+        # Year 1, weighted by each month's visits
+        year1 = slice(0, min(months, 12))
+        year1_visits = visits[..., year1].sum(axis=-1)
+        contribution_margin_per_visit = np.where(year1_visits > 0, contribution[..., year1].sum(axis=-1) / year1_visits, 0.0)
+        monthly_fixed_costs = projection['fixed_costs'][..., year1].mean(axis=-1)
+        monthly_break_even_visits = np.where(contribution_margin_per_visit > 0, monthly_fixed_costs / contribution_margin_per_visit, np.inf)
+    weekly_break_even_visits = monthly_break_even_visits * 12 / clinic_model.WEEKS_PER_YEAR
+    days = p['operating_days_weekly'] if week is None else week_profile.open_days(week)
+
+    return {
+        'months': projection['months'],
+        'visits': visits,
+        'revenue_per_visit': revenue_per_visit,
+        'contribution_per_visit': contribution_per_visit,
+        'break_even_visits': break_even_visits,
+        'monthly_fixed_costs': monthly_fixed_costs,
+        'contribution_margin_per_visit': contribution_margin_per_visit,
+        'monthly_break_even_visits': monthly_break_even_visits,
+        'weekly_break_even_visits': weekly_break_even_visits,
+        'daily_break_even_visits': weekly_break_even_visits / days,
+        'ebitda_positive_month': first_month(projection['ebitda'] > 0),
+        'cash_break_even_month': first_month(projection['cumulative_cash'] >= 0)
+    }
@@ -0,0 +1,658 @@
+"""
+Projection engine for the longevity clinic financial model.
+
+Inputs are keyed by the sidebar variable names used in LongevityDashboardV2.py.
+Any input may be a scalar or a NumPy array; arrays are broadcast against each
+other, so one call evaluates a single clinic or many parameter sets at once.
+Service-level results are shaped (..., services, periods) and totals
+(..., periods), where a period is one year of operation.
+
+Besides the sidebar inputs, an optional ``rent_inflation`` (% per year) lets
+rent grow separately from ``expense_inflation``.
+
+``project`` and ``project_monthly`` also take an optional hour-of-week
+profile from ``week_profile``. With one, opening hours, demand and prices
+vary by hour: each hour's utilization is capped at 100% separately, and
+revenue, capacity and break-even come from dot products over the 168 hours
+of the week instead of the flat ``operating_hours_weekly``.
+"""
+import numpy as np
+
+import valuation
+
+SERVICES = ['Cryotherapy', 'Infrared Sauna', 'IV Therapy', 'Face Treatments']
+MEMBERSHIP_TIERS = ['Silver', 'Gold', 'Platinum']
+EXPENSE_CATEGORIES = [
+    'Rent',
+    'Staff Costs',
+    'Equipment Finance',
+    'Utilities',
+    'Supplies',
+    'Insurance',
+    'Marketing',
+    'Accounting/Legal',
+    'Maintenance',
+    'Miscellaneous'
+]
+
+WEEKS_PER_YEAR = 52
+
+# Every numeric sidebar input, in sidebar order, with the dashboard defaults
+DEFAULT_PARAMS = {
+    'business_size_sqft': 1600,
+    'operating_hours_weekly': 68,
+    'operating_days_weekly': 7,
+    'renovation_cost': 135000,
+    'equipment_cost': 50000,
+    'marketing_branding_initial': 15000,
+    'legal_permits_licenses': 10000,
+    'cryotherapy_price': 45,
+    'infrared_sauna_price': 45,
+    'iv_therapy_basic_price': 150,
+    'iv_therapy_premium_price': 250,
+    'face_treatment_price': 50,
+    'silver_membership_price': 225,
+    'gold_membership_price': 400,
+    'platinum_membership_price': 550,
+    'cryotherapy_capacity_per_hour': 3,
+    'infrared_sauna_capacity_per_hour': 4,
+    'iv_therapy_capacity_per_hour': 1,
+    'face_treatment_capacity_per_hour': 2,
+    'year1_start_utilization': 20,
+    'year1_end_utilization': 40,
+    'year2_start_utilization': 40,
+    'year2_end_utilization': 60,
+    'year3_utilization': 65,
+    'cryotherapy_utilization_factor': 1.0,
+    'infrared_sauna_utilization_factor': 1.2,
+    'iv_therapy_utilization_factor': 0.5,
+    'face_treatment_utilization_factor': 1.0,
+    'rent_monthly': 5000,
+    'staff_count': 3,
+    'staff_annual_salary': 30000,
+    'staff_benefits_tax_percent': 20.0,
+    'equipment_finance_monthly': 3500,
+    'utilities_monthly': 2000,
+    'supplies_percent_of_revenue': 20.0,
+    'insurance_annual': 6000,
+    'marketing_percent_of_revenue_y1': 12.0,
+    'marketing_percent_of_revenue': 8.0,
+    'accounting_legal_annual': 6000,
+    'maintenance_annual': 7200,
+    'miscellaneous_annual': 5000,
+    'price_increase_y2': 10.0,
+    'price_increase_y3': 5.0,
+    'expense_inflation': 3.0,
+    'maintenance_increase': 25.0,
+    'discount_rate': 10.0,
+    'silver_members_y1': 20,
+    'gold_members_y1': 10,
+    'platinum_members_y1': 5,
+    'membership_growth_y2': 50,
+    'membership_growth_y3': 30
+}
+
+PARAM_NAMES = list(DEFAULT_PARAMS)
+
+SERVICE_CAPACITY_INPUTS = [
+    'cryotherapy_capacity_per_hour',
+    'infrared_sauna_capacity_per_hour',
+    'iv_therapy_capacity_per_hour',
+    'face_treatment_capacity_per_hour'
+]
+SERVICE_UTILIZATION_FACTOR_INPUTS = [
+    'cryotherapy_utilization_factor',
+    'infrared_sauna_utilization_factor',
+    'iv_therapy_utilization_factor',
+    'face_treatment_utilization_factor'
+]
+MEMBERSHIP_PRICE_INPUTS = ['silver_membership_price', 'gold_membership_price', 'platinum_membership_price']
+MEMBERSHIP_COUNT_INPUTS = ['silver_members_y1', 'gold_members_y1', 'platinum_members_y1']
+# Services included per month in each tier, as on the V2 sidebar
+MEMBERSHIP_VISITS_PER_MONTH = [4, 8, 12]
+SERVICE_PRICE_INPUTS = [
+    'cryotherapy_price',
+    'infrared_sauna_price',
+    'iv_therapy_basic_price',
+    'iv_therapy_premium_price',
+    'face_treatment_price'
+]
+
+# Inputs read by each stage of ``project``; ``dataflow_graph`` wires the same stages to them
+COST_DRIVER_INPUTS = [
+    'expense_inflation', 'maintenance_increase', 'staff_count', 'staff_annual_salary', 'staff_benefits_tax_percent',
+    'rent_monthly', 'equipment_finance_monthly', 'utilities_monthly', 'insurance_annual', 'accounting_legal_annual',
+    'maintenance_annual', 'miscellaneous_annual', 'supplies_percent_of_revenue', 'marketing_percent_of_revenue_y1',
+    'marketing_percent_of_revenue'
+]
+REVENUE_DRIVER_INPUTS = [
+    'price_increase_y2', 'price_increase_y3', 'membership_growth_y2', 'membership_growth_y3', 'operating_hours_weekly',
+    *SERVICE_PRICE_INPUTS, *SERVICE_CAPACITY_INPUTS, *SERVICE_UTILIZATION_FACTOR_INPUTS,
+    *MEMBERSHIP_COUNT_INPUTS, *MEMBERSHIP_PRICE_INPUTS
+]
+INVESTMENT_INPUTS = ['renovation_cost', 'equipment_cost', 'marketing_branding_initial', 'legal_permits_licenses']
+UTILIZATION_INPUTS = [
+    'year1_start_utilization', 'year1_end_utilization', 'year2_start_utilization', 'year2_end_utilization', 'year3_utilization'
+]
+BREAK_EVEN_INPUTS = ['supplies_percent_of_revenue', 'marketing_percent_of_revenue_y1', 'operating_days_weekly']
+
+# Outputs of each stage of ``project``
+OPERATING_OUTPUTS = [
+    'revenue', 'fixed_costs', 'variable_costs', 'total_expenses', 'utilization', 'service_prices', 'service_revenue',
+    'members', 'membership_prices', 'membership_revenue', 'expenses'
+]
+EARNINGS_OUTPUTS = ['ebitda', 'ebitda_margin', 'cumulative_ebitda', 'roi', 'payback_months']
+BREAK_EVEN_OUTPUTS = [
+    'monthly_fixed_costs', 'avg_service_price', 'contribution_margin_per_visit',
+    'monthly_break_even_visits', 'weekly_break_even_visits', 'daily_break_even_visits'
+]
+
+# Rows evaluated per engine call in evaluate_batch, which bounds peak memory
+BATCH_CHUNK_SIZE = 100000
+
+
+def resolve_params(params=None):
+    """
+    Fill in missing inputs from DEFAULT_PARAMS and convert everything to float arrays.
+    """
+    resolved = dict(DEFAULT_PARAMS)
+    if params:
+        resolved.update(params)
+    return {name: np.asarray(value, dtype=float) for name, value in resolved.items()}
+
+
+def _stack(values, axis=-1):
+    """Broadcast a list of arrays against each other and stack them along a new axis."""
+    return np.stack(np.broadcast_arrays(*values), axis=axis)
+
+
+def _per_year(values, years):
+    """Lay out per-year values along a trailing period axis, repeating the last one."""
+    return _stack([values[min(year, len(values) - 1)] for year in range(years)])
+
+
+def _growth_index(rates, years):
+    """
+    Cumulative growth index with Year 1 at 1.0.
+
+    ``rates`` are percentage increases applied at the start of Year 2, Year 3, ...;
+    the last rate keeps applying to every later year.
+    """
+    rates = [np.asarray(rate, dtype=float) for rate in rates]
+    index = [np.ones(np.broadcast_shapes(*[rate.shape for rate in rates]))]
+    for year in range(1, years):
+        index.append(index[-1] * (1 + rates[min(year, len(rates)) - 1] / 100))
+    return np.stack(index, axis=-1)
+
+
+def _weekly_utilization(utilization, demand, price, open_hours):
+    """
+    Average and price-weighted utilization of one service over the week.
+
+    ``utilization`` is the uncapped utilization per period; each open hour
+    gets it times that hour's ``demand`` multiplier, capped at 100%, and the
+    price-weighted average also carries the hour's ``price`` multiplier.
+    """
+    hourly = np.minimum(utilization[..., None] * demand, 1.0)
+    hours = open_hours.sum()
+    return hourly @ open_hours / hours, hourly @ (open_hours * price) / hours
+
+
+def _price_factors(week):
+    """Demand-weighted average price multiplier per service over the open hours."""
+    weights = week['demand'] * week['open']
+    return (weights * week['price']).sum(axis=-1) / weights.sum(axis=-1)
+
+
+def _open_days(open_hours):
+    return (open_hours.reshape(7, 24).sum(axis=-1) > 0).sum()
+
+
+def _cost_drivers(p, years):
+    """
+    Per-year operating costs: fixed annual amounts and shares of revenue per
+    expense category, each shaped (..., years).
+    """
+    periods = np.arange(1, years + 1)
+    zeros = np.zeros(years)
+    inflation_index = _growth_index([p['expense_inflation']], years)
+    # Rent follows general expense inflation unless a separate rent_inflation is given
+    rent_index = _growth_index([p['rent_inflation']], years) if 'rent_inflation' in p else inflation_index
+    maintenance_index = _growth_index([p['maintenance_increase']], years)
+    # Year 3 adds half an FTE but is budgeted at Year 2 pay rates, as in the forecast
+    staff_index = _growth_index([p['expense_inflation'], np.zeros_like(p['expense_inflation']), p['expense_inflation']], years)
+    staff_fte = p['staff_count'][..., None] + np.where(periods >= 3, 0.5, 0.0)
+    staff_cost_annual = p['staff_annual_salary'] * (1 + p['staff_benefits_tax_percent'] / 100)
+
+    return {
+        'staff_fte': staff_fte,
+        'staff_cost_annual': staff_cost_annual,
+        'fixed_costs': {
+            'Rent': p['rent_monthly'][..., None] * 12 * rent_index,
+            'Staff Costs': staff_fte * staff_cost_annual[..., None] * staff_index,
+            'Equipment Finance': p['equipment_finance_monthly'][..., None] * 12 + zeros,
+            'Utilities': p['utilities_monthly'][..., None] * 12 * inflation_index,
+            'Insurance': p['insurance_annual'][..., None] * inflation_index,
+            'Accounting/Legal': p['accounting_legal_annual'][..., None] * inflation_index,
+            'Maintenance': p['maintenance_annual'][..., None] * maintenance_index,
+            'Miscellaneous': p['miscellaneous_annual'][..., None] * inflation_index
+        },
+        'variable_rates': {
+            'Supplies': p['supplies_percent_of_revenue'][..., None] / 100 + zeros,
+            'Marketing': _per_year([p['marketing_percent_of_revenue_y1'], p['marketing_percent_of_revenue']], years) / 100
+        }
+    }
+
+
+def _revenue_drivers(p, years, week=None):
+    """Per-year price and membership indices, and per-service prices, capacities and volumes."""
+    if week is not None:
+        week = {name: np.asarray(values, dtype=float) for name, values in week.items()}
+    weekly_hours = p['operating_hours_weekly'] if week is None else week['open'].sum()
+    annual_hours = weekly_hours * WEEKS_PER_YEAR
+    avg_iv_therapy_price = (p['iv_therapy_basic_price'] + p['iv_therapy_premium_price']) / 2
+
+    return {
+        'price_index': _growth_index([p['price_increase_y2'], p['price_increase_y3']], years),
+        'members_index': _growth_index([p['membership_growth_y2'], p['membership_growth_y3']], years),
+        'service_prices': [p['cryotherapy_price'], p['infrared_sauna_price'], avg_iv_therapy_price, p['face_treatment_price']],
+        'annual_sessions': [p[name] * annual_hours for name in SERVICE_CAPACITY_INPUTS],
+        'utilization_factors': [p[name] for name in SERVICE_UTILIZATION_FACTOR_INPUTS],
+        'members': [p[name] for name in MEMBERSHIP_COUNT_INPUTS],
+        'membership_prices': [p[name] for name in MEMBERSHIP_PRICE_INPUTS],
+        'week': week
+    }
+
+
+def _initial_investment(p):
+    return p['renovation_cost'] + p['equipment_cost'] + p['marketing_branding_initial'] + p['legal_permits_licenses']
+
+
+def _drivers(p, years, week=None):
+    """
+    Per-year prices, volumes and costs shared by the annual and monthly projections.
+
+    Expense categories are split into fixed annual amounts and shares of revenue,
+    each shaped (..., years).
+    """
+    return {
+        **_cost_drivers(p, years),
+        **_revenue_drivers(p, years, week),
+        'initial_investment': _initial_investment(p)
+    }
+
+
+def _base_utilization(p, years):
+    """
+    Utilization before service factors for each projection year, as a
+    fraction: the average of the start and end sliders for Years 1 and 2, then
+    the Year 3 utilization.
+    """
+    year1_avg_utilization = (p['year1_start_utilization'] + p['year1_end_utilization']) / 2
+    year2_avg_utilization = (p['year2_start_utilization'] + p['year2_end_utilization']) / 2
+    return _per_year([year1_avg_utilization, year2_avg_utilization, p['year3_utilization']], years) / 100
+
+
+def _operate(d, base_utilization, period_year, periods_per_year, detail):
+    """
+    Revenue and operating costs for a run of periods.
+
+    ``period_year`` maps each period to its projection year (0-based), or is
+    None when the periods are the projection years themselves, and
+    ``base_utilization`` gives the utilization before service factors for each
+    period. Per-service, per-tier and per-category arrays are only stacked when
+    ``detail`` is set, which keeps large batches cheap.
+    """
+    def by_period(values):
+        return values if period_year is None else values[..., period_year]
+
+    price_index = by_period(d['price_index'])
+    members_index = by_period(d['members_index'])
+
+    # Service revenue, with utilization capped at 100% (hour by hour with a weekly profile)
+    week = d['week']
+    if week is None:
+        utilization = [np.minimum(base_utilization * factor[..., None], 1.0) for factor in d['utilization_factors']]
+        priced_utilization = utilization
+    else:
+        weekly = [
+            _weekly_utilization(base_utilization * factor[..., None], demand, price, week['open'])
+            for factor, demand, price in zip(d['utilization_factors'], week['demand'], week['price'])
+        ]
+        utilization = [average for average, _ in weekly]
+        priced_utilization = [priced for _, priced in weekly]
+    service_revenue = [
+        price[..., None] * price_index * (sessions / periods_per_year)[..., None] * service_utilization
+        for price, sessions, service_utilization in zip(d['service_prices'], d['annual_sessions'], priced_utilization)
+    ]
+
+    # Membership revenue
+    members = [count[..., None] * members_index for count in d['members']]
+    membership_prices = [price[..., None] * price_index for price in d['membership_prices']]
+    membership_revenue = [count * price * (12 / periods_per_year) for count, price in zip(members, membership_prices)]
+
+    revenue = sum(service_revenue) + sum(membership_revenue)
+
+    # Operating expenses
+    fixed_costs = {category: by_period(cost) / periods_per_year for category, cost in d['fixed_costs'].items()}
+    variable_costs = {category: revenue * by_period(rate) for category, rate in d['variable_rates'].items()}
+    total_fixed_costs = sum(fixed_costs.values())
+    total_variable_costs = sum(variable_costs.values())
+
+    result = {
+        'revenue': revenue,
+        'fixed_costs': total_fixed_costs,
+        'variable_costs': total_variable_costs,
+        'total_expenses': total_fixed_costs + total_variable_costs
+    }
+    if detail:
+        result.update({
+            'utilization': _stack(utilization, axis=-2),
+            'service_prices': _stack([price[..., None] * price_index for price in d['service_prices']], axis=-2),
+            'service_revenue': _stack(service_revenue, axis=-2),
+            'members': _stack(members, axis=-2),
+            'membership_prices': _stack(membership_prices, axis=-2),
+            'membership_revenue': _stack(membership_revenue, axis=-2),
+            'expenses': _stack([
+                fixed_costs[category] if category in fixed_costs else variable_costs[category]
+                for category in EXPENSE_CATEGORIES
+            ], axis=-2)
+        })
+    return result
+
+
+def project(params=None, years=3, detail=True, week=None):
+    """
+    Project revenue, expenses, EBITDA, ROI and payback over ``years`` years.
+
+    Years 1 and 2 use the average of their start and end utilization sliders and
+    Year 3 onwards the Year 3 utilization. Growth rates entered for Year 3 keep
+    applying to every later year. With ``detail=False`` only totals are returned,
+    without the per-service and per-category breakdowns. ``week`` is an optional
+    hour-of-week profile (see ``week_profile``).
+
+    Break-even visits convert from months to weeks over the 52-week year and
+    from weeks to days over ``operating_days_weekly``, or the open days of
+    ``week``.
+    """
+    p = resolve_params(params)
+    d = _drivers(p, years, week)
+    result = _operate(d, _base_utilization(p, years), None, 1, detail)
+    result.update({'years': np.arange(1, years + 1), 'initial_investment': d['initial_investment']})
+    result.update(_earnings(result, d['initial_investment']))
+    result.update(_break_even(p, d))
+    return result
+
+
+def _earnings(operations, initial_investment):
+    """EBITDA, its margin and running total, ROI and payback from the annual ``_operate`` results."""
+    revenue = operations['revenue']
+    ebitda = revenue - operations['total_expenses']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cumulative_ebitda = np.cumsum(ebitda, axis=-1)
+        # Payback period (simplified, from Year 1 EBITDA)
+        monthly_ebitda_y1 = ebitda[..., 0] / 12
+        return {
+            'ebitda': ebitda,
+            'ebitda_margin': np.where(revenue > 0, ebitda / revenue * 100, 0.0),
+            'cumulative_ebitda': cumulative_ebitda,
+            'roi': cumulative_ebitda / initial_investment[..., None] * 100,
+            'payback_months': np.where(monthly_ebitda_y1 > 0, initial_investment / monthly_ebitda_y1, np.inf)
+        }
+
+
+def _break_even(p, d):
+    """
+    Break-even visits on Year 1 fixed costs at the margin of the average
+    service price, per month, week and open day.
+    """
+    week = d['week']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        monthly_fixed_costs = sum(cost[..., 0] for cost in d['fixed_costs'].values()) / 12
+        price_factors = np.ones(len(SERVICES)) if week is None else _price_factors(week)
+        avg_service_price = sum(price * factor for price, factor in zip(d['service_prices'], price_factors)) / len(SERVICES)
+        avg_variable_cost_per_visit = avg_service_price * ((p['supplies_percent_of_revenue'] + p['marketing_percent_of_revenue_y1']) / 100)
+        contribution_margin_per_visit = avg_service_price - avg_variable_cost_per_visit
+        monthly_break_even_visits = monthly_fixed_costs / contribution_margin_per_visit
+        weekly_break_even_visits = monthly_break_even_visits * 12 / WEEKS_PER_YEAR
+        daily_break_even_visits = weekly_break_even_visits / (p['operating_days_weekly'] if week is None else _open_days(week['open']))
+    return {
+        'monthly_fixed_costs': monthly_fixed_costs,
+        'avg_service_price': avg_service_price,
+        'contribution_margin_per_visit': contribution_margin_per_visit,
+        'monthly_break_even_visits': monthly_break_even_visits,
+        'weekly_break_even_visits': weekly_break_even_visits,
+        'daily_break_even_visits': daily_break_even_visits
+    }
+
+
+def _stage(names, function):
+    """Graph node calling ``function`` with a dict of the inputs ``names``."""
+    names = tuple(names)
+    return names, lambda *values: function(dict(zip(names, values)))
+
+
+def _outputs(stage, names):
+    """Graph nodes picking each of ``names`` out of the dict the node ``stage`` returns."""
+    return {name: ((stage,), lambda result, name=name: result[name]) for name in names}
+
+
+def dataflow_graph(years=3, weekly=False):
+    """
+    The annual projection as a dependency graph for ``dataflow.evaluate``.
+
+    The nodes are the stages of ``project`` itself, each reading only its own
+    inputs, so a changed input recomputes just the stages downstream of it;
+    every output of ``project(params, years)`` is a node picked from its
+    stage. Only the sidebar inputs are covered, so rent follows
+    ``expense_inflation``. With ``weekly`` the graph follows
+    ``project(params, years, week=...)`` instead, and takes the profile's
+    arrays as the inputs ``week_open``, ``week_demand`` and ``week_price``.
+    """
+    if weekly:
+        # Hours, capacity and open days come from the profile instead
+        week_inputs = ['week_open', 'week_demand', 'week_price']
+        revenue_inputs = [name for name in REVENUE_DRIVER_INPUTS if name != 'operating_hours_weekly'] + week_inputs
+        break_even_inputs = [name for name in BREAK_EVEN_INPUTS if name != 'operating_days_weekly']
+    else:
+        week_inputs = []
+        revenue_inputs = REVENUE_DRIVER_INPUTS
+        break_even_inputs = BREAK_EVEN_INPUTS
+
+    def revenue_drivers(q):
+        week = {name[len('week_'):]: q[name] for name in week_inputs} if weekly else None
+        return _revenue_drivers(q, years, week)
+
+    return {
+        'years': ((), lambda: np.arange(1, years + 1)),
+        'initial_investment': _stage(INVESTMENT_INPUTS, _initial_investment),
+        'cost_drivers': _stage(COST_DRIVER_INPUTS, lambda q: _cost_drivers(q, years)),
+        'revenue_drivers': _stage(revenue_inputs, revenue_drivers),
+        'base_utilization': _stage(UTILIZATION_INPUTS, lambda q: _base_utilization(q, years)),
+        'operations': (
+            ('revenue_drivers', 'cost_drivers', 'base_utilization'),
+            lambda revenue, costs, base: _operate({**revenue, **costs}, base, None, 1, True)
+        ),
+        'earnings': (('operations', 'initial_investment'), _earnings),
+        'break_even': (
+            ('revenue_drivers', 'cost_drivers', *break_even_inputs),
+            lambda revenue, costs, *values: _break_even(dict(zip(break_even_inputs, values)), {**revenue, **costs})
+        ),
+        **_outputs('operations', OPERATING_OUTPUTS),
+        **_outputs('earnings', EARNINGS_OUTPUTS),
+        **_outputs('break_even', BREAK_EVEN_OUTPUTS)
+    }
+
+
+def ramp_shape(fraction, ramp='linear', steepness=10.0):
+    """
+    Map the fraction of a ramp year elapsed (0 to 1) to the fraction of the
+    start-to-end utilization change achieved.
+
+    ``'logistic'`` follows an S-curve rescaled to pass exactly through both ends.
+    """
+    fraction = np.asarray(fraction, dtype=float)
+    if ramp == 'linear':
+        return fraction
+    if ramp == 'logistic':
+        def logistic(x):
+            return 1 / (1 + np.exp(-steepness * (x - 0.5)))
+        return (logistic(fraction) - logistic(0.0)) / (logistic(1.0) - logistic(0.0))
+    raise ValueError(f"Unknown utilization ramp: {ramp}")
+
+
+def monthly_utilization(params=None, months=36, ramp='linear', steepness=10.0):
+    """
+    Base utilization (before service factors) for each month, as a fraction.
+
+    Years 1 and 2 move from their starting to their ending slider over the
+    twelve months of the year; Year 3 onwards holds the Year 3 utilization.
+    """
+    p = resolve_params(params)
+    month_in_year = np.arange(months) % 12
+    year = np.arange(months) // 12
+    progress = ramp_shape(month_in_year / 11, ramp, steepness)
+
+    year1 = p['year1_start_utilization'][..., None] + (p['year1_end_utilization'] - p['year1_start_utilization'])[..., None] * progress
+    year2 = p['year2_start_utilization'][..., None] + (p['year2_end_utilization'] - p['year2_start_utilization'])[..., None] * progress
+    year3 = p['year3_utilization'][..., None] + np.zeros(months)
+    return np.select([year == 0, year == 1], [year1, year2], year3) / 100
+
+
+def project_monthly(params=None, months=36, ramp='linear', steepness=10.0, detail=True, week=None):
+    """
+    Month-by-month projection of revenue, costs and cash.
+
+    Utilization ramps month by month (see ``monthly_utilization``), while prices,
+    membership numbers and fixed costs step up at each year boundary exactly as
+    in ``project``. With a linear ramp the twelve months of each year add up to
+    the annual projection, apart from the 100% utilization cap being applied
+    monthly. ``cumulative_cash`` starts from the initial investment outlay.
+    ``week`` is an optional hour-of-week profile, as in ``project``.
+    """
+    p = resolve_params(params)
+    d = _drivers(p, -(-months // 12), week)
+
+    base_utilization = monthly_utilization(p, months, ramp, steepness)
+    result = _operate(d, base_utilization, np.arange(months) // 12, 12, detail)
+    ebitda = result['revenue'] - result['total_expenses']
+
+    result.update({
+        'months': np.arange(1, months + 1),
+        'initial_investment': d['initial_investment'],
+        'ebitda': ebitda,
+        'cash': ebitda,
+        'cumulative_cash': np.cumsum(ebitda, axis=-1) - d['initial_investment'][..., None]
+    })
+    return result
+
+
+def returns(params=None, years=3, ramp='linear', steepness=10.0, week=None):
+    """
+    NPV, IRR and discounted payback over ``years`` years of monthly cash.
+
+    The cashflows are the initial investment at the start, then each month's
+    EBITDA from ``project_monthly``, with no terminal value; the NPV and
+    discounted payback use the ``discount_rate`` input. Returns those
+    ``cashflows`` with the ``valuation.evaluate`` results.
+    """
+    return _returns(params, years, ramp, steepness, week)
+
+
+def _returns(params, years=3, ramp='linear', steepness=10.0, week=None):
+    """``returns``, callable where an argument named ``returns`` hides it."""
+    p = resolve_params(params)
+    monthly = project_monthly(p, 12 * years, ramp, steepness, detail=False, week=week)
+    ebitda = monthly['ebitda']
+    outlay = np.broadcast_to(-monthly['initial_investment'][..., None], ebitda.shape[:-1] + (1,))
+    cashflows = np.concatenate([outlay, ebitda], axis=-1)
+    result = valuation.evaluate(cashflows, p['discount_rate'])
+    result['cashflows'] = cashflows
+    return result
+
+
+def param_matrix(params=None, rows=1):
+    """
+    Repeat one parameter set into a (rows, len(PARAM_NAMES)) matrix for evaluate_batch.
+    """
+    p = resolve_params(params)
+    return np.tile([float(p[name]) for name in PARAM_NAMES], (rows, 1))
+
+
+def params_from_matrix(param_sets):
+    """
+    Split a (rows, len(PARAM_NAMES)) matrix into contiguous per-input columns.
+    """
+    param_sets = np.atleast_2d(np.asarray(param_sets, dtype=float))
+    if param_sets.shape[-1] != len(PARAM_NAMES):
+        raise ValueError(f"Expected {len(PARAM_NAMES)} parameter columns, got {param_sets.shape[-1]}")
+    return dict(zip(PARAM_NAMES, np.ascontiguousarray(param_sets.T)))
+
+
+def adjust(param_sets, price_factor=1.0, utilization_factor=1.0, supplies_percent_change=0.0):
+    """
+    Apply scenario-style adjustments to a parameter matrix, row by row.
+
+    ``price_factor`` scales the service session prices (not memberships),
+    ``utilization_factor`` scales every service utilization factor and
+    ``supplies_percent_change`` is added to supplies as a % of revenue. Each
+    argument is a scalar or one value per row.
+    """
+    adjusted = np.array(param_sets, dtype=float)
+    columns = {name: i for i, name in enumerate(PARAM_NAMES)}
+    for name in SERVICE_PRICE_INPUTS:
+        adjusted[:, columns[name]] *= price_factor
+    for name in SERVICE_UTILIZATION_FACTOR_INPUTS:
+        adjusted[:, columns[name]] *= utilization_factor
+    adjusted[:, columns['supplies_percent_of_revenue']] += supplies_percent_change
+    return adjusted
+
+
+def output_dtype(years=3, returns=False):
+    """
+    Structured dtype of evaluate_batch results for a ``years`` year horizon,
+    with the ``npv``, ``irr`` and ``discounted_payback_months`` fields if ``returns``.
+    """
+    fields = [('initial_investment', float)]
+    for metric in ('revenue', 'total_expenses', 'ebitda', 'ebitda_margin', 'roi'):
+        fields += [(f'{metric}_y{year}', float) for year in range(1, years + 1)]
+    fields += [
+        ('payback_months', float),
+        ('monthly_break_even_visits', float),
+        ('daily_break_even_visits', float)
+    ]
+    if returns:
+        fields += [('npv', float), ('irr', float), ('discounted_payback_months', float)]
+    return np.dtype(fields)
+
+
+def evaluate_batch(param_sets, years=3, chunk_size=BATCH_CHUNK_SIZE, returns=False, week=None):
+    """
+    Evaluate many parameter sets in one call.
+
+    ``param_sets`` is an (N, len(PARAM_NAMES)) array whose columns follow
+    PARAM_NAMES. Returns a structured array of N records with the fields from
+    ``output_dtype(years, returns)``, e.g. ``results['ebitda_y1']``. Rows are
+    processed in chunks so memory stays bounded for very large sweeps. With
+    ``returns``, each row also gets the NPV, IRR and discounted payback of its
+    monthly cashflows (see ``clinic_model.returns``), which costs about ten
+    times as much per row. ``week`` is an optional hour-of-week profile, as in
+    ``project``, shared by every row.
+    """
+    param_sets = np.atleast_2d(np.asarray(param_sets, dtype=float))
+    results = np.empty(len(param_sets), dtype=output_dtype(years, returns))
+    for start in range(0, len(param_sets), chunk_size):
+        params = params_from_matrix(param_sets[start:start + chunk_size])
+        projection = project(params, years, detail=False, week=week)
+        rows = results[start:start + chunk_size]
+        rows['initial_investment'] = projection['initial_investment']
+        for metric in ('revenue', 'total_expenses', 'ebitda', 'ebitda_margin', 'roi'):
+            for year in range(1, years + 1):
+                rows[f'{metric}_y{year}'] = projection[metric][:, year - 1]
+        for field in ('payback_months', 'monthly_break_even_visits', 'daily_break_even_visits'):
+            rows[field] = projection[field]
+        if returns:
+            valued = _returns(params, years, week=week)
+            for field in ('npv', 'irr', 'discounted_payback_months'):
+                rows[field] = valued[field]
+    return results
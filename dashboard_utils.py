@@ -0,0 +1,188 @@
+"""
+Streamlit helpers shared by the clinic and development dashboards.
+
+Every widget interaction reruns a dashboard script from the top. The model
+calls below are memoized with st.cache_data, keyed by their arguments, so a
+rerun triggered by an unrelated widget reuses the previous results instead of
+recomputing them. Each cache keeps at most CACHE_MAX_ENTRIES results and
+drops them after CACHE_TTL_SECONDS.
+
+Charts are cached the same way with ``cached_figure``: a figure is rebuilt
+only when the fingerprint of its builder and input data changes.
+
+Heavy sections sit in a ``lazy_expander`` and are only computed while open.
+
+The headline figures come from each model's dataflow graph, kept per session,
+so a changed input only recomputes the nodes downstream of it.
+"""
+import functools
+import hashlib
+import types
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import breakeven
+import clinic_model
+import dataflow
+import development_model
+import portfolio
+import sensitivity
+import solvers
+
+CACHE_MAX_ENTRIES = 128
+CACHE_TTL_SECONDS = 3600
+FIGURE_CACHE_MAX_ENTRIES = 256
+# Development dataflow graphs kept, one per spend profile assignment
+DEVELOPMENT_GRAPH_MAX_ENTRIES = 32
+
+
+def memoize(func):
+    """Cache ``func`` across reruns and sessions, keyed by its arguments."""
+    return st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(func)
+
+
+# Clinic model
+clinic_project_monthly = memoize(clinic_model.project_monthly)
+clinic_monthly_utilization = memoize(clinic_model.monthly_utilization)
+clinic_evaluate_batch = memoize(clinic_model.evaluate_batch)
+clinic_break_even = memoize(breakeven.analyse)
+clinic_returns = memoize(clinic_model.returns)
+clinic_price_utilization_grid = memoize(sensitivity.clinic_price_utilization_grid)
+clinic_tornado = memoize(sensitivity.clinic_tornado)
+portfolio_evaluate = memoize(portfolio.evaluate)
+clinic_goal_seek = memoize(solvers.clinic_goal_seek)
+clinic_frontier = memoize(solvers.clinic_frontier)
+
+# Development appraisal
+development_appraisal = memoize(development_model.appraise)
+development_grid = memoize(sensitivity.development_grid)
+development_curve = memoize(sensitivity.development_curve)
+development_tornado = memoize(sensitivity.development_tornado)
+
+CLINIC_GRAPH = clinic_model.dataflow_graph(weekly=True)
+DEFAULT_SPEND_PROFILES_KEY = development_model.spend_profiles_key()
+
+
+@functools.lru_cache(maxsize=DEVELOPMENT_GRAPH_MAX_ENTRIES)
+def development_graph(key):
+    """The development dataflow graph for the spend profiles ``key``, a ``spend_profiles_key``."""
+    return development_model.dataflow_graph(dict(zip(development_model.COST_CATEGORIES, key)))
+
+
+DEVELOPMENT_GRAPH = development_graph(DEFAULT_SPEND_PROFILES_KEY)
+
+
+def evaluate_graph(name, graph, params):
+    """
+    Evaluate ``graph`` for ``params``, reusing every node that does not depend
+    on an input changed since this session's previous evaluation.
+    """
+    key = f"dataflow_{name}"
+    state = dataflow.evaluate(graph, params, st.session_state.get(key))
+    st.session_state[key] = state
+    return state['values']
+
+
+def clinic_dataflow(params, week):
+    """
+    Every ``clinic_model.project`` output for the sidebar inputs and an
+    hour-of-week profile, over three years.
+    """
+    week_inputs = {f"week_{name}": values for name, values in week.items()}
+    return evaluate_graph('clinic', CLINIC_GRAPH, {**params, **week_inputs})
+
+
+def development_dataflow(params, profiles=None):
+    """
+    Every ``development_model.appraise`` and ``cashflow`` output for the
+    sidebar inputs, with costs phased by the spend ``profiles``; inputs off the
+    sidebar take their ``development_model.OPTIONAL_PARAMS`` default.
+    """
+    key = development_model.spend_profiles_key(profiles)
+    name = 'development' if key == DEFAULT_SPEND_PROFILES_KEY else f"development_{'_'.join(key)}"
+    return evaluate_graph(name, development_graph(key), development_model.resolve_params(params))
+
+
+def keep_widget_state(keys):
+    """
+    Keep the values of keyed widgets that are not drawn on this run.
+
+    Streamlit forgets a widget's value once a run finishes without drawing it.
+    """
+    for key in keys:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+def lazy_expander(label, key, widget_keys=()):
+    """
+    A collapsed expander that reruns the script when it is opened or closed.
+
+    Callers build the section's content only while ``.open`` is true, so a
+    collapsed section costs nothing. The inputs listed in ``widget_keys`` keep
+    their values while the section is collapsed.
+    """
+    expander = st.expander(label, key=key, on_change="rerun")
+    if not expander.open:
+        keep_widget_state(widget_keys)
+    return expander
+
+
+def _update_fingerprint(digest, value):
+    if isinstance(value, np.ndarray):
+        digest.update(f"ndarray:{value.dtype}:{value.shape}:".encode())
+        if value.dtype == object:
+            digest.update(repr(value.tolist()).encode())
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, pd.DataFrame):
+        digest.update(f"DataFrame:{list(value.columns)}:".encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(f"Series:{value.name}:".encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)}:".encode())
+        for key, item in value.items():
+            _update_fingerprint(digest, key)
+            _update_fingerprint(digest, item)
+    elif isinstance(value, types.CodeType):
+        # Nested code objects (comprehensions, lambdas) repr with their address
+        digest.update(value.co_code)
+        _update_fingerprint(digest, value.co_consts)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)}:".encode())
+        for item in value:
+            _update_fingerprint(digest, item)
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def fingerprint(*values):
+    """
+    Stable hash of numbers, strings, NumPy arrays, pandas objects and lists,
+    tuples or dicts of them.
+    """
+    digest = hashlib.sha256()
+    for value in values:
+        _update_fingerprint(digest, value)
+    return digest.hexdigest()
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def _build_figure(key, _builder, _args):
+    return _builder(*_args)
+
+
+def cached_figure(builder, *args):
+    """
+    Return ``builder(*args)``, reusing the figure built on an earlier rerun
+    when the builder's code and every argument are unchanged.
+
+    Builders must take all their data and layout options as arguments. The
+    figure is shared between reruns and sessions, so callers must not modify it.
+    """
+    key = fingerprint(builder.__module__, builder.__qualname__, builder.__code__, args)
+    return _build_figure(key, builder, args)
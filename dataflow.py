@@ -0,0 +1,113 @@
+"""
+Dependency-graph evaluation for the clinic and development models.
+
+A graph maps each node name to ``(inputs, function)``: ``inputs`` names model
+inputs or other nodes, and ``function`` takes their values in that order.
+``evaluate`` keeps the input values and node results of the previous call, so
+the next call recomputes only the nodes downstream of inputs that changed.
+``downstream`` lists what a given input influences.
+
+The graphs themselves live next to their engines, in
+``clinic_model.dataflow_graph`` and ``development_model.dataflow_graph``.
+"""
+import numpy as np
+
+
+def inputs(graph):
+    """Names the graph reads that are not nodes themselves, i.e. its model inputs."""
+    return sorted({name for node_inputs, _ in graph.values() for name in node_inputs if name not in graph})
+
+
+def order(graph):
+    """
+    Node names in evaluation order, each after every node it reads.
+
+    Raises ValueError if the graph has a cycle.
+    """
+    ordered = []
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = 'visiting'
+        for dependency in graph[name][0]:
+            if dependency in graph:
+                visit(dependency, path + [name])
+        state[name] = 'done'
+        ordered.append(name)
+
+    for name in graph:
+        visit(name, [])
+    return ordered
+
+
+def _plan(graph):
+    """Evaluation order, each node's position in it and the nodes reading each name."""
+    evaluation_order = order(graph)
+    dependents = {}
+    for name in evaluation_order:
+        for dependency in graph[name][0]:
+            dependents.setdefault(dependency, []).append(name)
+    return {
+        'order': evaluation_order,
+        'position': {name: i for i, name in enumerate(evaluation_order)},
+        'dependents': dependents
+    }
+
+
+def downstream(graph, names, plan=None):
+    """
+    Nodes that depend, directly or through other nodes, on any of ``names``,
+    in evaluation order.
+    """
+    plan = plan or _plan(graph)
+    affected = set()
+    pending = list(names)
+    while pending:
+        for dependent in plan['dependents'].get(pending.pop(), []):
+            if dependent not in affected:
+                affected.add(dependent)
+                pending.append(dependent)
+    return sorted(affected, key=plan['position'].__getitem__)
+
+
+def _key(value):
+    return value.shape, value.tobytes()
+
+
+def evaluate(graph, params, previous=None):
+    """
+    Evaluate every node of ``graph`` for the inputs in ``params``.
+
+    ``previous`` is the state returned by an earlier call on the same graph;
+    nodes that do not depend on a changed input keep their earlier value.
+    Returns a state dict holding the input ``params``, the node ``values`` and
+    the names ``recomputed`` on this call. Division warnings are silenced, as
+    in the model engines.
+    """
+    if previous is None:
+        plan = _plan(graph)
+        names = inputs(graph)
+    else:
+        plan = previous['plan']
+        names = previous['params']
+    params = {name: np.asarray(params[name], dtype=float) for name in names}
+    keys = {name: _key(value) for name, value in params.items()}
+
+    if previous is None:
+        dirty = plan['order']
+        values = {}
+    else:
+        changed = [name for name in names if keys[name] != previous['keys'][name]]
+        dirty = downstream(graph, changed, plan)
+        values = dict(previous['values'])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name in dirty:
+            node_inputs, function = graph[name]
+            values[name] = function(*[values[item] if item in graph else params[item] for item in node_inputs])
+
+    return {'params': params, 'keys': keys, 'values': values, 'recomputed': dirty, 'plan': plan}
@@ -0,0 +1,752 @@
+"""
+Appraisal engine for the property development financial model.
+
+Inputs are keyed by the sidebar variable names used in
+LongevityClinic-dashboard.py. Any input may be a scalar or a NumPy array;
+arrays are broadcast against each other, so one call appraises a single
+scheme or many parameter sets at once. Monthly cashflows are shaped
+(..., months), padded with zeros after each scheme's own duration.
+
+Finance is a monthly development facility with rolled-up interest, so every
+appraisal runs through its monthly cashflow: ``evaluate`` passes the inputs
+through each stage once and ``appraise`` and ``cashflow`` return its outputs.
+
+Besides the sidebar inputs, an optional ``contingency_drawdown_percent``
+(default 100) sets how much of the construction contingency is actually spent.
+"""
+import numpy as np
+
+import spend_profiles
+import valuation
+
+# Every numeric sidebar input, in sidebar order, with the dashboard defaults
+DEFAULT_PARAMS = {
+    'project_size_sqft': 10000,
+    'project_duration_months': 24,
+    'land_cost': 5000000,
+    'stamp_duty_rate': 5.0,
+    'legal_fees_acquisition': 50000,
+    'survey_costs': 15000,
+    'planning_application_fees': 25000,
+    'architect_fees': 200000,
+    'engineering_fees': 150000,
+    'other_consultant_fees': 75000,
+    'planning_contingency': 50000,
+    'construction_cost_per_sqft': 350,
+    'fit_out_cost_per_sqft': 100,
+    'external_works': 200000,
+    'construction_contingency_percent': 10.0,
+    'project_management_percent': 3.0,
+    'quantity_surveyor_percent': 1.5,
+    'building_control_fees': 15000,
+    'health_safety_fees': 10000,
+    'interest_rate': 6.5,
+    'loan_to_cost_ratio': 70.0,
+    'arrangement_fee_percent': 1.5,
+    'legal_fees_finance': 25000,
+    'monitoring_surveyor_fees': 30000,
+    'discount_rate': 10.0,
+    'marketing_budget': 100000,
+    'agent_fees_percent': 1.5,
+    'legal_fees_disposal': 35000,
+    'sales_price_per_sqft': 1200,
+    'rental_price_per_sqft': 60,
+    'occupancy_rate': 95.0,
+    'exit_yield': 4.5,
+    'sales_absorption_rate': 2.0,
+    'unit_size_sqft': 1000,
+    'off_plan_launch_months': 6,
+    'pre_sales_percent': 50.0,
+    'deposit_percent': 10.0
+}
+
+PARAM_NAMES = list(DEFAULT_PARAMS)
+
+# Inputs with a default that are not on the sidebar, and so not in PARAM_NAMES
+OPTIONAL_PARAMS = {
+    'contingency_drawdown_percent': 100.0
+}
+
+COST_CATEGORIES = [
+    'Acquisition',
+    'Planning & Design',
+    'Construction',
+    'Professional Fees',
+    'Finance',
+    'Marketing & Disposal'
+]
+
+# Appraisal outputs reported by evaluate_batch, alongside peak_funding
+BATCH_OUTPUTS = [
+    'total_development_costs',
+    'total_finance_costs',
+    'loan_amount',
+    'equity_required',
+    'gross_development_value',
+    'profit',
+    'profit_margin',
+    'profit_on_gdv',
+    'return_on_equity'
+]
+
+# Discounted returns reported by evaluate_batch, see ``returns``
+RETURN_OUTPUTS = ['npv', 'project_irr', 'equity_irr', 'discounted_payback_months']
+
+FINANCE_CATEGORY = COST_CATEGORIES.index('Finance')
+
+# Appraisal totals of each cost category, in COST_CATEGORIES order
+CATEGORY_TOTALS = [
+    'total_acquisition_costs',
+    'total_planning_design_costs',
+    'total_construction_costs',
+    'total_professional_fees',
+    'total_finance_costs',
+    'total_marketing_disposal_costs'
+]
+
+# Inputs read by each stage of ``appraise`` and ``cashflow``; ``dataflow_graph`` wires the same stages to them
+VALUE_INPUTS = ['project_size_sqft', 'sales_price_per_sqft', 'rental_price_per_sqft', 'occupancy_rate', 'exit_yield']
+COST_INPUTS = [
+    'project_size_sqft', 'land_cost', 'stamp_duty_rate', 'legal_fees_acquisition', 'survey_costs',
+    'planning_application_fees', 'architect_fees', 'engineering_fees', 'other_consultant_fees', 'planning_contingency',
+    'construction_cost_per_sqft', 'fit_out_cost_per_sqft', 'external_works', 'construction_contingency_percent',
+    'contingency_drawdown_percent', 'project_management_percent', 'quantity_surveyor_percent', 'building_control_fees',
+    'health_safety_fees', 'marketing_budget', 'agent_fees_percent', 'legal_fees_disposal'
+]
+PHASING_INPUTS = ['project_duration_months', 'deposit_percent', 'legal_fees_finance', 'monitoring_surveyor_fees']
+FINANCE_INPUTS = [
+    'interest_rate', 'loan_to_cost_ratio', 'arrangement_fee_percent', 'legal_fees_finance', 'monitoring_surveyor_fees'
+]
+# In ``unit_schedule`` argument order
+SCHEDULE_INPUTS = [
+    'project_size_sqft', 'unit_size_sqft', 'project_duration_months',
+    'off_plan_launch_months', 'pre_sales_percent', 'sales_absorption_rate'
+]
+
+# Outputs of each stage
+VALUE_OUTPUTS = [
+    'gross_development_value_sales', 'annual_rental_income', 'gross_development_value_investment', 'gross_development_value'
+]
+COST_OUTPUTS = [
+    'stamp_duty', 'total_acquisition_costs', 'total_planning_design_costs', 'base_construction_cost', 'fit_out_cost',
+    'construction_contingency', 'total_construction_costs', 'project_management_fee', 'quantity_surveyor_fee',
+    'total_professional_fees', 'total_development_cost_before_finance', 'agent_fees', 'total_marketing_disposal_costs'
+]
+FINANCE_OUTPUTS = [
+    'loan_amount', 'equity_required', 'arrangement_fee', 'interest_cost', 'total_finance_costs', 'peak_debt', 'cash_cover_month'
+]
+TOTAL_OUTPUTS = ['total_development_costs', 'profit', 'profit_margin', 'profit_on_gdv', 'return_on_equity', 'cost_per_sqft']
+APPRAISAL_OUTPUTS = COST_OUTPUTS + FINANCE_OUTPUTS + VALUE_OUTPUTS + TOTAL_OUTPUTS
+# The monthly facility, see ``_draw_facility``
+FACILITY_OUTPUTS = ['equity_drawdown', 'debt_drawdown', 'interest', 'repayment', 'debt_balance']
+CASHFLOW_OUTPUTS = [
+    'months', 'monthly_total_costs', 'monthly_revenue', 'cumulative_costs', 'cumulative_revenue', 'cumulative_cashflow',
+    'peak_funding', 'project_cashflow', 'equity_cashflow', 'units_sold', 'unsold_units', *FACILITY_OUTPUTS, 'monthly_costs'
+]
+
+# Months each category is spent over, as spend_profiles windows: (start, length)
+# with a negative start counting back from the end and None running to the end
+SPEND_WINDOWS = {
+    'Acquisition': (0, 1),
+    'Planning & Design': (0, 6),
+    'Construction': (3, None),
+    'Professional Fees': (3, None),
+    'Finance': (0, None),
+    'Marketing & Disposal': (-6, None)
+}
+
+# How each category is spread over its window, see spend_profiles.PROFILES
+DEFAULT_SPEND_PROFILES = {
+    'Acquisition': 'linear',
+    'Planning & Design': 'linear',
+    'Construction': 'logistic',
+    'Professional Fees': 'logistic',
+    'Finance': 'linear',
+    'Marketing & Disposal': 'linear'
+}
+
+# Fixed-point iterations between loan size and rolled-up interest in ``_finance``,
+# stopping once the interest moves by less than FACILITY_TOLERANCE (£)
+FACILITY_ITERATIONS = 50
+FACILITY_TOLERANCE = 0.01
+
+# Appraisals per cashflow call in evaluate_batch, which bounds peak memory
+BATCH_CHUNK_SIZE = 25000
+
+
+def resolve_params(params=None):
+    """
+    Fill in missing inputs from DEFAULT_PARAMS and OPTIONAL_PARAMS and convert
+    everything to float arrays.
+    """
+    resolved = {**DEFAULT_PARAMS, **OPTIONAL_PARAMS}
+    if params:
+        resolved.update(params)
+    return {name: np.asarray(value, dtype=float) for name, value in resolved.items()}
+
+
+def _stack(values, axis=-1):
+    """Broadcast a list of arrays against each other and stack them along a new axis."""
+    return np.stack(np.broadcast_arrays(*values), axis=axis)
+
+
+def _values(p):
+    """Sales and investment values; the GDV is the higher of the two."""
+    size = p['project_size_sqft']
+    gross_development_value_sales = p['sales_price_per_sqft'] * size
+    annual_rental_income = p['rental_price_per_sqft'] * size * (p['occupancy_rate'] / 100)
+    gross_development_value_investment = annual_rental_income / (p['exit_yield'] / 100)
+    return {
+        'gross_development_value_sales': gross_development_value_sales,
+        'annual_rental_income': annual_rental_income,
+        'gross_development_value_investment': gross_development_value_investment,
+        'gross_development_value': np.maximum(gross_development_value_sales, gross_development_value_investment)
+    }
+
+
+def _costs(p, values):
+    """Every cost category except finance, with agent fees on the sales value."""
+    size = p['project_size_sqft']
+
+    # Acquisition costs
+    stamp_duty = p['land_cost'] * (p['stamp_duty_rate'] / 100)
+    total_acquisition_costs = p['land_cost'] + stamp_duty + p['legal_fees_acquisition'] + p['survey_costs']
+
+    # Planning & design costs
+    total_planning_design_costs = (
+        p['planning_application_fees'] + p['architect_fees'] + p['engineering_fees'] +
+        p['other_consultant_fees'] + p['planning_contingency']
+    )
+
+    # Construction costs
+    base_construction_cost = p['construction_cost_per_sqft'] * size
+    fit_out_cost = p['fit_out_cost_per_sqft'] * size
+    contingency_drawdown = p['contingency_drawdown_percent'] / 100
+    construction_contingency = (
+        (base_construction_cost + fit_out_cost + p['external_works']) *
+        (p['construction_contingency_percent'] / 100) * contingency_drawdown
+    )
+    total_construction_costs = base_construction_cost + fit_out_cost + p['external_works'] + construction_contingency
+
+    # Professional fees
+    project_management_fee = total_construction_costs * (p['project_management_percent'] / 100)
+    quantity_surveyor_fee = total_construction_costs * (p['quantity_surveyor_percent'] / 100)
+    total_professional_fees = project_management_fee + quantity_surveyor_fee + p['building_control_fees'] + p['health_safety_fees']
+
+    # Marketing & disposal costs
+    agent_fees = values['gross_development_value_sales'] * (p['agent_fees_percent'] / 100)
+    total_marketing_disposal_costs = p['marketing_budget'] + agent_fees + p['legal_fees_disposal']
+
+    return {
+        'stamp_duty': stamp_duty,
+        'total_acquisition_costs': total_acquisition_costs,
+        'total_planning_design_costs': total_planning_design_costs,
+        'base_construction_cost': base_construction_cost,
+        'fit_out_cost': fit_out_cost,
+        'construction_contingency': construction_contingency,
+        'total_construction_costs': total_construction_costs,
+        'project_management_fee': project_management_fee,
+        'quantity_surveyor_fee': quantity_surveyor_fee,
+        'total_professional_fees': total_professional_fees,
+        'total_development_cost_before_finance': (
+            total_acquisition_costs + total_planning_design_costs + total_construction_costs + total_professional_fees
+        ),
+        'agent_fees': agent_fees,
+        'total_marketing_disposal_costs': total_marketing_disposal_costs
+    }
+
+
+def _totals(p, values, costs, finance):
+    """Total development costs, profit and the margins on cost, GDV and equity."""
+    total_development_costs = (
+        costs['total_acquisition_costs'] +
+        costs['total_planning_design_costs'] +
+        costs['total_construction_costs'] +
+        costs['total_professional_fees'] +
+        finance['total_finance_costs'] +
+        costs['total_marketing_disposal_costs']
+    )
+    profit = values['gross_development_value'] - total_development_costs
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'total_development_costs': total_development_costs,
+            'profit': profit,
+            'profit_margin': (profit / total_development_costs) * 100,
+            'profit_on_gdv': (profit / values['gross_development_value']) * 100,
+            'return_on_equity': (profit / finance['equity_required']) * 100,
+            'cost_per_sqft': total_development_costs / p['project_size_sqft']
+        }
+
+
+def appraise(params=None, profiles=None):
+    """
+    Development cost stack, GDV and profit.
+
+    Finance is the monthly facility of ``_finance``, with costs phased by the
+    spend ``profiles``, and the GDV is the higher of the sales and investment
+    values.
+    """
+    outputs = evaluate(params, detail=False, profiles=profiles)
+    return {name: outputs[name] for name in APPRAISAL_OUTPUTS}
+
+
+def spend_profiles_key(profiles=None):
+    """
+    The spend profile of every cost category, in COST_CATEGORIES order, from
+    DEFAULT_SPEND_PROFILES updated with ``profiles`` (category -> profile name).
+    """
+    resolved = dict(DEFAULT_SPEND_PROFILES)
+    if profiles:
+        unknown = set(profiles) - set(COST_CATEGORIES)
+        if unknown:
+            raise ValueError(f"Unknown cost categories: {', '.join(sorted(unknown))}")
+        resolved.update(profiles)
+    return tuple(resolved[category] for category in COST_CATEGORIES)
+
+
+def _allocations(duration, months=None, profiles=None):
+    windows = tuple(SPEND_WINDOWS[category] for category in COST_CATEGORIES)
+    return spend_profiles.allocations(spend_profiles_key(profiles), windows, duration, months)
+
+
+def spend_curves(duration, months=None, profiles=None):
+    """
+    Share of each cost category spent in each month, shaped (..., categories, months).
+
+    Each category follows its profile in DEFAULT_SPEND_PROFILES, or in
+    ``profiles``, over its SPEND_WINDOWS window: by default acquisition lands
+    in month 1, planning is spread over the first six months, construction and
+    professional fees follow the S-curve from month 4, finance is spread
+    evenly and marketing falls in the last six months. ``duration`` is
+    rounded to whole months; ``months`` defaults to the longest duration.
+    """
+    matrices, index = _allocations(duration, months, profiles)
+    return matrices[index]
+
+
+def unit_schedule(size, unit_size, duration, launch_months, pre_sales_percent, absorption_rate):
+    """
+    When each unit of a sales scheme sells, shaped (..., units).
+
+    The scheme is split into ``unit_size`` units, the last taking whatever is
+    left; schemes with fewer units than the largest are padded with units of
+    size 0. Units go on sale ``launch_months`` before completion, the last
+    month of the rounded ``duration``, and sell in order at
+    ``absorption_rate`` a month. Up to ``pre_sales_percent`` of them may
+    exchange off-plan, before completion; the rest sell from completion on,
+    at the same rate. Returns the ``unit_sizes``, each unit's ``sale_month``
+    (0-based), whether it sold ``off_plan`` and the ``completion_month``.
+    Raises ValueError unless every unit size and absorption rate is positive.
+    """
+    for name, values in (('unit_size_sqft', unit_size), ('sales_absorption_rate', absorption_rate)):
+        if np.any(np.asarray(values, dtype=float) <= 0):
+            raise ValueError(f"{name} must be positive, got {np.min(values):g}")
+    size, unit_size, completion, launch_months, pre_sales_percent, absorption_rate = np.broadcast_arrays(
+        size, unit_size, np.rint(duration) - 1, launch_months, pre_sales_percent, absorption_rate
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        counts = np.maximum(np.ceil(np.round(size / unit_size, 9)), 0)
+    unit = np.arange(int(counts.max(initial=0)))
+    unit_sizes = np.clip(size[..., None] - unit * unit_size[..., None], 0, unit_size[..., None])
+    rate = absorption_rate[..., None]
+
+    # Units in order from the launch, at the absorption rate
+    launch = np.maximum(completion - np.rint(launch_months), 0)[..., None]
+    natural_month = launch + np.floor(unit / rate)
+    pre_sale_units = np.floor(counts * pre_sales_percent / 100)[..., None]
+    off_plan = (unit < pre_sale_units) & (natural_month < completion[..., None]) & (unit_sizes > 0)
+    # Everything else sells from completion, after the units already exchanged
+    after_completion = completion[..., None] + np.floor((unit - off_plan.sum(axis=-1, keepdims=True)) / rate)
+    sale_month = np.where(off_plan, natural_month, np.maximum(natural_month, after_completion))
+    return {
+        'unit_sizes': unit_sizes,
+        'sale_month': sale_month,
+        'off_plan': off_plan,
+        'completion_month': completion
+    }
+
+
+def sales_months(schedule, duration):
+    """Months needed to cover every scheme's duration and every unit sale in ``schedule``."""
+    sold = schedule['unit_sizes'] > 0
+    last_sale = np.where(sold, schedule['sale_month'], -1).max(initial=-1)
+    return int(max(np.rint(np.asarray(duration, dtype=float)).max(), last_sale + 1))
+
+
+def unit_receipts(schedule, gdv_sales, deposit_percent, months):
+    """
+    Monthly sales receipts and units sold, each shaped (..., months).
+
+    Every unit's price is its share of ``gdv_sales`` by size. Off-plan
+    sales pay ``deposit_percent`` on exchange and the balance at completion;
+    units sold from completion on pay in full when they sell. The receipts of
+    every unit are added into their months in one ``np.bincount``.
+    """
+    sizes = schedule['unit_sizes']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prices = np.where(sizes > 0, np.asarray(gdv_sales, dtype=float)[..., None] * sizes / sizes.sum(axis=-1, keepdims=True), 0.0)
+    deposit = np.where(schedule['off_plan'], prices * (np.asarray(deposit_percent, dtype=float)[..., None] / 100), prices)
+    balance_month = np.where(schedule['off_plan'], schedule['completion_month'][..., None], schedule['sale_month'])
+    shape = np.broadcast_shapes(prices.shape, schedule['sale_month'].shape)
+    rows = int(np.prod(shape[:-1]))
+    offsets = np.arange(rows)[:, None] * months
+
+    def add(month, amounts):
+        # Each (scheme, month) pair is one bin; anything after ``months`` is dropped
+        month = np.broadcast_to(month, shape).reshape(rows, shape[-1])
+        amounts = np.broadcast_to(amounts, shape).reshape(rows, shape[-1]) * (month < months)
+        bins = offsets + np.minimum(month, months - 1).astype(int)
+        return np.bincount(bins.ravel(), amounts.ravel(), rows * months).reshape(shape[:-1] + (months,))
+
+    receipts = add(schedule['sale_month'], deposit) + add(balance_month, prices - deposit)
+    return receipts, add(schedule['sale_month'], (sizes > 0).astype(float))
+
+
+def unsold_units(schedule, units_sold):
+    """Units still unsold at the end of each month, from the monthly ``units_sold``."""
+    return (schedule['unit_sizes'] > 0).sum(axis=-1)[..., None] - np.cumsum(units_sold, axis=-1)
+
+
+def scheme_revenue(gdv, gdv_sales, duration, receipts, months):
+    """
+    Revenue per month: the unit ``receipts`` for sales schemes, where the GDV is
+    the sales value, and the whole GDV in the last month for investment schemes.
+    """
+    sales_model = (gdv == gdv_sales)[..., None]
+    month = np.arange(months)
+    return np.where(sales_model, receipts, np.where(month == np.rint(duration)[..., None] - 1, gdv[..., None], 0.0))
+
+
+def project_cashflow(monthly_revenue, monthly_total_costs, monthly_finance_costs):
+    """Unlevered monthly cashflow: revenue less every cost except finance."""
+    return monthly_revenue - (monthly_total_costs - monthly_finance_costs)
+
+
+def equity_cashflow(monthly_revenue, repayment, equity_drawdown):
+    """
+    Monthly cashflow to the equity investor: the revenue left once the loan
+    is repaid, less the equity drawn to pay costs.
+    """
+    return monthly_revenue - repayment - equity_drawdown
+
+
+def _phasing(p, values, costs, schedule, allocations, months):
+    """
+    Monthly costs before the arrangement fee and interest, and monthly revenue.
+
+    Costs are phased by the ``_allocations``, with only the finance legal and
+    monitoring fees on the finance spend curve. Sales schemes book the receipts
+    of their units (see ``unit_schedule`` and ``unit_receipts``); investment
+    schemes book the GDV in the last month.
+    """
+    matrices, index = allocations
+    totals = dict(costs, total_finance_costs=p['legal_fees_finance'] + p['monitoring_surveyor_fees'])
+    category_totals = _stack([totals[name] for name in CATEGORY_TOTALS])
+    receipts, units_sold = unit_receipts(schedule, values['gross_development_value_sales'], p['deposit_percent'], months)
+    return {
+        'category_totals': category_totals,
+        'monthly_spend': spend_profiles.allocate(category_totals, matrices, index),
+        'monthly_revenue': scheme_revenue(
+            values['gross_development_value'], values['gross_development_value_sales'],
+            p['project_duration_months'], receipts, months
+        ),
+        'units_sold': units_sold
+    }
+
+
+def _draw_facility(costs, revenue, equity, arrangement_fee, monthly_rate, record=True):
+    """
+    Run the facility month by month for one loan size.
+
+    Equity pays each month's ``costs`` until ``equity`` is used up, then the
+    loan does; the ``arrangement_fee`` is added to the loan at its first
+    drawdown, interest compounds monthly on the balance and rolls up, and
+    revenue repays the balance before anything goes back to equity.
+    ``costs`` and ``revenue`` are laid out month-first, shaped (months, ...),
+    so each step reads contiguous rows. Returns the total interest and, with
+    ``record``, the monthly amounts shaped (..., months), including the
+    ``finance_charges`` of interest and arrangement fee added to the loan.
+    """
+    shape = np.broadcast_shapes(costs.shape[1:], revenue.shape[1:], np.shape(equity), np.shape(monthly_rate))
+    balance = np.zeros(shape)
+    total_interest = np.zeros(shape)
+    equity_left = np.broadcast_to(equity, shape).copy()
+    drawn = np.zeros(shape, dtype=bool)
+    names = (*FACILITY_OUTPUTS, 'finance_charges')
+    monthly = {name: np.zeros((len(costs),) + shape) for name in names} if record else None
+    for month, (cost, month_revenue) in enumerate(zip(costs, revenue)):
+        interest = balance * monthly_rate
+        equity_drawdown = np.minimum(cost, equity_left)
+        debt_drawdown = cost - equity_drawdown
+        fee = np.where((debt_drawdown > 0) & ~drawn, arrangement_fee, 0.0)
+        drawn |= debt_drawdown > 0
+        balance = balance + interest + debt_drawdown + fee
+        repayment = np.minimum(month_revenue, balance)
+        balance = balance - repayment
+        equity_left = equity_left - equity_drawdown
+        total_interest += interest
+
+        if record:
+            for name, values in zip(names, (equity_drawdown, debt_drawdown, interest, repayment, balance, interest + fee)):
+                monthly[name][month] = values
+    if record:
+        monthly = {name: np.moveaxis(values, 0, -1) for name, values in monthly.items()}
+    return total_interest, monthly
+
+
+def _finance(p, phasing, iterations=FACILITY_ITERATIONS, tolerance=FACILITY_TOLERANCE):
+    """
+    Monthly development loan with drawdowns and rolled-up interest.
+
+    The facility funds the ``phasing`` monthly spend. It is sized at
+    ``loan_to_cost_ratio`` of the total cost including the arrangement fee and
+    rolled-up interest, and equity pays the rest, first (see
+    ``_draw_facility``). As interest depends on the loan size and the loan size
+    on interest, the two are solved by fixed-point iteration from no interest.
+
+    Returns the facility limit as ``loan_amount``, the ``equity_required``,
+    ``arrangement_fee``, rolled-up ``interest_cost``, ``total_finance_costs``
+    and ``peak_debt`` (before that month's repayment); the
+    ``cash_cover_month`` from which revenue has repaid the loan for good, NaN
+    if it never does and 0 if nothing is drawn; and the monthly amounts of
+    ``_draw_facility``.
+    """
+    base_cost = phasing['monthly_spend'].sum(axis=-1)
+    loan_to_cost = p['loan_to_cost_ratio'] / 100
+    fee_rate = p['arrangement_fee_percent'] / 100
+    monthly_rate = p['interest_rate'] / 100 / 12
+
+    # Month-first copies for the monthly loop
+    month_costs = np.ascontiguousarray(np.moveaxis(phasing['monthly_spend'], -1, 0))
+    month_revenue = np.ascontiguousarray(np.moveaxis(phasing['monthly_revenue'], -1, 0))
+
+    def size(interest):
+        # The arrangement fee is part of the cost the loan is sized on
+        limit = loan_to_cost * (base_cost + interest) / (1 - loan_to_cost * fee_rate)
+        return limit, limit * fee_rate, base_cost + limit * fee_rate + interest - limit
+
+    interest = np.zeros(np.shape(base_cost))
+    for iteration in range(iterations):
+        limit, arrangement_fee, equity = size(interest)
+        previous = interest
+        interest, _ = _draw_facility(month_costs, month_revenue, equity, arrangement_fee, monthly_rate, record=False)
+        if np.all(np.abs(interest - previous) < tolerance):
+            break
+    limit, arrangement_fee, equity = size(interest)
+    interest, monthly = _draw_facility(month_costs, month_revenue, equity, arrangement_fee, monthly_rate)
+
+    balance = monthly['debt_balance']
+    outstanding = balance > tolerance
+    last_outstanding = np.where(outstanding.any(axis=-1), balance.shape[-1] - np.argmax(outstanding[..., ::-1], axis=-1), 0)
+    result = {
+        'loan_amount': limit,
+        'equity_required': equity,
+        'arrangement_fee': arrangement_fee,
+        'interest_cost': interest,
+        'total_finance_costs': arrangement_fee + interest + p['legal_fees_finance'] + p['monitoring_surveyor_fees'],
+        'peak_debt': (balance + monthly['repayment']).max(axis=-1),
+        'cash_cover_month': np.where(outstanding[..., -1], np.nan, last_outstanding + 1.0)
+    }
+    result.update(monthly)
+    return result
+
+
+def _cashflow(schedule, allocations, phasing, finance, detail=True):
+    """
+    Monthly costs, revenue and cumulative cashflow, with the facility's
+    interest and arrangement fee in the finance costs of the months they are
+    charged.
+    """
+    matrices, index = allocations
+    months = phasing['monthly_spend'].shape[-1]
+    monthly_total_costs = phasing['monthly_spend'] + finance['finance_charges']
+    monthly_finance_costs = (
+        phasing['category_totals'][..., FINANCE_CATEGORY, None] * matrices[:, FINANCE_CATEGORY][index] +
+        finance['finance_charges']
+    )
+    monthly_revenue = phasing['monthly_revenue']
+
+    cumulative_costs = np.cumsum(monthly_total_costs, axis=-1)
+    cumulative_revenue = np.cumsum(monthly_revenue, axis=-1)
+    cumulative_cashflow = cumulative_revenue - cumulative_costs
+
+    result = {
+        'months': np.arange(months) + 1,
+        'monthly_total_costs': monthly_total_costs,
+        'monthly_revenue': monthly_revenue,
+        'cumulative_costs': cumulative_costs,
+        'cumulative_revenue': cumulative_revenue,
+        'cumulative_cashflow': cumulative_cashflow,
+        'peak_funding': np.maximum(-cumulative_cashflow.min(axis=-1), 0.0),
+        'project_cashflow': project_cashflow(monthly_revenue, monthly_total_costs, monthly_finance_costs),
+        'equity_cashflow': equity_cashflow(monthly_revenue, finance['repayment'], finance['equity_drawdown']),
+        'units_sold': phasing['units_sold'],
+        'unsold_units': unsold_units(schedule, phasing['units_sold'])
+    }
+    result.update({name: finance[name] for name in FACILITY_OUTPUTS})
+    if detail:
+        finance_row = (np.arange(len(COST_CATEGORIES)) == FINANCE_CATEGORY)[:, None]
+        result['monthly_costs'] = (
+            matrices[index] * phasing['category_totals'][..., None] + finance['finance_charges'][..., None, :] * finance_row
+        )
+    return result
+
+
+def evaluate(params=None, detail=True, profiles=None):
+    """
+    Every output of ``appraise`` and ``cashflow`` from one pass through the stages.
+
+    Costs are phased by ``spend_curves`` with the spend ``profiles``, the
+    monthly total being one matrix product of the category totals with each
+    duration's cached allocation matrix, over enough months for the longest
+    duration and the last unit sale. The facility of ``_finance`` funds them,
+    and its interest and fees are the appraisal's finance costs.
+    """
+    p = resolve_params(params)
+    values = _values(p)
+    costs = _costs(p, values)
+    schedule = unit_schedule(*[p[name] for name in SCHEDULE_INPUTS])
+    months = sales_months(schedule, p['project_duration_months'])
+    allocations = _allocations(p['project_duration_months'], months, profiles)
+    phasing = _phasing(p, values, costs, schedule, allocations, months)
+    finance = _finance(p, phasing)
+    totals = _totals(p, values, costs, finance)
+    return {**values, **costs, **finance, **totals, **_cashflow(schedule, allocations, phasing, finance, detail)}
+
+
+def cashflow(params=None, detail=True, profiles=None):
+    """
+    Monthly costs, revenue and cumulative cashflow.
+
+    Sales schemes book the receipts of their units; investment schemes book the
+    GDV in the last month. ``peak_funding`` is the largest cumulative cash
+    shortfall. ``project_cashflow`` and ``equity_cashflow`` are the monthly
+    cashflows before finance and to equity; ``units_sold`` and
+    ``unsold_units`` the monthly unit sales and inventory left, as scheduled
+    whether or not the GDV is the sales value; and ``equity_drawdown``,
+    ``debt_drawdown``, ``interest``, ``repayment`` and ``debt_balance`` the
+    monthly facility. With ``detail=False`` the per-category monthly costs are
+    not returned. See ``evaluate``.
+    """
+    outputs = evaluate(params, detail, profiles)
+    return {name: outputs[name] for name in CASHFLOW_OUTPUTS if name in outputs}
+
+
+def returns(params=None, flows=None, profiles=None):
+    """
+    Discounted returns from the monthly cashflows.
+
+    ``npv`` and ``discounted_payback_months`` are on the project cashflow at
+    the ``discount_rate`` input; ``project_irr`` and ``equity_irr`` are the
+    annual IRRs of the project and equity cashflows, NaN where there is none.
+    ``flows`` is the ``cashflow`` of ``params``, computed with the spend
+    ``profiles`` if not given.
+    """
+    p = resolve_params(params)
+    if flows is None:
+        flows = cashflow(p, detail=False, profiles=profiles)
+    return _returns(p, flows)
+
+
+def _returns(p, flows):
+    """``returns`` of the monthly ``flows``."""
+    return {
+        'npv': valuation.npv(flows['project_cashflow'], p['discount_rate']),
+        'project_irr': valuation.irr(flows['project_cashflow']),
+        'equity_irr': valuation.irr(flows['equity_cashflow']),
+        'discounted_payback_months': valuation.discounted_payback(flows['project_cashflow'], p['discount_rate'])
+    }
+
+
+def _stage(names, function, stages=()):
+    """
+    Graph node calling ``function`` with a dict of the inputs ``names``,
+    followed by the values of the nodes ``stages``.
+    """
+    names, stages = tuple(names), tuple(stages)
+    return stages + names, lambda *values: function(dict(zip(names, values[len(stages):])), *values[:len(stages)])
+
+
+def _outputs(stage, names):
+    """Graph nodes picking each of ``names`` out of the dict the node ``stage`` returns."""
+    return {name: ((stage,), lambda result, name=name: result[name]) for name in names}
+
+
+def dataflow_graph(profiles=None):
+    """
+    The appraisal and monthly cashflow as a dependency graph for ``dataflow.evaluate``.
+
+    The nodes are the stages of ``evaluate`` and ``returns`` themselves, each
+    reading only its own inputs, so a changed input recomputes just the
+    stages downstream of it; every output of the two is a node picked from
+    its stage, with costs phased by the spend
+    ``profiles``. The inputs include ``contingency_drawdown_percent``, so
+    evaluate it on ``resolve_params`` output.
+    """
+    return {
+        'values': _stage(VALUE_INPUTS, _values),
+        'costs': _stage(COST_INPUTS, _costs, ['values']),
+        'unit_schedule': (tuple(SCHEDULE_INPUTS), unit_schedule),
+        'horizon': (('unit_schedule', 'project_duration_months'), sales_months),
+        'spend_allocations': (
+            ('project_duration_months', 'horizon'),
+            lambda duration, months: _allocations(duration, months, profiles)
+        ),
+        'phasing': _stage(PHASING_INPUTS, _phasing, ['values', 'costs', 'unit_schedule', 'spend_allocations', 'horizon']),
+        'finance': _stage(FINANCE_INPUTS, _finance, ['phasing']),
+        'totals': _stage(['project_size_sqft'], _totals, ['values', 'costs', 'finance']),
+        'cashflow': (('unit_schedule', 'spend_allocations', 'phasing', 'finance'), _cashflow),
+        'returns': _stage(['discount_rate'], _returns, ['cashflow']),
+        **_outputs('values', VALUE_OUTPUTS),
+        **_outputs('costs', COST_OUTPUTS),
+        **_outputs('finance', FINANCE_OUTPUTS),
+        **_outputs('totals', TOTAL_OUTPUTS),
+        **_outputs('cashflow', CASHFLOW_OUTPUTS),
+        **_outputs('returns', RETURN_OUTPUTS)
+    }
+
+
+def param_matrix(params=None, rows=1):
+    """
+    Repeat one parameter set into a (rows, len(PARAM_NAMES)) matrix for evaluate_batch.
+    """
+    p = resolve_params(params)
+    return np.tile([float(p[name]) for name in PARAM_NAMES], (rows, 1))
+
+
+def params_from_matrix(param_sets):
+    """
+    Split a (rows, len(PARAM_NAMES)) matrix into contiguous per-input columns.
+    """
+    param_sets = np.atleast_2d(np.asarray(param_sets, dtype=float))
+    if param_sets.shape[-1] != len(PARAM_NAMES):
+        raise ValueError(f"Expected {len(PARAM_NAMES)} parameter columns, got {param_sets.shape[-1]}")
+    return dict(zip(PARAM_NAMES, np.ascontiguousarray(param_sets.T)))
+
+
+def output_dtype():
+    """
+    Structured dtype of evaluate_batch results.
+    """
+    return np.dtype([(name, float) for name in BATCH_OUTPUTS + ['peak_funding'] + RETURN_OUTPUTS])
+
+
+def evaluate_batch(param_sets, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Appraise many parameter sets in one call, including their monthly cashflows.
+
+    ``param_sets`` is an (N, len(PARAM_NAMES)) array whose columns follow
+    PARAM_NAMES. Returns a structured array of N records with the fields from
+    ``output_dtype()``, e.g. ``results['profit']``.
+    """
+    param_sets = np.atleast_2d(np.asarray(param_sets, dtype=float))
+    results = np.empty(len(param_sets), dtype=output_dtype())
+    for start in range(0, len(param_sets), chunk_size):
+        params = params_from_matrix(param_sets[start:start + chunk_size])
+        outputs = evaluate(params, detail=False)
+        rows = results[start:start + chunk_size]
+        for name in BATCH_OUTPUTS + ['peak_funding']:
+            rows[name] = outputs[name]
+        for name, values in returns(params, outputs).items():
+            rows[name] = values
+    return results
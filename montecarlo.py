@@ -0,0 +1,290 @@
+"""
+Monte Carlo simulation for the clinic forecast and the development appraisal.
+
+Uncertain inputs are described by distribution dicts, e.g.
+``{'dist': 'triangular', 'low': 0.75, 'mode': 1.0, 'high': 1.1}``, keyed by the
+model input they replace. Draws are generated and evaluated a chunk at a time,
+so millions of scenarios run as a handful of vectorized engine calls.
+Inputs can be correlated through a Gaussian copula: draws start as correlated
+standard normals and are mapped onto each distribution, so the rank
+correlation between inputs follows the requested coefficients.
+
+Supported distributions:
+    fixed       value
+    uniform     low, high
+    triangular  low, mode, high
+    normal      mean, sd (optional low/high to truncate by clipping)
+    lognormal   median, sigma (standard deviation of the log)
+
+Any spec may also set ``'round': True`` to round draws to whole numbers, e.g.
+for durations in months.
+"""
+import numpy as np
+
+import clinic_model
+import development_model
+
+DEFAULT_DRAWS = 1000000
+CHUNK_SIZE = 250000
+PERCENTILES = [5, 50, 95]
+
+
+def _normal_cdf(z):
+    """Standard normal CDF using the Abramowitz & Stegun 7.1.26 erf approximation (error < 1.5e-7)."""
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def transform(spec, z):
+    """
+    Turn standard normal draws ``z`` into draws from the distribution ``spec``.
+    """
+    values = _transform(spec, z)
+    return np.rint(values) if spec.get('round') else values
+
+
+def _transform(spec, z):
+    dist = spec['dist']
+    if dist == 'fixed':
+        return np.full_like(z, spec['value'])
+    if dist == 'normal':
+        values = spec['mean'] + spec['sd'] * z
+        if 'low' in spec or 'high' in spec:
+            values = np.clip(values, spec.get('low'), spec.get('high'))
+        return values
+    if dist == 'lognormal':
+        return spec['median'] * np.exp(spec['sigma'] * z)
+
+    u = _normal_cdf(z)
+    if dist == 'uniform':
+        return spec['low'] + (spec['high'] - spec['low']) * u
+    if dist == 'triangular':
+        low, mode, high = spec['low'], spec['mode'], spec['high']
+        width = high - low
+        if width <= 0:
+            return np.full_like(z, mode)
+        split = (mode - low) / width
+        return np.where(
+            u < split,
+            low + np.sqrt(u * width * (mode - low)),
+            high - np.sqrt((1 - u) * width * (high - mode))
+        )
+    raise ValueError(f"Unknown distribution: {dist}")
+
+
+def range_distribution(dist, low, mode, high, floor=None):
+    """
+    Distribution spec from a low / most likely / high range.
+
+    For ``'normal'`` the low and high are read as the 5th and 95th percentiles
+    around the most likely value. ``floor`` is an optional lower bound that no
+    draw may go below.
+    """
+    if not low <= mode <= high:
+        raise ValueError(f"Expected low <= most likely <= high, got {low}, {mode}, {high}")
+    if floor is not None:
+        low, mode, high = max(low, floor), max(mode, floor), max(high, floor)
+    if dist == 'triangular':
+        return {'dist': 'triangular', 'low': low, 'mode': mode, 'high': high}
+    if dist == 'uniform':
+        return {'dist': 'uniform', 'low': low, 'high': high}
+    if dist == 'normal':
+        spec = {'dist': 'normal', 'mean': mode, 'sd': (high - low) / (2 * 1.645)}
+        if floor is not None:
+            spec['low'] = floor
+        return spec
+    raise ValueError(f"Unknown distribution: {dist}")
+
+
+def correlation_matrix(names, correlation=None):
+    """
+    Full correlation matrix over ``names`` from a dict of pairwise coefficients,
+    e.g. ``{('sales_price_per_sqft', 'construction_cost_per_sqft'): 0.4}``.
+    """
+    matrix = np.eye(len(names))
+    index = {name: i for i, name in enumerate(names)}
+    for (first, second), rho in (correlation or {}).items():
+        if first not in index or second not in index:
+            raise ValueError(f"Correlation given for an input without a distribution: {first}, {second}")
+        matrix[index[first], index[second]] = matrix[index[second], index[first]] = rho
+    return matrix
+
+
+def sample(distributions, size, rng, correlation=None):
+    """
+    Draw ``size`` values for every input in ``distributions``.
+
+    ``correlation`` is an optional dict of pairwise coefficients (see
+    ``correlation_matrix``). Returns a dict of arrays keyed like ``distributions``.
+    """
+    z = rng.standard_normal((len(distributions), size))
+    if correlation:
+        try:
+            cholesky = np.linalg.cholesky(correlation_matrix(list(distributions), correlation))
+        except np.linalg.LinAlgError:
+            raise ValueError("Correlation coefficients are inconsistent (matrix is not positive definite)")
+        z = cholesky @ z
+    return {name: transform(spec, z[i]) for i, (name, spec) in enumerate(distributions.items())}
+
+
+def simulate(model, base_params, distributions, draws=DEFAULT_DRAWS, seed=None, chunk_size=CHUNK_SIZE, correlation=None):
+    """
+    Run ``model`` over ``draws`` sampled parameter sets.
+
+    Each chunk starts from ``base_params`` with the sampled inputs overriding
+    their base values; ``model`` takes that params dict and returns a dict of
+    per-draw output arrays. Returns a dict of output arrays of length ``draws``.
+    """
+    rng = np.random.default_rng(seed)
+    outputs = {}
+    for start in range(0, draws, chunk_size):
+        size = min(chunk_size, draws - start)
+        params = dict(base_params)
+        params.update(sample(distributions, size, rng, correlation))
+        for name, values in model(params).items():
+            if name not in outputs:
+                outputs[name] = np.empty(draws)
+            outputs[name][start:start + size] = values
+    return outputs
+
+
+def summarize(outputs, percentiles=PERCENTILES):
+    """
+    Percentiles of every simulated output, as a dict of {output: {percentile: value}}.
+
+    NaN draws, such as an IRR that does not exist, are left out.
+    """
+    summary = {}
+    for name, values in outputs.items():
+        # inverted_cdf picks actual draws, so infinite paybacks never interpolate to NaN
+        points = np.nanpercentile(values, percentiles, method='inverted_cdf')
+        summary[name] = dict(zip(percentiles, points))
+    return summary
+
+
+def clinic_outputs(params, years=3, returns=False, week=None):
+    """
+    Model function for ``simulate``: annual EBITDA, ROI and payback for each draw.
+
+    With ``returns``, also the NPV, IRR and discounted payback from the monthly
+    cashflows (see ``clinic_model.returns``), which costs about ten times as
+    much per draw. ``week`` is an optional hour-of-week profile, as in
+    ``clinic_model.project``.
+    """
+    projection = clinic_model.project(params, years, detail=False, week=week)
+    outputs = {}
+    for year in range(1, years + 1):
+        outputs[f'ebitda_y{year}'] = projection['ebitda'][..., year - 1]
+    for year in range(1, years + 1):
+        outputs[f'roi_y{year}'] = projection['roi'][..., year - 1]
+    outputs['payback_months'] = projection['payback_months']
+    if returns:
+        valued = clinic_model.returns(params, years, week=week)
+        for name in ('npv', 'irr', 'discounted_payback_months'):
+            outputs[name] = valued[name]
+    return outputs
+
+
+def clinic_distributions(
+    params=None,
+    utilization_downside=25.0,
+    utilization_upside=10.0,
+    price_sd_percent=5.0,
+    members_sd_percent=20.0,
+    membership_growth_sd=15.0,
+    supplies_range=(-2.0, 4.0),
+    rent_inflation_range=(1.0, 6.0)
+):
+    """
+    Default distributions around a clinic parameter set.
+
+    Utilization factors are triangular between -``utilization_downside``% and
+    +``utilization_upside``% of the input, service prices and Year 1 member
+    counts are normal with a percentage standard deviation, membership growth is
+    normal with an absolute standard deviation in percentage points, supplies %
+    is triangular across ``supplies_range`` points around the input and rent
+    inflation is triangular from ``rent_inflation_range`` with the expense
+    inflation input as its mode.
+    """
+    p = clinic_model.resolve_params(params)
+    distributions = {}
+    for name in clinic_model.SERVICE_UTILIZATION_FACTOR_INPUTS:
+        factor = float(p[name])
+        distributions[name] = {
+            'dist': 'triangular',
+            'low': factor * (1 - utilization_downside / 100),
+            'mode': factor,
+            'high': factor * (1 + utilization_upside / 100)
+        }
+    for name in clinic_model.SERVICE_PRICE_INPUTS:
+        price = float(p[name])
+        distributions[name] = {'dist': 'normal', 'mean': price, 'sd': price * price_sd_percent / 100, 'low': 0.0}
+    for name in clinic_model.MEMBERSHIP_COUNT_INPUTS:
+        members = float(p[name])
+        distributions[name] = {'dist': 'normal', 'mean': members, 'sd': members * members_sd_percent / 100, 'low': 0.0}
+    for name in ['membership_growth_y2', 'membership_growth_y3']:
+        distributions[name] = {'dist': 'normal', 'mean': float(p[name]), 'sd': membership_growth_sd, 'low': -100.0}
+
+    supplies = float(p['supplies_percent_of_revenue'])
+    distributions['supplies_percent_of_revenue'] = {
+        'dist': 'triangular',
+        'low': max(supplies + supplies_range[0], 0.0),
+        'mode': supplies,
+        'high': supplies + supplies_range[1]
+    }
+    inflation = float(p['expense_inflation'])
+    distributions['rent_inflation'] = {
+        'dist': 'triangular',
+        'low': min(rent_inflation_range[0], inflation),
+        'mode': inflation,
+        'high': max(rent_inflation_range[1], inflation)
+    }
+    return distributions
+
+
+def development_outputs(params, profiles=None):
+    """
+    Model function for ``simulate``: profit, margins, peak funding, NPV,
+    equity IRR and the facility's peak debt and rolled-up interest for each
+    draw, including the monthly cashflow of every appraisal with costs phased
+    by the spend ``profiles``.
+    """
+    outputs = development_model.evaluate(params, detail=False, profiles=profiles)
+    returns = development_model.returns(params, outputs)
+    return {
+        'total_development_costs': outputs['total_development_costs'],
+        'profit': outputs['profit'],
+        'profit_margin': outputs['profit_margin'],
+        'profit_on_gdv': outputs['profit_on_gdv'],
+        'peak_funding': outputs['peak_funding'],
+        'npv': returns['npv'],
+        'equity_irr': returns['equity_irr'],
+        'peak_debt': outputs['peak_debt'],
+        'total_interest': outputs['interest_cost']
+    }
+
+
+def development_distributions(params=None):
+    """
+    Default distributions around a development parameter set.
+
+    Sales price is normal with a 7.5% standard deviation, construction cost is
+    triangular from -5% to +20%, the interest rate is normal with a one point
+    standard deviation, the duration is triangular from three months early to
+    nine months late and the contingency drawdown is triangular from 25% to
+    125% of the allowance.
+    """
+    p = development_model.resolve_params(params)
+    price = float(p['sales_price_per_sqft'])
+    construction = float(p['construction_cost_per_sqft'])
+    duration = float(p['project_duration_months'])
+    return {
+        'sales_price_per_sqft': {'dist': 'normal', 'mean': price, 'sd': price * 0.075, 'low': 0.0},
+        'construction_cost_per_sqft': {'dist': 'triangular', 'low': construction * 0.95, 'mode': construction, 'high': construction * 1.2},
+        'interest_rate': {'dist': 'normal', 'mean': float(p['interest_rate']), 'sd': 1.0, 'low': 0.1},
+        'project_duration_months': {'dist': 'triangular', 'low': max(duration - 3, 1), 'mode': duration, 'high': duration + 9, 'round': True},
+        'contingency_drawdown_percent': {'dist': 'triangular', 'low': 25.0, 'mode': 75.0, 'high': 125.0}
+    }
@@ -0,0 +1,199 @@
+"""
+Pricing and membership-mix optimizer for the clinic model.
+
+The projection engine takes volumes as given, so on its own it would always
+favour the highest price. The optimizer adds a constant-elasticity demand
+response around the current inputs: moving a service price by a factor ``r``
+scales that service's utilization factor by ``r ** -service_elasticity``, and
+a membership price change scales the number of members that tier can sign up
+to by ``r ** -membership_elasticity``. Member visits use the same treatment
+rooms as pay-per-visit sessions, so the sessions sold plus the member visits
+must fit in the capacity implied by the ``*_capacity_per_hour`` inputs times
+``operating_hours_weekly``, or the open hours of an hour-of-week profile, in
+every year.
+
+Candidates are searched with differential evolution, one batched projection
+per generation. The decision variables are the five service prices, the three
+membership prices and, per tier, the share of that tier's demand taken up.
+"""
+import numpy as np
+
+import clinic_model
+import week_profile
+
+OBJECTIVES = ['cumulative_ebitda', 'npv']
+
+DEFAULT_SERVICE_ELASTICITY = 1.2
+DEFAULT_MEMBERSHIP_ELASTICITY = 1.0
+DEFAULT_DISCOUNT_RATE = 10.0
+
+POPULATION = 48
+GENERATIONS = 150
+MUTATION = 0.7
+CROSSOVER = 0.9
+
+
+def price_bounds(params, low_factor=0.5, high_factor=1.5):
+    """Search bounds of ``low_factor`` to ``high_factor`` times each current service and membership price."""
+    p = clinic_model.resolve_params(params)
+    return {
+        name: (float(p[name]) * low_factor, float(p[name]) * high_factor)
+        for name in clinic_model.SERVICE_PRICE_INPUTS + clinic_model.MEMBERSHIP_PRICE_INPUTS
+    }
+
+
+def candidate_params(params, prices, member_shares,
+                     service_elasticity=DEFAULT_SERVICE_ELASTICITY, membership_elasticity=DEFAULT_MEMBERSHIP_ELASTICITY):
+    """
+    Clinic inputs for each candidate.
+
+    ``prices`` maps every service and membership price input to candidate
+    values and ``member_shares`` is shaped (candidates, 3): the share of each
+    tier's demand at its candidate price that is signed up.
+    """
+    p = clinic_model.resolve_params(params)
+    candidate = dict(p)
+    candidate.update({name: np.asarray(values, dtype=float) for name, values in prices.items()})
+
+    # Service demand; the two IV prices drive one IV service through their average
+    service_ratios = [
+        candidate['cryotherapy_price'] / p['cryotherapy_price'],
+        candidate['infrared_sauna_price'] / p['infrared_sauna_price'],
+        (candidate['iv_therapy_basic_price'] + candidate['iv_therapy_premium_price'])
+        / (p['iv_therapy_basic_price'] + p['iv_therapy_premium_price']),
+        candidate['face_treatment_price'] / p['face_treatment_price']
+    ]
+    for name, ratio in zip(clinic_model.SERVICE_UTILIZATION_FACTOR_INPUTS, service_ratios):
+        candidate[name] = p[name] * ratio ** -service_elasticity
+
+    # Membership demand
+    for i, (count, price) in enumerate(zip(clinic_model.MEMBERSHIP_COUNT_INPUTS, clinic_model.MEMBERSHIP_PRICE_INPUTS)):
+        demand = p[count] * (candidate[price] / p[price]) ** -membership_elasticity
+        candidate[count] = member_shares[..., i] * demand
+    return candidate
+
+
+def capacity_use(params, projection, week=None):
+    """
+    Sessions used and sessions available per year.
+
+    Used sessions are the pay-per-visit sessions sold plus member visits;
+    both come back shaped (..., years). Sessions available come from the open
+    hours of ``week`` when a profile is given.
+    """
+    p = clinic_model.resolve_params(params)
+    weekly_hours = p['operating_hours_weekly'] if week is None else week_profile.weekly_hours(week)
+    annual_hours = weekly_hours * clinic_model.WEEKS_PER_YEAR
+    capacities = [p[name] * annual_hours for name in clinic_model.SERVICE_CAPACITY_INPUTS]
+    service_sessions = sum(projection['utilization'][..., i, :] * capacity[..., None] for i, capacity in enumerate(capacities))
+    member_visits = sum(projection['members'][..., i, :] * visits * 12 for i, visits in enumerate(clinic_model.MEMBERSHIP_VISITS_PER_MONTH))
+    used = service_sessions + member_visits
+    return used, np.broadcast_to(sum(capacities)[..., None], used.shape)
+
+
+def objective(projection, name, discount_rate=DEFAULT_DISCOUNT_RATE):
+    """
+    Cumulative EBITDA over the projection, or its NPV: each year's EBITDA
+    discounted from the end of that year, less the initial investment.
+    """
+    ebitda = projection['ebitda']
+    if name == 'cumulative_ebitda':
+        return ebitda.sum(axis=-1)
+    if name == 'npv':
+        discount = (1 + discount_rate / 100) ** -np.arange(1, ebitda.shape[-1] + 1)
+        return (ebitda * discount).sum(axis=-1) - projection['initial_investment']
+    raise ValueError(f"Unknown objective '{name}'; expected one of {', '.join(OBJECTIVES)}")
+
+
+def evaluate(params, candidates, bounds, target=OBJECTIVES[0], years=3,
+             service_elasticity=DEFAULT_SERVICE_ELASTICITY, membership_elasticity=DEFAULT_MEMBERSHIP_ELASTICITY,
+             discount_rate=DEFAULT_DISCOUNT_RATE, week=None):
+    """
+    Objective and capacity violation for candidate rows.
+
+    ``candidates`` is shaped (n, len(bounds) + 3): the prices named in
+    ``bounds``, in order, then the three membership demand shares. The
+    violation is the total sessions over capacity across all years.
+    """
+    names = list(bounds)
+    prices = {name: candidates[:, i] for i, name in enumerate(names)}
+    candidate = candidate_params(params, prices, candidates[:, len(names):], service_elasticity, membership_elasticity)
+    projection = clinic_model.project(candidate, years, week=week)
+    used, available = capacity_use(candidate, projection, week)
+    return objective(projection, target, discount_rate), np.maximum(used - available, 0).sum(axis=-1)
+
+
+def _better(value, violation, other_value, other_violation):
+    """Feasibility first: less capacity violation wins, then the higher objective."""
+    return (violation < other_violation) | ((violation == other_violation) & (value >= other_value))
+
+
+def optimize(params, bounds=None, target=OBJECTIVES[0], years=3,
+             service_elasticity=DEFAULT_SERVICE_ELASTICITY, membership_elasticity=DEFAULT_MEMBERSHIP_ELASTICITY,
+             discount_rate=DEFAULT_DISCOUNT_RATE, population=POPULATION, generations=GENERATIONS, seed=0, week=None):
+    """
+    Prices and membership counts maximizing ``target`` within ``bounds`` and capacity.
+
+    ``bounds`` maps each service and membership price input to ``(low, high)``
+    and defaults to ``price_bounds(params)``. The current inputs are part of
+    the starting population. Returns the optimized ``params`` (with member
+    counts rounded down to whole members and the demand-adjusted utilization
+    factors), their ``value``, ``violation`` and per-year ``sessions_used``
+    and ``sessions_available``, the current plan's ``baseline_value`` and
+    ``baseline_violation``, and the best ``value`` per generation as ``history``.
+    ``week`` is an optional hour-of-week profile, as in ``clinic_model.project``.
+    """
+    p = clinic_model.resolve_params(params)
+    bounds = bounds or price_bounds(p)
+    names = list(bounds)
+    low = np.array([bounds[name][0] for name in names] + [0.0, 0.0, 0.0])
+    high = np.array([bounds[name][1] for name in names] + [1.0, 1.0, 1.0])
+    settings = dict(target=target, years=years, service_elasticity=service_elasticity,
+                    membership_elasticity=membership_elasticity, discount_rate=discount_rate, week=week)
+
+    rng = np.random.default_rng(seed)
+    dims = len(low)
+    current = np.clip([float(p[name]) for name in names] + [1.0, 1.0, 1.0], low, high)
+    candidates = low + rng.random((population, dims)) * (high - low)
+    candidates[0] = current
+    values, violations = evaluate(p, candidates, bounds, **settings)
+    baseline_value, baseline_violation = values[0], violations[0]
+
+    # Differential evolution (rand/1/bin), every trial of a generation in one projection
+    rows = np.arange(population)
+    history = []
+    for _ in range(generations):
+        a, b, c = (rng.permuted(np.tile(rows, (3, 1)), axis=1))
+        mutants = np.clip(candidates[a] + MUTATION * (candidates[b] - candidates[c]), low, high)
+        cross = rng.random((population, dims)) < CROSSOVER
+        cross[rows, rng.integers(dims, size=population)] = True
+        trials = np.where(cross, mutants, candidates)
+        trial_values, trial_violations = evaluate(p, trials, bounds, **settings)
+
+        improved = _better(trial_values, trial_violations, values, violations)
+        candidates[improved] = trials[improved]
+        values[improved] = trial_values[improved]
+        violations[improved] = trial_violations[improved]
+        history.append(values[np.lexsort((-values, violations))[0]])
+
+    # Whole members, rounded down so the plan stays within capacity
+    best = np.lexsort((-values, violations))[0]
+    best = candidates[best:best + 1]
+    prices = {name: best[:, i] for i, name in enumerate(names)}
+    optimized = candidate_params(p, prices, best[:, len(names):], service_elasticity, membership_elasticity)
+    for name in clinic_model.MEMBERSHIP_COUNT_INPUTS:
+        optimized[name] = np.floor(optimized[name])
+    projection = clinic_model.project(optimized, years, week=week)
+    used, available = capacity_use(optimized, projection, week)
+    optimized = {name: float(np.squeeze(value)) for name, value in optimized.items()}
+
+    return {
+        'params': optimized,
+        'value': float(objective(projection, target, discount_rate)[0]),
+        'violation': float(np.maximum(used - available, 0).sum()),
+        'sessions_used': used[0],
+        'sessions_available': available[0],
+        'baseline_value': float(baseline_value),
+        'baseline_violation': float(baseline_violation),
+        'history': np.array(history)
+    }
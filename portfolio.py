@@ -0,0 +1,129 @@
+"""
+Multi-site portfolio evaluation for the clinic model.
+
+A portfolio is a table with one row per site: ``site``, ``region`` and
+``opening_year`` columns plus any clinic inputs, named as in
+clinic_model.PARAM_NAMES. Inputs a site leaves blank come from a base
+parameter set, normally the V2 sidebar. Every site is projected in a single
+vectorized ``clinic_model.project`` call, and the results are consolidated by
+calendar year using each site's opening year.
+"""
+import numpy as np
+import pandas as pd
+
+import breakeven
+import clinic_model
+
+SITE_COLUMNS = ['site', 'region', 'opening_year']
+
+# Inputs shown in the dashboard's site table; any other input can be added as a column
+EDITABLE_INPUTS = [
+    'renovation_cost',
+    'equipment_cost',
+    'rent_monthly',
+    'staff_count',
+    'year1_start_utilization',
+    'year1_end_utilization',
+    'year3_utilization',
+    'silver_members_y1',
+    'gold_members_y1',
+    'platinum_members_y1'
+]
+
+
+def site_table(site, region, opening_year, params=None):
+    """A one-site portfolio table for ``params``, with the editable inputs filled in."""
+    p = clinic_model.resolve_params(params)
+    row = {'site': site, 'region': region, 'opening_year': int(opening_year)}
+    row.update({name: float(p[name]) for name in EDITABLE_INPUTS})
+    return pd.DataFrame([row])
+
+
+def site_params(sites, base_params=None):
+    """
+    Clinic inputs for every site as arrays of length len(sites).
+
+    Columns named after clinic inputs override ``base_params``; blank cells
+    keep the base value.
+    """
+    p = clinic_model.resolve_params(base_params)
+    params = {}
+    for name in clinic_model.PARAM_NAMES:
+        if name in sites.columns:
+            values = pd.to_numeric(sites[name], errors='coerce').to_numpy(dtype=float)
+            params[name] = np.where(np.isnan(values), p[name], values)
+        else:
+            params[name] = np.full(len(sites), float(p[name]))
+    return params
+
+
+def evaluate(sites, base_params=None, years=3, week=None):
+    """
+    Project every site in one batch.
+
+    Returns one row per site with its ``SITE_COLUMNS``, capex (initial
+    investment), payback, the months from opening to positive EBITDA and
+    cash break-even (see ``breakeven.analyse``) and per-year revenue, EBITDA
+    and ROI as ``revenue_y1``, ``ebitda_y1``, ... ``roi_y{years}``. Raises
+    ValueError if ``sites`` lacks any of the ``SITE_COLUMNS``. ``week`` is an
+    optional hour-of-week profile, as in ``clinic_model.project``, shared by
+    every site.
+    """
+    missing = [name for name in SITE_COLUMNS if name not in sites.columns]
+    if missing:
+        raise ValueError(f"Portfolio table is missing the {', '.join(missing)} column(s)")
+    params = site_params(sites, base_params)
+    projection = clinic_model.project(params, years, detail=False, week=week)
+    break_even = breakeven.analyse(params, week=week)
+    results = pd.DataFrame({
+        'site': sites['site'].fillna('').astype(str).to_numpy(),
+        'region': sites['region'].fillna('').astype(str).to_numpy(),
+        'opening_year': pd.to_numeric(sites['opening_year']).astype(int).to_numpy(),
+        'capex': projection['initial_investment'],
+        'payback_months': projection['payback_months'],
+        'ebitda_positive_month': break_even['ebitda_positive_month'],
+        'cash_break_even_month': break_even['cash_break_even_month']
+    })
+    for metric in ('revenue', 'ebitda', 'roi'):
+        for year in range(1, years + 1):
+            results[f'{metric}_y{year}'] = projection[metric][:, year - 1]
+    return results
+
+
+def consolidate(results, years=3):
+    """
+    Portfolio revenue, EBITDA and capex by calendar year.
+
+    A site's capex falls in its opening year and its Year N trading in
+    ``opening_year + N - 1``; calendar years past a site's ``years`` horizon
+    carry no trading for it. ``cumulative_cash`` is the running total of
+    EBITDA less capex.
+    """
+    first_year = int(results['opening_year'].min())
+    calendar_years = np.arange(first_year, int(results['opening_year'].max()) + years)
+    offsets = results['opening_year'].to_numpy() - first_year
+
+    revenue = np.zeros(len(calendar_years))
+    ebitda = np.zeros(len(calendar_years))
+    capex = np.bincount(offsets, weights=results['capex'], minlength=len(calendar_years))
+    for year in range(1, years + 1):
+        revenue += np.bincount(offsets + year - 1, weights=results[f'revenue_y{year}'], minlength=len(calendar_years))
+        ebitda += np.bincount(offsets + year - 1, weights=results[f'ebitda_y{year}'], minlength=len(calendar_years))
+
+    return pd.DataFrame({
+        'year': calendar_years,
+        'sites_open': np.bincount(offsets, minlength=len(calendar_years)).cumsum(),
+        'revenue': revenue,
+        'ebitda': ebitda,
+        'capex': capex,
+        'cumulative_cash': np.cumsum(ebitda - capex)
+    })
+
+
+def payback_months(results):
+    """
+    Portfolio payback from total capex and total Year 1 EBITDA, on the same
+    simplified basis as a single clinic's payback.
+    """
+    monthly_ebitda_y1 = results['ebitda_y1'].sum() / 12
+    return results['capex'].sum() / monthly_ebitda_y1 if monthly_ebitda_y1 > 0 else np.inf
@@ -0,0 +1,164 @@
+"""
+Run the clinic or development model over a file of parameter sets, without Streamlit.
+
+    python run_models.py clinic sites.csv -o forecasts.parquet
+    python run_models.py development schemes.yaml -o appraisals.csv
+
+Each row (or JSON/YAML object) is one clinic or scheme, keyed by the sidebar
+input names in clinic_model.PARAM_NAMES or development_model.PARAM_NAMES.
+Missing inputs take the dashboard defaults, and any other column, such as a
+site name, is copied through to the output next to the model's
+``evaluate_batch`` results.
+
+Files are read and written chunk by chunk, so CSV and JSON Lines inputs of any
+length run in bounded memory; plain JSON and YAML files are loaded whole.
+YAML input needs PyYAML and Parquet output needs pyarrow.
+"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+import sweep
+
+# Rows read, evaluated and written at a time
+CHUNK_SIZE = 100000
+
+INPUT_FORMATS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.yaml': 'yaml',
+    '.yml': 'yaml'
+}
+OUTPUT_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet'
+}
+
+
+def _file_format(path, formats):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in formats:
+        raise ValueError(f"Unsupported file type '{extension}' for {path}; expected one of {', '.join(formats)}")
+    return formats[extension]
+
+
+def _records(data, path):
+    """Parameter sets from a loaded JSON or YAML document: a list of objects, or one object."""
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list) or not all(isinstance(record, dict) for record in data):
+        raise ValueError(f"{path} must hold a list of parameter objects")
+    return data
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield the parameter sets in ``path`` as DataFrames of at most ``chunk_size`` rows."""
+    file_format = _file_format(path, INPUT_FORMATS)
+    if file_format == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+        return
+    if file_format == 'jsonl':
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+        return
+
+    with open(path) as f:
+        if file_format == 'json':
+            records = _records(json.load(f), path)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML parameter files requires PyYAML: pip install pyyaml")
+            records = _records(yaml.safe_load(f), path)
+    for start in range(0, len(records), chunk_size):
+        yield pd.DataFrame.from_records(records[start:start + chunk_size])
+
+
+def evaluate_frame(model, frame, workers=1):
+    """
+    Evaluate the parameter sets in ``frame`` with ``model`` (``'clinic'`` or
+    ``'development'``).
+
+    Blank inputs take the dashboard default. Returns the columns that are not
+    model inputs followed by the ``evaluate_batch`` results.
+    """
+    engine = sweep.MODELS[model]
+    param_sets = engine.param_matrix(rows=len(frame))
+    input_columns = [name for name in frame.columns if name in engine.PARAM_NAMES]
+    for name in input_columns:
+        try:
+            values = pd.to_numeric(frame[name])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Input '{name}' must be numeric: {e}")
+        param_sets[:, engine.PARAM_NAMES.index(name)] = values.fillna(engine.DEFAULT_PARAMS[name]).to_numpy(dtype=float)
+
+    if workers == 1:
+        results = engine.evaluate_batch(param_sets)
+    else:
+        results = sweep.sweep(model, param_sets, workers)
+    passthrough = frame.drop(columns=input_columns).reset_index(drop=True)
+    return pd.concat([passthrough, pd.DataFrame(results)], axis=1)
+
+
+def write_chunks(path, frames):
+    """Write DataFrames with the same columns to one CSV or Parquet file. Returns the row count."""
+    file_format = _file_format(path, OUTPUT_FORMATS)
+    rows = 0
+    if file_format == 'csv':
+        for i, frame in enumerate(frames):
+            frame.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            rows += len(frame)
+        return rows
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Writing Parquet requires pyarrow: pip install pyarrow")
+    writer = None
+    try:
+        for frame in frames:
+            if writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = pa.Table.from_pandas(frame, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def run(model, input_path, output_path, chunk_size=CHUNK_SIZE, workers=1):
+    """Evaluate every parameter set in ``input_path`` and write the results to ``output_path``."""
+    if model not in sweep.MODELS:
+        raise ValueError(f"Unknown model '{model}'; expected one of {', '.join(sweep.MODELS)}")
+    _file_format(output_path, OUTPUT_FORMATS)
+    frames = (evaluate_frame(model, frame, workers) for frame in read_chunks(input_path, chunk_size))
+    return write_chunks(output_path, frames)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the clinic or development model over a file of parameter sets.")
+    parser.add_argument('model', choices=list(sweep.MODELS), help="Model to run")
+    parser.add_argument('input', help="Parameter sets as .csv, .json, .jsonl or .yaml, one per row or object")
+    parser.add_argument('-o', '--output', required=True, help="Results file, .csv or .parquet")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows read and written at a time")
+    parser.add_argument('--workers', type=int, default=1, help="Processes evaluating each chunk")
+    args = parser.parse_args(argv)
+
+    try:
+        rows = run(args.model, args.input, args.output, args.chunk_size, args.workers)
+    except (OSError, ImportError, ValueError) as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+    print(f"Wrote {rows} {args.model} results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Grid sensitivity analysis for the clinic and development models.
+
+Both engines broadcast over their inputs, so a two-way table is a single
+evaluation: one input varies along the last axis and the other along the
+first, giving results shaped (len(y_values), len(x_values), ...). One-way
+curves work the same way with a single input, at any resolution.
+"""
+import numpy as np
+
+import clinic_model
+import development_model
+
+MAX_GRID_POINTS = 200
+MAX_CURVE_POINTS = 1000
+
+
+def grid(params, x_updates, y_updates):
+    """
+    Lay two sets of input overrides out on a grid.
+
+    ``x_updates`` and ``y_updates`` map input names to 1-D arrays; the x values
+    vary along the last axis and the y values along the first.
+    """
+    grid_params = dict(params)
+    for name, values in x_updates.items():
+        grid_params[name] = np.asarray(values, dtype=float)[None, :]
+    for name, values in y_updates.items():
+        grid_params[name] = np.asarray(values, dtype=float)[:, None]
+    return grid_params
+
+
+def scaled(params, names, factors):
+    """Overrides that multiply each of ``names`` by ``factors``."""
+    return {name: params[name] * np.asarray(factors, dtype=float) for name in names}
+
+
+def clinic_price_utilization_grid(params, price_factors, utilization_factors, years=3, week=None):
+    """
+    Clinic projection over price factor (x) by utilization factor (y).
+
+    Price factors scale every service price and utilization factors scale every
+    service utilization factor, as in the one-way sensitivity tables. Totals
+    such as ``ebitda`` come back shaped (utilization, price, years). ``week``
+    is an optional hour-of-week profile, as in ``clinic_model.project``.
+    """
+    p = clinic_model.resolve_params(params)
+    return clinic_model.project(
+        grid(
+            p,
+            scaled(p, clinic_model.SERVICE_PRICE_INPUTS, price_factors),
+            scaled(p, clinic_model.SERVICE_UTILIZATION_FACTOR_INPUTS, utilization_factors)
+        ),
+        years,
+        detail=False,
+        week=week
+    )
+
+
+def development_grid(params, x_name, x_values, y_name, y_values, profiles=None):
+    """
+    Development appraisal over two inputs, e.g. sales price by construction cost,
+    with costs phased by the spend ``profiles``.
+
+    Every appraisal output comes back shaped (len(y_values), len(x_values)).
+    """
+    return development_model.appraise(grid(params, {x_name: x_values}, {y_name: y_values}), profiles)
+
+
+def spread(base, percent, points):
+    """``points`` values evenly from ``percent``% below ``base`` to ``percent``% above it."""
+    return np.linspace(base * (1 - percent / 100), base * (1 + percent / 100), points)
+
+
+def development_curve(params, name, values, profiles=None):
+    """
+    Development appraisal with the input ``name`` set to each of ``values``,
+    with costs phased by the spend ``profiles``.
+
+    Every other input stays at its value in ``params``. The outputs that
+    depend on ``name`` come back shaped (len(values),), the rest as scalars.
+    """
+    p = development_model.resolve_params(params)
+    p[name] = np.asarray(values, dtype=float)
+    return development_model.appraise(p, profiles)
+
+
+def perturb(params, names, percent):
+    """
+    One-at-a-time perturbations of ``names`` by -``percent``% and +``percent``%.
+
+    Returns overrides of length 2 * len(names): rows 2i and 2i + 1 hold the low
+    and high case for the i-th input, with every other input at its base value.
+    """
+    rows = 2 * len(names)
+    overrides = {name: np.full(rows, float(params[name])) for name in names}
+    for i, name in enumerate(names):
+        overrides[name][2 * i] *= 1 - percent / 100
+        overrides[name][2 * i + 1] *= 1 + percent / 100
+    return overrides
+
+
+def clinic_tornado(params, percent=10.0, names=None, week=None):
+    """
+    Year 3 EBITDA and 3-year ROI with each clinic input moved by -/+``percent``%.
+
+    All 2 * N cases are evaluated in one batched projection. Returns arrays
+    shaped (N, 2) holding the low and high case per input, in ``names`` order
+    (every sidebar input by default). ``week`` is an optional hour-of-week
+    profile, as in ``clinic_model.project``.
+    """
+    names = names or clinic_model.PARAM_NAMES
+    p = clinic_model.resolve_params(params)
+    p.update(perturb(p, names, percent))
+    projection = clinic_model.project(p, detail=False, week=week)
+    return {
+        'ebitda_y3': projection['ebitda'][:, 2].reshape(-1, 2),
+        'roi_y3': projection['roi'][:, 2].reshape(-1, 2)
+    }
+
+
+def development_tornado(params, percent=10.0, names=None, profiles=None):
+    """
+    Profit and profit on GDV with each development input moved by -/+``percent``%.
+
+    Same layout as ``clinic_tornado``; costs are phased by the spend ``profiles``.
+    """
+    names = names or development_model.PARAM_NAMES
+    p = development_model.resolve_params(params)
+    p.update(perturb(p, names, percent))
+    appraisal = development_model.appraise(p, profiles)
+    return {
+        'profit': appraisal['profit'].reshape(-1, 2),
+        'profit_on_gdv': appraisal['profit_on_gdv'].reshape(-1, 2)
+    }
+
+
+def rank_by_swing(impacts):
+    """
+    Order of inputs by the absolute gap between their low and high case, largest first.
+    """
+    return np.argsort(-np.abs(impacts[:, 1] - impacts[:, 0]), kind='stable')
@@ -0,0 +1,92 @@
+"""
+Goal seek for the clinic model.
+
+``bisect`` finds where a vectorized function crosses zero by bracketed
+bisection, solving every element of an array of problems in the same batched
+calls. ``clinic_goal_seek`` uses it to find the value of one clinic input that
+hits a target, such as Year 1 EBITDA of zero or payback in 24 months, and
+``clinic_frontier`` solves it across a second input and several targets at
+once to trace iso-target frontiers.
+"""
+import numpy as np
+
+import clinic_model
+
+BISECT_ITERATIONS = 50
+
+
+def bisect(func, low, high, iterations=BISECT_ITERATIONS):
+    """
+    Roots of ``func`` in [``low``, ``high``], element by element.
+
+    ``func`` takes an array of trial values and returns an array of the same
+    or a broadcastable shape. Each iteration halves every bracket, so 50
+    iterations pin a root to 1e-15 of its bracket width. Elements where
+    ``func`` has the same sign at both ends are not bracketed and come back
+    as NaN.
+    """
+    low = np.asarray(low, dtype=float)
+    high = np.asarray(high, dtype=float)
+    f_low = func(low)
+    f_high = func(high)
+    shape = np.broadcast_shapes(low.shape, high.shape, np.shape(f_low), np.shape(f_high))
+    low = np.broadcast_to(low, shape).copy()
+    high = np.broadcast_to(high, shape).copy()
+    f_low = np.broadcast_to(f_low, shape)
+    bracketed = np.sign(f_low) != np.sign(np.broadcast_to(f_high, shape))
+
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        f_mid = np.broadcast_to(func(mid), shape)
+        # Keep the half whose ends still have opposite signs
+        left = np.sign(f_mid) == np.sign(f_low)
+        low = np.where(left, mid, low)
+        f_low = np.where(left, f_mid, f_low)
+        high = np.where(left, high, mid)
+
+    return np.where(bracketed, (low + high) / 2, np.nan)
+
+
+def clinic_metric(projection, metric):
+    """
+    One output of a clinic projection by name.
+
+    ``'<output>_y<N>'`` picks year N of a per-year output, e.g. ``'ebitda_y1'``
+    or ``'ebitda_margin_y1'``; any other name, e.g. ``'payback_months'``, is
+    returned as is.
+    """
+    name, _, year = metric.rpartition('_y')
+    if name and year.isdigit():
+        return projection[name][..., int(year) - 1]
+    return projection[metric]
+
+
+def clinic_goal_seek(params, input_name, metric, target, low, high, years=3, week=None):
+    """
+    Value of ``input_name`` within [``low``, ``high``] at which ``metric``
+    equals ``target``, all other inputs as in ``params``.
+
+    ``target``, ``low``, ``high`` and the inputs in ``params`` may be arrays;
+    they broadcast and every element is solved in the same projections. NaN
+    where the target is not reached inside the range. ``week`` is an optional
+    hour-of-week profile, as in ``clinic_model.project``.
+    """
+    p = clinic_model.resolve_params(params)
+
+    def gap(value):
+        p[input_name] = value
+        return clinic_metric(clinic_model.project(p, years, detail=False, week=week), metric) - target
+
+    return bisect(gap, low, high)
+
+
+def clinic_frontier(params, input_name, metric, targets, low, high, x_name, x_values, years=3, week=None):
+    """
+    Iso-target frontiers: the ``input_name`` value hitting each of ``targets``
+    for each of ``x_values`` of ``x_name``.
+
+    Returns an array shaped (len(targets), len(x_values)), from one goal seek.
+    """
+    p = dict(params)
+    p[x_name] = np.asarray(x_values, dtype=float)[None, :]
+    return clinic_goal_seek(p, input_name, metric, np.asarray(targets, dtype=float)[:, None], low, high, years, week)
@@ -0,0 +1,129 @@
+"""
+Named spend profiles for phasing development costs over a scheme's months.
+
+A profile spreads a cost over a window of ``n`` months and is named by one of
+    linear        the same amount every month
+    front_loaded  falling linearly, most spent in the first month
+    back_loaded   rising linearly, most spent in the last month
+    logistic      the construction S-curve, ``s_curve``
+    beta(a,b)     the Beta(a, b) distribution over the window, e.g. beta(2,5)
+                  for a spend that peaks early and tails off
+The logistic S-curve is kept exactly as the construction phasing always was,
+cut off at the ends of the window, so its weights sum to slightly less than 1;
+every other profile sums to 1.
+
+A window is ``(start, length)`` in months: ``start`` counts from the first
+month, or back from the end of the scheme if negative, and ``length`` of None
+runs to the end. Both are clipped to the scheme's duration.
+
+``allocation_matrix`` stacks one (profile, window) per cost category into a
+(categories, months) matrix of the share spent each month. It only depends on
+the whole-month duration, so it is cached: a batch of appraisals needs one
+matrix per distinct duration, and its monthly costs are a matrix product of
+the category totals with it.
+"""
+import functools
+import re
+
+import numpy as np
+
+PROFILES = ['linear', 'front_loaded', 'back_loaded', 'logistic', 'beta(2,2)', 'beta(2,5)', 'beta(5,2)']
+
+# Midpoint steps used to integrate the Beta density
+BETA_STEPS = 4096
+
+_BETA = re.compile(r"^beta\(\s*([0-9.]+)\s*,\s*([0-9.]+)\s*\)$")
+
+
+def s_curve(x, duration):
+    """Logistic S-curve used to phase construction spend."""
+    return 1 / (1 + np.exp(-0.5 * (x - duration / 2)))
+
+
+def beta_cdf(x, a, b, steps=BETA_STEPS):
+    """Regularized incomplete beta function, the Beta(a, b) CDF at ``x`` in [0, 1]."""
+    t = (np.arange(steps) + 0.5) / steps
+    density = t ** (a - 1) * (1 - t) ** (b - 1)
+    cdf = np.concatenate([[0.0], np.cumsum(density)]) / density.sum()
+    return np.interp(x, np.linspace(0, 1, steps + 1), cdf)
+
+
+def weights(profile, n):
+    """Share of the cost spent in each of ``n`` months under the named ``profile``."""
+    i = np.arange(n, dtype=float)
+    if profile == 'linear':
+        return np.full(n, 1 / n)
+    if profile == 'front_loaded':
+        return (2 * (n - i) - 1) / n ** 2
+    if profile == 'back_loaded':
+        return (2 * i + 1) / n ** 2
+    if profile == 'logistic':
+        return s_curve(i + 1, float(n)) - s_curve(i, float(n))
+    match = _BETA.match(profile)
+    if match:
+        a, b = float(match.group(1)), float(match.group(2))
+        if a <= 0 or b <= 0:
+            raise ValueError(f"Beta profile parameters must be positive, got '{profile}'")
+        return np.diff(beta_cdf(np.arange(n + 1) / n, a, b))
+    raise ValueError(f"Unknown spend profile '{profile}'; expected one of {', '.join(PROFILES[:4])} or beta(a,b)")
+
+
+def window_months(window, duration):
+    """First and one-past-last month (0-based) of ``window`` in a scheme of ``duration`` months."""
+    start, length = window
+    start = max(0, duration + start) if start < 0 else min(start, duration - 1)
+    end = duration if length is None else min(start + length, duration)
+    return start, end
+
+
+@functools.lru_cache(maxsize=1024)
+def allocation_matrix(profiles, windows, duration, months):
+    """
+    Share of each category spent in each month, shaped (categories, months).
+
+    ``profiles`` and ``windows`` are tuples with one entry per category and
+    ``duration`` is a whole number of months; months from ``duration`` on are
+    zero. The matrix is cached and read-only.
+    """
+    matrix = np.zeros((len(profiles), months))
+    if duration >= 1:
+        for row, (profile, window) in enumerate(zip(profiles, windows)):
+            start, end = window_months(window, duration)
+            matrix[row, start:min(end, months)] = weights(profile, end - start)[:max(0, months - start)]
+    matrix.flags.writeable = False
+    return matrix
+
+
+def allocations(profiles, windows, duration, months=None):
+    """
+    The ``allocation_matrix`` of each distinct duration and where each is used.
+
+    ``duration`` (any shape) is rounded to whole months; ``months`` defaults to
+    the longest. Returns the matrices stacked as (durations, categories,
+    months) and, shaped like ``duration``, the index of each one's matrix.
+    """
+    duration = np.rint(np.asarray(duration, dtype=float))
+    if months is None:
+        months = int(duration.max())
+    distinct, index = np.unique(duration, return_inverse=True)
+    matrices = np.stack([allocation_matrix(profiles, windows, int(d), months) for d in distinct])
+    return matrices, index.reshape(duration.shape)
+
+
+def allocate(totals, matrices, index):
+    """
+    Monthly spend of the category ``totals`` (..., categories), summed over
+    categories, shaped (..., months): one matrix product per distinct duration
+    in ``allocations`` output ``matrices`` and ``index``.
+    """
+    totals = np.asarray(totals, dtype=float)
+    shape = np.broadcast_shapes(totals.shape[:-1], index.shape)
+    totals = np.broadcast_to(totals, shape + totals.shape[-1:]).reshape(-1, totals.shape[-1])
+    index = np.broadcast_to(index, shape).ravel()
+    if len(matrices) == 1:
+        return (totals @ matrices[0]).reshape(shape + matrices.shape[-1:])
+    spend = np.empty((len(totals), matrices.shape[-1]))
+    for i, matrix in enumerate(matrices):
+        rows = index == i
+        spend[rows] = totals[rows] @ matrix
+    return spend.reshape(shape + matrices.shape[-1:])
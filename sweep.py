@@ -0,0 +1,141 @@
+"""
+Parallel parameter sweeps over the clinic and development engines.
+
+Rows are split into blocks that a process pool evaluates with the model's
+``evaluate_batch``. Results are written straight into a shared-memory
+structured array, so result blocks are never pickled back to the parent.
+Explicit parameter matrices are shared the same way. Full-factorial grids
+send only their axes, and each worker decodes its own rows from the flat row
+index.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import clinic_model
+import development_model
+
+MODELS = {
+    'clinic': clinic_model,
+    'development': development_model
+}
+
+# Rows per task; several tasks per worker keeps the pool balanced
+BLOCK_SIZE = 50000
+
+
+def _shared_array(shape, dtype):
+    """Allocate a shared-memory block and an array view onto it."""
+    dtype = np.dtype(dtype)
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def factorial_rows(base_row, columns, axes, start, stop):
+    """
+    Rows ``start`` to ``stop`` of a full-factorial grid as a parameter matrix.
+
+    ``columns`` are the matrix columns being varied and ``axes`` their values;
+    the last axis varies fastest. Every other column keeps its ``base_row`` value.
+    """
+    shape = [len(values) for values in axes]
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    rows = np.tile(base_row, (stop - start, 1))
+    for column, values, index in zip(columns, axes, indices):
+        rows[:, column] = np.asarray(values, dtype=float)[index]
+    return rows
+
+
+def _evaluate_block(model, source, output_name, output_shape, output_dtype, start, stop):
+    """
+    Worker task: evaluate rows ``start`` to ``stop`` and write them into shared memory.
+
+    ``source`` is ``('matrix', shm_name, shape)`` for an explicit parameter
+    matrix or ``('factorial', base_row, columns, axes)`` for a grid.
+    """
+    engine = MODELS[model]
+    input_shm = None
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    try:
+        if source[0] == 'matrix':
+            input_shm = shared_memory.SharedMemory(name=source[1])
+            rows = np.ndarray(source[2], dtype=float, buffer=input_shm.buf)[start:stop]
+        else:
+            rows = factorial_rows(*source[1:], start, stop)
+        results = np.ndarray(output_shape, dtype=output_dtype, buffer=output_shm.buf)
+        results[start:stop] = engine.evaluate_batch(rows)
+        # Drop our views before closing, or the buffer cannot be released
+        del rows, results
+    finally:
+        output_shm.close()
+        if input_shm is not None:
+            input_shm.close()
+    return stop - start
+
+
+def _run(model, source, rows, workers, block_size):
+    """Evaluate ``rows`` parameter sets from ``source`` across a process pool."""
+    engine = MODELS[model]
+    output_dtype = engine.output_dtype()
+    output_shm, results = _shared_array((rows,), output_dtype)
+    try:
+        blocks = [(start, min(start + block_size, rows)) for start in range(0, rows, block_size)]
+        task_args = (model, source, output_shm.name, (rows,), output_dtype)
+        if workers == 1 or len(blocks) == 1:
+            for start, stop in blocks:
+                _evaluate_block(*task_args, start, stop)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_evaluate_block, *task_args, start, stop) for start, stop in blocks]
+                for future in futures:
+                    future.result()
+        return results.copy()
+    finally:
+        del results
+        output_shm.close()
+        output_shm.unlink()
+
+
+def sweep(model, param_sets, workers=None, block_size=BLOCK_SIZE):
+    """
+    Evaluate an (N, len(PARAM_NAMES)) parameter matrix for ``model``
+    (``'clinic'`` or ``'development'``) across ``workers`` processes.
+
+    Returns the model's ``evaluate_batch`` structured array. ``workers``
+    defaults to every CPU.
+    """
+    engine = MODELS[model]
+    param_sets = np.atleast_2d(np.asarray(param_sets, dtype=float))
+    if param_sets.shape[-1] != len(engine.PARAM_NAMES):
+        raise ValueError(f"Expected {len(engine.PARAM_NAMES)} parameter columns, got {param_sets.shape[-1]}")
+    input_shm, shared_params = _shared_array(param_sets.shape, float)
+    try:
+        shared_params[:] = param_sets
+        source = ('matrix', input_shm.name, param_sets.shape)
+        return _run(model, source, len(param_sets), workers or os.cpu_count(), block_size)
+    finally:
+        del shared_params
+        input_shm.close()
+        input_shm.unlink()
+
+
+def factorial_sweep(model, axes, base_params=None, workers=None, block_size=BLOCK_SIZE):
+    """
+    Evaluate every combination of ``axes`` (a dict of input name -> values),
+    with all other inputs taken from ``base_params``.
+
+    Rows follow ``itertools.product`` order over ``axes``. Returns the model's
+    ``evaluate_batch`` structured array.
+    """
+    engine = MODELS[model]
+    unknown = [name for name in axes if name not in engine.PARAM_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown {model} inputs: {', '.join(unknown)}")
+    columns = [engine.PARAM_NAMES.index(name) for name in axes]
+    values = [np.asarray(axis_values, dtype=float) for axis_values in axes.values()]
+    rows = int(np.prod([len(axis_values) for axis_values in values]))
+    source = ('factorial', engine.param_matrix(base_params)[0], columns, values)
+    return _run(model, source, rows, workers or os.cpu_count(), block_size)
@@ -0,0 +1,138 @@
+"""
+Discounted cashflow valuation: NPV, IRR and discounted payback.
+
+Cashflows are arrays shaped (..., periods) of monthly amounts, the first at
+time zero and each later one a month after the one before; any leading axes
+are independent cashflow vectors, so one call values a single scheme or every
+draw of a Monte Carlo run or sweep. Discount rates are annual percentages,
+applied monthly at the equivalent compound rate, and IRRs come back as
+annual percentages too.
+
+``irr`` solves every vector at once with Newton's method, falling back to
+bisection whenever a Newton step would leave the bracket that still holds the
+root, so it converges quadratically near the root and can never diverge.
+"""
+import numpy as np
+
+DEFAULT_DISCOUNT_RATE = 10.0
+
+# Monthly rates bracketing the IRR search, roughly -100% to +400,000% a year
+IRR_BRACKET = (-0.5, 1.0)
+IRR_ITERATIONS = 100
+IRR_TOLERANCE = 1e-12
+
+
+def monthly_rate(annual_rate):
+    """Monthly rate, as a fraction, equivalent to an ``annual_rate`` in %."""
+    return (1 + np.asarray(annual_rate, dtype=float) / 100) ** (1 / 12) - 1
+
+
+def annual_rate(monthly_rate):
+    """Annual rate in % equivalent to a ``monthly_rate`` fraction."""
+    return ((1 + monthly_rate) ** 12 - 1) * 100
+
+
+def discounted(cashflows, discount_rate=DEFAULT_DISCOUNT_RATE):
+    """Each cashflow discounted to time zero at the annual ``discount_rate`` (%)."""
+    cashflows = np.asarray(cashflows, dtype=float)
+    factors = (1 + monthly_rate(discount_rate))[..., None] ** -np.arange(cashflows.shape[-1])
+    return cashflows * factors
+
+
+def npv(cashflows, discount_rate=DEFAULT_DISCOUNT_RATE):
+    """Net present value of ``cashflows`` at the annual ``discount_rate`` (%)."""
+    return discounted(cashflows, discount_rate).sum(axis=-1)
+
+
+def _npv_and_slope(periods, rate):
+    """
+    NPV at monthly ``rate`` and its derivative with respect to the rate, for
+    cashflows laid out period-first, shaped (periods, n).
+
+    Both come from one Horner pass over the periods, in powers of the
+    discount factor v = 1 / (1 + rate), so no power table is built.
+    """
+    v = 1 / (1 + rate)
+    value = periods[-1]
+    slope = np.zeros_like(value)
+    for cashflow in periods[-2::-1]:
+        slope = slope * v + value
+        value = value * v + cashflow
+    # d/d(rate) of sum(c_t v^t) is -v^2 times its derivative in v
+    return value, -slope * v ** 2
+
+
+def irr(cashflows, iterations=IRR_ITERATIONS, tolerance=IRR_TOLERANCE):
+    """
+    Internal rate of return of each cashflow vector, as an annual %.
+
+    The monthly rate is found within IRR_BRACKET; NaN where the NPV has the
+    same sign at both ends of it, e.g. cashflows that never turn positive.
+    Each iteration only revisits the vectors that have not converged yet.
+    """
+    cashflows = np.asarray(cashflows, dtype=float)
+    shape = cashflows.shape[:-1]
+    # Period-first, so each Horner step reads one contiguous row
+    periods = np.ascontiguousarray(cashflows.reshape(-1, cashflows.shape[-1]).T)
+    n = periods.shape[-1]
+    f_low, _ = _npv_and_slope(periods, np.full(n, IRR_BRACKET[0]))
+    f_high, _ = _npv_and_slope(periods, np.full(n, IRR_BRACKET[1]))
+    bracketed = np.sign(f_low) != np.sign(f_high)
+
+    rate = np.full(n, np.nan)
+    active = np.flatnonzero(bracketed)
+    periods = periods[:, active]
+    low = np.full(len(active), IRR_BRACKET[0])
+    high = np.full(len(active), IRR_BRACKET[1])
+    f_low = f_low[active]
+    guess = np.full(len(active), 0.01)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(iterations):
+            if not len(active):
+                break
+            value, slope = _npv_and_slope(periods, guess)
+            # Keep the half of the bracket whose ends still have opposite signs
+            left = np.sign(value) == np.sign(f_low)
+            low = np.where(left, guess, low)
+            f_low = np.where(left, value, f_low)
+            high = np.where(left, high, guess)
+
+            newton = guess - value / slope
+            inside = np.isfinite(newton) & (newton > low) & (newton < high)
+            next_guess = np.where(inside, newton, (low + high) / 2)
+            converged = np.abs(next_guess - guess) <= tolerance * (1 + np.abs(guess))
+            rate[active[converged]] = next_guess[converged]
+
+            keep = ~converged
+            active, periods, guess = active[keep], periods[:, keep], next_guess[keep]
+            low, high, f_low = low[keep], high[keep], f_low[keep]
+        # Vectors still unconverged after every iteration keep their last estimate
+        rate[active] = guess
+
+    return annual_rate(rate).reshape(shape)
+
+
+def discounted_payback(cashflows, discount_rate=DEFAULT_DISCOUNT_RATE):
+    """
+    Months from the first cashflow until the cumulative discounted cashflow
+    turns non-negative, interpolated within the month it does; infinite if
+    it never does.
+    """
+    present = discounted(cashflows, discount_rate)
+    cumulative = np.cumsum(present, axis=-1)
+    recovered = cumulative >= 0
+    month = recovered.argmax(axis=-1)
+    previous = np.take_along_axis(cumulative, np.maximum(month - 1, 0)[..., None], axis=-1)[..., 0]
+    inflow = np.take_along_axis(present, month[..., None], axis=-1)[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        months = np.where(month > 0, month - 1 - previous / inflow, 0.0)
+    return np.where(recovered.any(axis=-1), months, np.inf)
+
+
+def evaluate(cashflows, discount_rate=DEFAULT_DISCOUNT_RATE):
+    """``npv``, ``irr`` and ``discounted_payback_months`` of ``cashflows``."""
+    return {
+        'npv': npv(cashflows, discount_rate),
+        'irr': irr(cashflows),
+        'discounted_payback_months': discounted_payback(cashflows, discount_rate)
+    }
@@ -0,0 +1,87 @@
+"""
+Hour-of-week opening, demand and pricing profile for the clinic.
+
+A week is 168 hourly slots, Monday 00:00 first. A profile is a dict of
+    open    (168,) 1.0 for each hour the clinic is open, else 0.0
+    demand  (services, 168) relative demand per service, averaging 1 over the open hours
+    price   (services, 168) multiplier on each service's list price, e.g. 0.8 off-peak
+``clinic_model.project(params, week=profile)`` turns it into revenue, capacity
+and break-even figures by dot products over the week, in place of the flat
+``operating_hours_weekly``.
+
+The defaults are the hours in the forecast: 10am-8pm on weekdays and 9am-6pm
+at weekends, 68 hours a week, with flat demand and no off-peak discount.
+"""
+import numpy as np
+
+import clinic_model
+
+HOURS_PER_WEEK = 168
+DAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+WEEKDAYS = 5
+
+WEEKDAY_HOURS = (10, 20)
+WEEKEND_HOURS = (9, 18)
+# Weekday demand from this hour on counts as after work; earlier weekday hours are off-peak
+AFTER_WORK_HOUR = 17
+
+
+def _hour_masks():
+    hour_of_day = np.arange(HOURS_PER_WEEK) % 24
+    weekday = np.arange(HOURS_PER_WEEK) // 24 < WEEKDAYS
+    return hour_of_day, weekday
+
+
+def opening_hours(weekday_hours=WEEKDAY_HOURS, weekend_hours=WEEKEND_HOURS):
+    """Open hours as 1.0/0.0 per hour of the week, from (opening, closing) hours of the day."""
+    hour_of_day, weekday = _hour_masks()
+    opening = np.where(weekday, weekday_hours[0], weekend_hours[0])
+    closing = np.where(weekday, weekday_hours[1], weekend_hours[1])
+    return ((hour_of_day >= opening) & (hour_of_day < closing)).astype(float)
+
+
+def off_peak_hours(open_hours):
+    """Open weekday hours before AFTER_WORK_HOUR."""
+    hour_of_day, weekday = _hour_masks()
+    return (open_hours > 0) & weekday & (hour_of_day < AFTER_WORK_HOUR)
+
+
+def build(weekday_hours=WEEKDAY_HOURS, weekend_hours=WEEKEND_HOURS, after_work_demand=1.0, weekend_demand=1.0, off_peak_discount=0.0):
+    """
+    A profile from opening hours and per-service multipliers.
+
+    ``after_work_demand`` scales weekday demand from AFTER_WORK_HOUR and
+    ``weekend_demand`` weekend demand, relative to weekday daytime; each is a
+    scalar or one value per service, and demand is then rescaled to average 1
+    over the open hours. ``off_peak_discount`` (% per service, or one value)
+    comes off the price in the ``off_peak_hours``.
+    """
+    services = len(clinic_model.SERVICES)
+    open_hours = opening_hours(weekday_hours, weekend_hours)
+    hour_of_day, weekday = _hour_masks()
+
+    after_work = np.broadcast_to(np.asarray(after_work_demand, dtype=float), (services,))[:, None]
+    weekend = np.broadcast_to(np.asarray(weekend_demand, dtype=float), (services,))[:, None]
+    weights = np.where(weekday, np.where(hour_of_day >= AFTER_WORK_HOUR, after_work, 1.0), weekend) * open_hours
+    open_weights = weights.sum(axis=-1, keepdims=True)
+    demand = np.divide(weights * open_hours.sum(), open_weights, out=np.zeros_like(weights), where=open_weights > 0)
+
+    discount = np.broadcast_to(np.asarray(off_peak_discount, dtype=float), (services,))[:, None]
+    price = np.where(off_peak_hours(open_hours), 1 - discount / 100, 1.0)
+    return {'open': open_hours, 'demand': demand, 'price': price}
+
+
+def weekly_hours(week):
+    """Open hours per week."""
+    return float(week['open'].sum())
+
+
+def open_days(week):
+    """Days of the week with at least one open hour."""
+    return int((week['open'].reshape(len(DAY_NAMES), 24).sum(axis=-1) > 0).sum())
+
+
+def hour_labels(hours=None):
+    """Labels such as 'Mon 10:00' for the given hours of the week, all 168 by default."""
+    hours = np.arange(HOURS_PER_WEEK) if hours is None else hours
+    return [f"{DAY_NAMES[hour // 24]} {hour % 24:02d}:00" for hour in hours]